@@ -0,0 +1,165 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from artifact_cache import ArtifactCache
+from config import DEFAULT_CONFIDENCE, PROVIDED_PRS_CSV, PROVIDED_RELEASES_CSV, resolve_input_path
+from datasets_io import read_dataset
+from findings import Finding
+from resampling import resample_practices
+from stats_engine import compare_practices, practice_summary
+
+DATASETS = {
+    "pull_requests": PROVIDED_PRS_CSV,
+    "releases": PROVIDED_RELEASES_CSV,
+}
+GROUP_COLUMNS = ["project", "practice"]
+# Memo entries of these kinds are also kept in the artifact cache, if the context has one.
+PERSISTED_ARTIFACTS = ("rows", "summary", "tests", "resampling", "projects", "yearly")
+
+
+def require_practice(frame: pd.DataFrame, path) -> pd.DataFrame:
+    """`frame`, after checking that every row is labelled CI or NO-CI (collected data is labelled by ci_adoption.py)."""
+    if "practice" in frame.columns and frame["practice"].isna().any():
+        raise SystemExit(f"{path} has rows without a practice; label them with ci_adoption.py first.")
+    return frame
+
+
+def add_derived_columns(frame: pd.DataFrame) -> pd.DataFrame:
+    if "merge_time" in frame.columns and "delivery_time" in frame.columns:
+        frame["lifetime"] = frame["merge_time"] + frame["delivery_time"]
+    return frame
+
+
+class AnalysisContext:
+    """Datasets and per-(project, practice) aggregates shared by every finding of one run.
+
+    Each entry is computed on first use and then reused; a lock per entry keeps findings
+    that run in parallel threads from loading or aggregating the same thing twice. With an
+    ArtifactCache, aggregates are first looked up on disk under the fingerprint of their dataset,
+    so a re-run over unchanged datasets loads nothing.
+    """
+
+    def __init__(
+        self,
+        findings: list[Finding],
+        paths: dict[str, str] | None = None,
+        resamples: int = 0,
+        confidence: float = DEFAULT_CONFIDENCE,
+        seed: int = 0,
+        resample_jobs: int = 1,
+        cache: ArtifactCache | None = None,
+    ) -> None:
+        self.paths = {**DATASETS, **(paths or {})}
+        self.resamples = resamples
+        self.confidence = confidence
+        self.seed = seed
+        self.resample_jobs = resample_jobs
+        self.cache = cache
+        self.columns = {}
+        for item in findings:
+            for name, columns in item.columns.items():
+                needed = self.columns.setdefault(name, list(GROUP_COLUMNS))
+                needed.extend(column for column in columns if column not in needed)
+        self._values = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def _memo(self, key, compute):
+        with self._guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            if key not in self._values:
+                self._values[key] = self._cached(key, compute) if self.cache and key[0] in PERSISTED_ARTIFACTS else compute()
+            return self._values[key]
+
+    def _cached(self, key, compute):
+        kind, name = key[:2]
+        parts = [type(self).__name__, key, self.fingerprint(name)]
+        if kind == "summary":
+            parts.append(self.columns.get(name))  # one aggregate per loaded numeric column
+        elif kind == "resampling":
+            parts.append((self.resamples, self.confidence, self.seed))
+        cache_key = self.cache.key(*parts)
+        value = self.cache.get(cache_key)
+        if value is None:
+            value = compute()
+            self.cache.put(cache_key, value, f"{type(self).__name__} {key}")
+        return value
+
+    def fingerprint(self, name: str) -> str:
+        return self._memo(("fingerprint", name), lambda: self.cache.fingerprint(resolve_input_path(self.paths[name])))
+
+    def dataset(self, name: str) -> pd.DataFrame:
+        def load() -> pd.DataFrame:
+            # lifetime is derived, not stored
+            columns = [column for column in self.columns.get(name, []) if column != "lifetime"] or None
+            path = resolve_input_path(self.paths[name])
+            return add_derived_columns(require_practice(read_dataset(path, columns=columns), path))
+
+        return self._memo(("dataset", name), load)
+
+    def summary(self, name: str) -> pd.DataFrame:
+        """Mean, median and count of every numeric column per (project, practice)."""
+        def compute() -> pd.DataFrame:
+            data = self.dataset(name)
+            values = [column for column in data.select_dtypes("number").columns if column not in GROUP_COLUMNS]
+            return practice_summary(data, values).set_index(GROUP_COLUMNS)
+
+        return self._memo(("summary", name), compute)
+
+    def practice_stat(self, name: str, value: str, stat: str, practice: str) -> pd.Series:
+        """One aggregate of `value` for one practice, indexed by project."""
+        return self.summary(name)[f"{value}_{stat}"].xs(practice, level="practice")
+
+    def practice_tests(self, name: str, value: str) -> pd.DataFrame:
+        """Per-project CI vs NO-CI test table of compare_practices for one value column."""
+        def compute() -> pd.DataFrame:
+            summary = self.summary(name).reset_index()
+            return compare_practices(self.dataset(name), [value], summary=summary).set_index("project")
+
+        return self._memo(("tests", name, value), compute)
+
+    def resampling_options(self) -> dict:
+        return {"resamples": self.resamples, "confidence": self.confidence, "seed": self.seed, "jobs": self.resample_jobs}
+
+    def resampling(self, name: str, value: str) -> pd.DataFrame:
+        """Per-project bootstrap CIs and permutation p-values of CI vs NO-CI (see resampling.py)."""
+        return self._memo(
+            ("resampling", name, value),
+            lambda: resample_practices(self.dataset(name), value, **self.resampling_options()),
+        )
+
+    def rows(self, name: str) -> int:
+        return self._memo(("rows", name), lambda: len(self.dataset(name)))
+
+    def projects(self, name: str) -> list[str]:
+        """Project names in order of first appearance."""
+        return self._memo(("projects", name), lambda: list(self.dataset(name)["project"].unique()))
+
+    def yearly_counts(self, name: str, date_column: str, count_column: str) -> pd.Series:
+        """Non-null count_column values per (project, practice, year of date_column)."""
+        def compute() -> pd.Series:
+            data = self.dataset(name)
+            keys = ["project", "practice", data[date_column].dt.year]
+            return data.groupby(keys, observed=True)[count_column].count()
+
+        return self._memo(("yearly", name, date_column, count_column), compute)
+
+    def close(self) -> None:
+        pass
+
+    def datasets_info(self) -> dict:
+        return {name: {"path": self.paths[name], "rows": self.rows(name)} for name in self.columns}
+
+
+def run_findings(findings: list[Finding], context: AnalysisContext, jobs: int = 1) -> list[dict]:
+    """Run findings (in `jobs` threads) and return their results in registration order."""
+    def run(item: Finding) -> dict:
+        return {"id": item.id, "rq": item.rq, "finding": item.number, **item.function(context)}
+
+    if jobs <= 1:
+        return [run(item) for item in findings]
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(run, findings))
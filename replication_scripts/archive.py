@@ -0,0 +1,112 @@
+import argparse
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+RUN = "run"
+PULL_REQUEST = "pull_request"
+RELEASE = "release"
+# Run records start with this prefix, so the scan for the last fresh run skips the JSON parsing of all other lines.
+RUN_PREFIX = json.dumps({"kind": RUN})[:-1]
+
+
+def archive_path(args: argparse.Namespace, output_path: Path) -> Path | None:
+    """--archive (relative to the repo root) or, by default, the output CSV path with an .ndjson suffix."""
+    if args.no_archive:
+        if args.from_archive:
+            raise SystemExit("--from-archive needs the archive; drop --no-archive.")
+        return None
+    if not args.archive:
+        return output_path.with_suffix(".ndjson")
+    path = Path(args.archive)
+    return path if path.is_absolute() else Path(__file__).resolve().parents[1] / path
+
+
+def add_archive_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--archive", help="Raw response archive (NDJSON; default: the output path with an .ndjson suffix).")
+    parser.add_argument("--no-archive", action="store_true", help="Do not archive the raw API records.")
+    parser.add_argument(
+        "--from-archive",
+        action="store_true",
+        help="Re-derive the CSV from the archive of earlier runs without contacting GitHub.",
+    )
+
+
+def ends_mid_line(path: Path) -> bool:
+    with path.open("rb") as handle:
+        if handle.seek(0, 2) == 0:
+            return False
+        handle.seek(-1, 2)
+        return handle.read(1) != b"\n"
+
+
+class ResponseArchive:
+    """Append-only NDJSON file of the raw GitHub records a collector fetched.
+
+    Each run starts with a run record saying whether it appends to the CSV (--resume/--since) or
+    rewrites it; every fetched record follows as {"kind", "project", "data"}. Re-deriving a CSV
+    replays the records from the last rewriting run on, so the archive never needs rewriting.
+    """
+
+    def __init__(self, path: Path, append: bool) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        # A crash can leave a partial last line; start this run on a line of its own.
+        self._file = path.open("a", encoding="utf-8")
+        if ends_mid_line(path):
+            self._file.write("\n")
+        started_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        self._file.write(json.dumps({"kind": RUN, "started_at": started_at, "append": append}) + "\n")
+
+    def write(self, kind: str, project: str, data: dict) -> None:
+        self._file.write(json.dumps({"kind": kind, "project": project, "data": data}, separators=(",", ":")) + "\n")
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def archived(records, archive: ResponseArchive | None, kind: str, project: str, data=None):
+    """Pipeline stage: write each record, or the raw data(record) it carries, to the archive and pass it on.
+
+    Records without data (None) are passed on unarchived.
+    """
+    for record in records:
+        raw = record if data is None else data(record)
+        if archive is not None and raw is not None:
+            archive.write(kind, project, raw)
+        yield record
+
+
+def is_appending_run(line: str) -> bool:
+    """Whether a run record appends to the CSV; a run record cut short by a crash counts as appending."""
+    try:
+        return json.loads(line)["append"]
+    except (json.JSONDecodeError, KeyError):
+        return True
+
+
+def iter_archive(path: Path, kind: str):
+    """Yield (project, data) of the `kind` records from the archive's last rewriting run onward.
+
+    Lines cut short by a crashed run are skipped.
+    """
+    if not path.exists():
+        raise SystemExit(f"No archive at {path}; collect with archiving enabled first.")
+    start = 0
+    with path.open(encoding="utf-8") as handle:
+        for number, line in enumerate(handle):
+            if line.startswith(RUN_PREFIX) and not is_appending_run(line):
+                start = number
+    with path.open(encoding="utf-8") as handle:
+        for number, line in enumerate(handle):
+            if number < start or line.startswith(RUN_PREFIX):
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record["kind"] == kind:
+                yield record["project"], record["data"]
@@ -0,0 +1,130 @@
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+from functools import cache
+from pathlib import Path
+
+DEFAULT_MAX_MB = 512
+HASH_CHUNK_BYTES = 1 << 20
+# Modules whose code determines the cached aggregates; editing any of them invalidates the cache.
+CODE_MODULES = ("analysis.py", "datasets_io.py", "resampling.py", "stats_engine.py", "streaming.py", "timestamps.py")
+
+
+@cache
+def code_fingerprint() -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for name in CODE_MODULES:
+        digest.update((Path(__file__).parent / name).read_bytes())
+    return digest.hexdigest()
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as handle:
+        while chunk := handle.read(HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """SQLite store of pickled analysis aggregates, keyed by the fingerprints of their inputs.
+
+    A dataset's fingerprint is its content hash. The hash is remembered with the file's size and
+    mtime, so unchanged files are not re-read; a touched but identical file hashes to the same
+    fingerprint and keeps its artifacts. Least recently used artifacts are evicted past max_bytes.
+    """
+
+    def __init__(self, path: Path, max_bytes: int) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS artifacts (
+                key TEXT PRIMARY KEY,
+                label TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS artifacts_accessed ON artifacts (accessed_at)")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                digest TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self.evict()
+
+    def fingerprint(self, path: Path) -> str:
+        """Content hash of a dataset file, re-hashed only when its size or mtime changed."""
+        path = path.resolve()
+        stat = path.stat()
+        with self._lock:
+            row = self._conn.execute("SELECT size, mtime_ns, digest FROM fingerprints WHERE path = ?", (str(path),)).fetchone()
+        if row is not None and row[:2] == (stat.st_size, stat.st_mtime_ns):
+            return row[2]
+        digest = file_digest(path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?)", (str(path), stat.st_size, stat.st_mtime_ns, digest)
+            )
+            self._conn.commit()
+        return digest
+
+    @staticmethod
+    def key(*parts) -> str:
+        return hashlib.sha256(repr((code_fingerprint(), *parts)).encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """The cached value, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM artifacts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE artifacts SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return pickle.loads(row[0])
+
+    def put(self, key: str, value, label: str) -> None:
+        body = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?, ?, ?, ?)", (key, label, body, len(body), now, now))
+            self._conn.commit()
+        self.evict()
+
+    def evict(self) -> None:
+        """Drop least recently used artifacts until under max_bytes."""
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0]
+            if total > self.max_bytes:
+                cursor = self._conn.execute("SELECT key, size FROM artifacts ORDER BY accessed_at")
+                doomed = []
+                for key, size in cursor:
+                    if total <= self.max_bytes:
+                        break
+                    doomed.append((key,))
+                    total -= size
+                self._conn.executemany("DELETE FROM artifacts WHERE key = ?", doomed)
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
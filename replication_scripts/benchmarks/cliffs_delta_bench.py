@@ -0,0 +1,61 @@
+import argparse
+import time
+
+import numpy as np
+
+from stats_engine import cliffs_delta
+
+PAIRWISE_LIMIT = 20_000
+
+
+def pairwise_cliffs_delta(x, y) -> float:
+    """Reference O(n*m) definition: mean sign of every (x, y) difference."""
+    x = np.asarray(x, dtype=float)[:, None]
+    y = np.asarray(y, dtype=float)[None, :]
+    return float(np.sign(x - y).mean())
+
+
+def timed(function, *args) -> tuple[float, float]:
+    started = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - started, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Cliff's delta implementations.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        from cliffs_delta import cliffs_delta as package_cliffs_delta
+    except ImportError:
+        package_cliffs_delta = None
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'n per sample':>12} {'pairwise':>10} {'package':>10} {'ours':>10}")
+    for size in args.sizes:
+        # Rounded log-normal samples, like PR times, so the comparison includes ties.
+        x = np.round(rng.lognormal(3.0, 1.5, size))
+        y = np.round(rng.lognormal(3.2, 1.5, size))
+
+        ours_time, (delta, _) = timed(cliffs_delta, x, y)
+        row = [f"{size:>12}"]
+        if size <= PAIRWISE_LIMIT:
+            pairwise_time, expected = timed(pairwise_cliffs_delta, x, y)
+            assert np.isclose(delta, expected), (delta, expected)
+            row.append(f"{pairwise_time:>9.3f}s")
+        else:
+            row.append(f"{'-':>10}")
+        if package_cliffs_delta is not None:
+            package_time, (expected, _) = timed(package_cliffs_delta, x.tolist(), y.tolist())
+            assert np.isclose(delta, expected), (delta, expected)
+            row.append(f"{package_time:>9.3f}s")
+        else:
+            row.append(f"{'-':>10}")
+        row.append(f"{ours_time:>9.3f}s")
+        print(" ".join(row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1]
+# Command lines that must start without the scientific stack, and the modules that must import quickly
+STARTUP_COMMANDS = {
+    "replication --list": ["replication.py", "--list"],
+    "replication --help": ["replication.py", "--help"],
+    "import rq1, rq2": ["-c", "import rq1, rq2"],
+}
+MODULE_COMMANDS = {
+    "import analysis": ["-c", "import analysis"],
+    "import streaming": ["-c", "import streaming"],
+}
+HEAVY_MODULES = ("numpy", "pandas", "scipy", "matplotlib", "pyarrow")
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """(module, self us, cumulative us) of every `-X importtime` line, in import order.
+
+    Module names keep their leading spaces, which give the nesting depth of the import.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        imports.append((name[1:].rstrip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def time_command(arguments: list[str], repeat: int) -> dict:
+    """Fastest wall time of `python -X importtime <arguments>` and the imports of that run."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", *arguments], cwd=SCRIPTS_DIR, capture_output=True, text=True
+        )
+        seconds = time.perf_counter() - started
+        if result.returncode != 0:
+            raise RuntimeError(f"{' '.join(arguments)} failed:\n{result.stderr[-2000:]}")
+        if best is None or seconds < best[0]:
+            best = (seconds, parse_importtime(result.stderr))
+    seconds, imports = best
+    top_level = {name.strip().split(".")[0] for name, _, _ in imports}
+    return {
+        "seconds": seconds,
+        "modules": len(imports),
+        "import_seconds": sum(cumulative for name, _, cumulative in imports if not name.startswith(" ")) / 1e6,
+        "heavy": [module for module in HEAVY_MODULES if module in top_level],
+        "slowest": sorted(imports, key=lambda item: item[1], reverse=True),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the startup and import time of the replication CLI and modules.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per command; the fastest is reported.")
+    parser.add_argument("--top", type=int, default=5, help="Slowest imports (self time) listed per command.")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit with status 1 if a startup command imports a heavy module or takes longer than --max-ms.",
+    )
+    parser.add_argument("--max-ms", type=float, default=500.0, help="Wall-time budget of each startup command with --check.")
+    args = parser.parse_args()
+
+    baseline = time_command(["-c", "pass"], args.repeat)["seconds"]
+    print(f"Interpreter startup: {baseline * 1000:.0f} ms")
+    failures = []
+    for name, arguments in {**STARTUP_COMMANDS, **MODULE_COMMANDS}.items():
+        result = time_command(arguments, args.repeat)
+        heavy = ", ".join(result["heavy"]) or "none"
+        print(
+            f"{name:<22} {result['seconds'] * 1000:>7.0f} ms  {result['import_seconds'] * 1000:>7.0f} ms importing"
+            f" {result['modules']:>4} modules (heavy: {heavy})"
+        )
+        for module, self_us, _ in result["slowest"][: args.top]:
+            print(f"    {self_us / 1000:>7.1f} ms  {module.strip()}")
+        if name in STARTUP_COMMANDS:
+            if result["heavy"]:
+                failures.append(f"{name} imports {heavy}")
+            if result["seconds"] * 1000 > args.max_ms:
+                failures.append(f"{name} took {result['seconds'] * 1000:.0f} ms (budget {args.max_ms:.0f} ms)")
+
+    for failure in failures:
+        print(f"Startup regression: {failure}")
+    if args.check and failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+import hashlib
+import json
+import multiprocessing
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.synthetic import generate_pull_requests, generate_releases, project_names
+
+REST_PATH = re.compile(r"^/repos/([^/]+/[^/]+)/(pulls|releases)(?:/(\d+))?$")
+SLOW_DELAY = 0.05
+
+
+def pull_request_detail(row: dict) -> dict:
+    """REST pull request detail of one generated PR row (the fields collect_pr.build_row reads)."""
+    deletions = row["churn"] // 3
+    body = "x" * row["description_length"]
+    if row["stacktrace_attached"]:
+        body = "Traceback (most recent call last):\n" + body
+    return {
+        "id": row["pull_id"],
+        "number": row["pull_number"],
+        "created_at": row["created_at"],
+        "updated_at": row["merged_at"],
+        "merged_at": row["merged_at"],
+        "body": body,
+        "additions": row["churn"] - deletions,
+        "deletions": deletions,
+        "commits": row["commits_per_pr"],
+        "changed_files": row["changed_files"],
+        "comments": row["comments"],
+        "review_comments": max(row["activities"] - row["commits_per_pr"] - row["comments"], 0),
+        "user": {"login": row["author"]},
+    }
+
+
+def review_page(detail: dict, first: int, after: str | None) -> dict:
+    """A page of the PR's reviews connection, one review per review comment."""
+    start = int(after or 0)
+    end = min(start + first, detail["review_comments"])
+    return {
+        "pageInfo": {"hasNextPage": end < detail["review_comments"], "endCursor": str(end)},
+        "nodes": [{"comments": {"totalCount": 1}}] * (end - start),
+    }
+
+
+def graphql_node(detail: dict, reviews: int = 100) -> dict:
+    """The GraphQL node github_graphql turns back into `detail` (paging through its reviews)."""
+    return {
+        "databaseId": detail["id"],
+        "number": detail["number"],
+        "createdAt": detail["created_at"],
+        "updatedAt": detail["updated_at"],
+        "mergedAt": detail["merged_at"],
+        "body": detail["body"],
+        "additions": detail["additions"],
+        "deletions": detail["deletions"],
+        "changedFiles": detail["changed_files"],
+        "author": detail["user"],
+        "commits": {"totalCount": detail["commits"]},
+        "comments": {"totalCount": detail["comments"]},
+        "reviews": review_page(detail, reviews, None),
+    }
+
+
+def release_item(row: dict) -> dict:
+    return {
+        "tag_name": row["title"],
+        "prerelease": False,
+        "draft": False,
+        "published_at": row["publishedAt"].replace(" ", "T") + "Z",
+        "created_at": row["startedAt"].replace(" ", "T") + "Z",
+    }
+
+
+class MockRepos:
+    """GitHub responses for the projects of one synthetic dataset, built per project on first request.
+
+    Faults for tests: the detail of every `slow_every`-th PR number is answered `SLOW_DELAY` late,
+    and the first request for the detail of every `flaky_every`-th one fails with a 502. With
+    `fail_from_page`, every listing page from that one on fails with a 500, as if the server went down.
+    """
+
+    def __init__(
+        self, prs: int, projects: int, seed: int = 0, slow_every: int = 0, flaky_every: int = 0, fail_from_page: int = 0
+    ) -> None:
+        self.pull_requests = generate_pull_requests(prs, projects, seed)
+        self.releases = generate_releases(prs, projects, seed)
+        self.slow_every = slow_every
+        self.flaky_every = flaky_every
+        self.fail_from_page = fail_from_page
+        self._failed = set()
+        self._repos = {}
+        self._lock = threading.Lock()
+
+    def repo(self, name: str) -> dict | None:
+        with self._lock:
+            if name not in self._repos and name in self.pull_requests["project"].cat.categories:
+                rows = self.pull_requests[self.pull_requests["project"] == name].astype({"author": str})
+                details = [pull_request_detail(row) for row in rows.to_dict("records")]
+                details.sort(key=lambda detail: detail["created_at"], reverse=True)
+                releases = self.releases[self.releases["project"] == name].to_dict("records")
+                self._repos[name] = {
+                    "pulls": details,
+                    "by_number": {detail["number"]: detail for detail in details},
+                    "releases": [release_item(row) for row in releases],
+                }
+            return self._repos.get(name)
+
+    def respond(self, method: str, path: str, body: bytes) -> tuple[int, object]:
+        url = urlparse(path)
+        if method == "POST" and url.path == "/graphql":
+            return 200, self.graphql(json.loads(body)["variables"])
+        match = REST_PATH.match(url.path)
+        repo = self.repo(match.group(1)) if match else None
+        if repo is None:
+            return 404, {"message": "Not Found"}
+        kind, number = match.group(2), match.group(3)
+        if number:
+            return self.detail(repo, match.group(1), int(number))
+
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        items = repo[kind]
+        if kind == "pulls" and query.get("sort") == "updated":
+            items = sorted(items, key=lambda item: item["updated_at"], reverse=query.get("direction", "desc") == "desc")
+        page, per_page = int(query.get("page", 1)), int(query.get("per_page", 30))
+        if self.fail_from_page and page >= self.fail_from_page:
+            return 500, {"message": "Server Error"}
+        return 200, items[(page - 1) * per_page : page * per_page]
+
+    def detail(self, repo: dict, name: str, number: int) -> tuple[int, object]:
+        detail = repo["by_number"].get(number)
+        if detail is None:
+            return 404, {"message": "Not Found"}
+        if self.slow_every and number % self.slow_every == 0:
+            time.sleep(SLOW_DELAY)
+        if self.flaky_every and number % self.flaky_every == 0:
+            with self._lock:
+                first = (name, number) not in self._failed
+                self._failed.add((name, number))
+            if first:
+                return 502, {"message": "Server Error"}
+        return 200, detail
+
+    def graphql(self, variables: dict) -> dict:
+        repo = self.repo(f"{variables['owner']}/{variables['name']}")
+        reset_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() + 3600))
+        rate_limit = {"cost": 1, "remaining": 5000, "resetAt": reset_at}
+        if "number" in variables:  # github_graphql.REVIEWS_QUERY
+            reviews = review_page(repo["by_number"][variables["number"]], variables["first"], variables["after"])
+            return {"data": {"rateLimit": rate_limit, "repository": {"pullRequest": {"reviews": reviews}}}}
+        pulls = repo["pulls"]
+        if variables["orderField"] == "UPDATED_AT":
+            pulls = sorted(pulls, key=lambda detail: detail["updated_at"], reverse=True)
+        start = int(variables["after"] or 0)
+        end = min(start + variables["first"], len(pulls))
+        return {
+            "data": {
+                "rateLimit": rate_limit,
+                "repository": {
+                    "pullRequests": {
+                        "pageInfo": {"hasNextPage": end < len(pulls), "endCursor": str(end)},
+                        "nodes": [graphql_node(detail, variables["reviews"]) for detail in pulls[start:end]],
+                    }
+                },
+            }
+        }
+
+
+def serve(prs: int, projects: int, seed: int, faults: dict, ready, requests, bytes_sent, not_modified) -> None:
+    """Body of the server process: answer requests until terminated, counting them in shared values.
+
+    GET responses carry an ETag of their body; a request whose If-None-Match matches it gets a 304.
+    """
+    repos = MockRepos(prs, projects, seed, **faults)
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args) -> None:
+            pass
+
+        def handle_request(self, method: str) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            status, payload = repos.respond(method, self.path, self.rfile.read(length) if length else b"")
+            data = json.dumps(payload).encode("utf-8")
+            etag = f'"{hashlib.sha1(data).hexdigest()}"' if method == "GET" and status == 200 else None
+            if etag and self.headers.get("If-None-Match") == etag:
+                status, data = 304, b""
+            with requests.get_lock():
+                requests.value += 1
+                bytes_sent.value += len(data)
+                not_modified.value += status == 304
+            self.send_response(status)
+            if etag:
+                self.send_header("ETag", etag)
+            if status != 304:
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+            self.send_header("X-RateLimit-Remaining", "5000")
+            self.send_header("X-RateLimit-Reset", str(int(time.time()) + 3600))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self) -> None:
+            self.handle_request("GET")
+
+        def do_POST(self) -> None:
+            self.handle_request("POST")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    ready.send(server.server_address[1])
+    server.serve_forever()
+
+
+class MockGitHub:
+    """Local GitHub stand-in serving the collectors' calls from a synthetic dataset.
+
+    Answers the REST PR listing, PR details and releases, and the GraphQL merged-PR query, from
+    a separate process so the server neither competes with the measured collector for the GIL
+    nor shows up in its memory. Use as a context manager; `api_base` replaces GITHUB_API_BASE.
+    `faults` are MockRepos' fault options.
+    """
+
+    def __init__(self, prs: int, projects: int, seed: int = 0, **faults: int) -> None:
+        self.projects = project_names(projects)
+        self._arguments = (prs, projects, seed, faults)
+        self._requests = multiprocessing.Value("q", 0)
+        self._bytes_sent = multiprocessing.Value("q", 0)
+        self._not_modified = multiprocessing.Value("q", 0)
+        self._process = None
+        self._port = None
+
+    @property
+    def api_base(self) -> str:
+        return f"http://127.0.0.1:{self._port}"
+
+    @property
+    def requests(self) -> int:
+        return self._requests.value
+
+    @property
+    def bytes_sent(self) -> int:
+        return self._bytes_sent.value
+
+    @property
+    def not_modified(self) -> int:
+        return self._not_modified.value
+
+    def __enter__(self) -> "MockGitHub":
+        ready, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=serve, args=(*self._arguments, child, self._requests, self._bytes_sent, self._not_modified), daemon=True
+        )
+        self._process.start()
+        self._port = ready.recv()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._process.terminate()
+        self._process.join()
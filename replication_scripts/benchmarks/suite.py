@@ -0,0 +1,194 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analysis import AnalysisContext, run_findings
+from benchmarks.mock_github import MockGitHub
+from benchmarks.synthetic import write_datasets
+from collect_pr import collect_pull_requests
+from collect_release import collect_releases
+from config import resolve_input_path
+from findings import select_findings
+from github_api import build_headers, configure_cache, configure_session
+from pr_features import annotate_pull_requests
+from streaming import StreamingContext
+
+BENCHMARKS_DIR = "outputs/benchmarks"
+DEFAULT_SCALES = ["10000x5", "100000x100", "1000000x1000"]
+
+
+def parse_scale(value: str) -> tuple[int, int]:
+    """'100000x100' -> (100000 PRs, 100 projects)."""
+    prs, _, projects = value.partition("x")
+    return int(prs), int(projects)
+
+
+def measure(repeat: int, function, *args) -> dict:
+    """Best wall time of `repeat` calls, and the traced peak memory of one more call.
+
+    The peak comes from a separate run because tracemalloc slows allocation-heavy code (the HTTP
+    clients most of all) several times over. The function's prints are swallowed.
+    """
+    seconds = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function(*args)
+            seconds.append(time.perf_counter() - started)
+        tracemalloc.start()
+        function(*args)
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return {"seconds": round(min(seconds), 4), "peak_memory_mb": round(peak_mb, 1)}
+
+
+def run_analysis(findings, paths: dict, stream: bool) -> None:
+    context = StreamingContext(findings, paths) if stream else AnalysisContext(findings, paths)
+    try:
+        run_findings(findings, context)
+    finally:
+        context.close()
+
+
+def analysis_benchmarks(prs: int, projects: int, modes: list[str], repeat: int, workdir: Path) -> list[dict]:
+    """Every finding on its own (including its dataset load) and all findings sharing one context."""
+    prs_path, releases_path = write_datasets(workdir / f"{prs}x{projects}", prs, projects)
+    paths = {"pull_requests": str(prs_path), "releases": str(releases_path)}
+    findings = select_findings()
+    results = []
+    for mode in modes:
+        for name, selected in [*((item.id, [item]) for item in findings), ("all", findings)]:
+            timing = measure(repeat, run_analysis, selected, paths, mode == "stream")
+            results.append({"benchmark": f"analysis.{name}", "mode": mode, "prs": prs, "projects": projects, **timing})
+            print(f"  {results[-1]['benchmark']:<24} {mode:<7} {timing['seconds']:>9.3f}s {timing['peak_memory_mb']:>9.1f} MB")
+    return results
+
+
+def collector_benchmarks(prs: int, projects: int, workers: int, repeat: int, workdir: Path) -> list[dict]:
+    """Both collectors (REST, concurrent REST and GraphQL PR backends) against a local mock GitHub."""
+    configure_cache(None)
+    configure_session(max(workers, 1))
+    headers = build_headers(None)
+    output = workdir / "collected" / "pull_requests.csv"
+    results = []
+    with MockGitHub(prs, projects) as github:
+        runs = [
+            ("collect_pr.rest", collect_pull_requests, (github.api_base, headers, output, 1, False, None, "rest", 50, github.projects)),
+            ("collect_pr.graphql", collect_pull_requests, (github.api_base, headers, output, 1, False, None, "graphql", 50, github.projects)),
+            ("pr_features", annotate_pull_requests, (output,)),
+            ("collect_release", collect_releases, (github.api_base, headers, output.with_name("releases.csv"), github.projects)),
+        ]
+        if workers > 1:
+            arguments = (github.api_base, headers, output, workers, False, None, "rest", 50, github.projects)
+            runs.insert(1, (f"collect_pr.rest.workers{workers}", collect_pull_requests, arguments))
+        for name, function, arguments in runs:
+            requests_before, bytes_before = github.requests, github.bytes_sent
+            timing = measure(repeat, function, *arguments)
+            results.append(
+                {
+                    "benchmark": name,
+                    "mode": None,
+                    "prs": prs,
+                    "projects": projects,
+                    **timing,
+                    "requests": (github.requests - requests_before) // (repeat + 1),
+                    "response_mb": round((github.bytes_sent - bytes_before) / (repeat + 1) / 2**20, 2),
+                }
+            )
+            print(f"  {name:<24} {'':<7} {timing['seconds']:>9.3f}s {timing['peak_memory_mb']:>9.1f} MB  {results[-1]['requests']} requests")
+    return results
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=Path(__file__).parent, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def compare(results: list[dict], baseline_path: Path) -> None:
+    """Print the time and memory of each benchmark relative to the same benchmark in a previous results file."""
+    key = lambda entry: (entry["benchmark"], entry["mode"], entry["prs"], entry["projects"])  # noqa: E731
+    baseline = {key(entry): entry for entry in json.loads(baseline_path.read_text(encoding="utf-8"))["results"]}
+    print(f"Compared with {baseline_path}:")
+    for entry in results:
+        before = baseline.get(key(entry))
+        if before is None:
+            continue
+        print(
+            f"  {entry['benchmark']:<24} {entry['mode'] or '':<7} {entry['prs']:>8}x{entry['projects']:<5}"
+            f" time x{entry['seconds'] / before['seconds']:.2f}  memory x{entry['peak_memory_mb'] / max(before['peak_memory_mb'], 0.1):.2f}"
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Time and memory-profile the RQ analyses and the collectors on synthetic data.")
+    parser.add_argument(
+        "--scale",
+        action="append",
+        help=f"Analysis dataset size as PRSxPROJECTS; repeatable (default: {' '.join(DEFAULT_SCALES)}).",
+    )
+    parser.add_argument("--stream", action="store_true", help="Also benchmark the analyses in --stream mode.")
+    parser.add_argument("--collector-scale", default="2000x5", help="PRSxPROJECTS served by the mock GitHub.")
+    parser.add_argument("--workers", type=int, default=8, help="Detail workers of the concurrent REST collector run.")
+    parser.add_argument("--skip-analyses", action="store_true")
+    parser.add_argument("--skip-collectors", action="store_true")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per benchmark; the fastest is recorded.")
+    parser.add_argument("--output", help=f"Results JSON (default: {BENCHMARKS_DIR}/<UTC time>.json).")
+    parser.add_argument("--compare", type=Path, help="Previous results JSON to compare against.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    started_at = datetime.now(timezone.utc)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="replication-bench-") as workdir:
+        if not args.skip_analyses:
+            modes = ["memory", "stream"] if args.stream else ["memory"]
+            for prs, projects in map(parse_scale, args.scale or DEFAULT_SCALES):
+                print(f"Analyses on {prs} PRs over {projects} projects:")
+                results += analysis_benchmarks(prs, projects, modes, args.repeat, Path(workdir))
+        if not args.skip_collectors:
+            prs, projects = parse_scale(args.collector_scale)
+            print(f"Collectors against a mock GitHub with {prs} PRs over {projects} projects:")
+            results += collector_benchmarks(prs, projects, args.workers, args.repeat, Path(workdir))
+
+    output_path = resolve_input_path(args.output or f"{BENCHMARKS_DIR}/{started_at:%Y%m%dT%H%M%SZ}.json")
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "generated_at": started_at.isoformat(timespec="seconds"),
+        "environment": environment(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    output_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"Wrote {output_path}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config import CI, NO_CI
+
+# PRs are opened between these dates; each project adopts CI at a random point in the middle half.
+START = np.datetime64("2012-01-01T00:00:00", "s")
+END = np.datetime64("2018-01-01T00:00:00", "s")
+HOUR = 3600
+
+
+def project_names(projects: int) -> list[str]:
+    return [f"bench-org{i}/repo{i}" for i in range(projects)]
+
+
+def project_sizes(total: int, projects: int, rng: np.random.Generator) -> np.ndarray:
+    """Split `total` rows over the projects with log-normal weights (a few large projects, many small ones)."""
+    weights = rng.lognormal(0, 1, projects)
+    sizes = np.floor(weights / weights.sum() * (total - 2 * projects)).astype(np.int64) + 2
+    sizes[: total - sizes.sum()] += 1
+    return sizes
+
+
+def adoption_dates(projects: int, rng: np.random.Generator) -> np.ndarray:
+    span = (END - START).astype(np.int64)
+    return START + (span * rng.uniform(0.25, 0.75, projects)).astype("timedelta64[s]")
+
+
+def generate_pull_requests(prs: int, projects: int, seed: int = 0) -> pd.DataFrame:
+    """Merged PRs shaped like pull_requests_meta_data.csv plus the author/created_at/merged_at columns.
+
+    Both generators draw the project sizes and CI adoption dates first from the same seed, so the
+    PR and release tables of one (prs, projects, seed) describe the same projects.
+    """
+    rng = np.random.default_rng(seed)
+    names = project_names(projects)
+    adopted = adoption_dates(projects, rng)
+    codes = np.repeat(np.arange(projects), project_sizes(prs, projects, rng))
+
+    span = (END - START).astype(np.int64)
+    offsets = rng.integers(0, span, prs)
+    created = START + offsets[np.lexsort((offsets, codes))].astype("timedelta64[s]")
+    # PRs opened after the adoption merge more slowly but are delivered sooner, as in the paper,
+    # so every finding has significant projects to report on.
+    is_ci = created >= adopted[codes]
+    merge_hours = np.round(rng.lognormal(np.where(is_ci, 3.0, 2.3), 1.8), 1)
+    merged = created + (merge_hours * HOUR).astype("timedelta64[s]")
+    delivery = np.round(rng.lognormal(np.where(is_ci, 4.5, 5.0), 1.5), 1)
+    delivery[rng.random(prs) < 0.05] = np.nan  # not yet released
+
+    commits = rng.geometric(0.3, prs)
+    authors = max(prs // 20, 1)
+    comments = rng.poisson(2, prs)
+    return pd.DataFrame(
+        {
+            "": np.arange(1, prs + 1),
+            "X.": np.arange(1, prs + 1),
+            "project": pd.Categorical.from_codes(codes, names),
+            "language": rng.choice(["Java", "JavaScript", "PHP", "Python", "Ruby"], projects)[codes],
+            "pull_id": rng.permutation(prs) + 10_000_000,
+            # One pull_number sequence per project, as on GitHub
+            "pull_number": np.arange(prs) - np.searchsorted(codes, codes) + 1,
+            "commits_per_pr": commits,
+            "changed_files": rng.geometric(0.2, prs),
+            "churn": np.round(rng.lognormal(4, 2, prs)).astype(np.int64),
+            "comments": comments,
+            "comments_interval": np.round(merge_hours / (comments + 1), 2),
+            "merge_workload": rng.poisson(10, prs),
+            "description_length": rng.poisson(300, prs),
+            "contributor_experience": rng.geometric(0.05, prs) - 1,
+            "queue_rank": rng.poisson(5, prs),
+            "contributor_integration": np.round(rng.lognormal(4.5, 1.5, prs), 1),
+            "stacktrace_attached": (rng.random(prs) < 0.05).astype(np.int64),
+            "activities": commits + comments + rng.poisson(1, prs),
+            "merge_time": merge_hours,
+            "delivery_time": delivery,
+            "practice": np.where(is_ci, CI, NO_CI),
+            "author": pd.Categorical.from_codes(rng.integers(0, authors, prs), [f"user{i}" for i in range(authors)]),
+            "created_at": np.datetime_as_string(created, unit="s", timezone="UTC"),
+            "merged_at": np.datetime_as_string(merged, unit="s", timezone="UTC"),
+        }
+    )
+
+
+def generate_releases(prs: int, projects: int, seed: int = 0) -> pd.DataFrame:
+    """Stable releases shaped like releases_meta_data.csv, about one per 20 PRs of a project (at least 4)."""
+    rng = np.random.default_rng(seed)
+    names = project_names(projects)
+    adopted = adoption_dates(projects, rng)
+    counts = np.maximum(project_sizes(prs, projects, rng) // 20, 4)
+    codes = np.repeat(np.arange(projects), counts)
+
+    span = (END - START).astype(np.int64)
+    published = START + rng.integers(0, span, len(codes)).astype("timedelta64[s]")
+    # Newest release first within each project, like the collector writes them
+    order = np.lexsort((-published.astype(np.int64), codes))
+    codes, published = codes[order], published[order]
+    first = np.flatnonzero(np.diff(codes, prepend=-1))
+    started = np.roll(published, -1) + np.timedelta64(1, "s")
+    last = np.append(first[1:], len(codes)) - 1
+    started[last] = published[last] - (rng.integers(1, 60, len(last)) * 86400).astype("timedelta64[s]")
+
+    created = rng.poisson(20, len(codes))
+    merged = rng.binomial(created, 0.8)
+    return pd.DataFrame(
+        {
+            "project": np.asarray(names)[codes],
+            "title": [f"v1.{i}" for i in range(len(codes))],
+            "startedAt": pd.to_datetime(started).strftime("%Y-%m-%d %H:%M:%S"),
+            "publishedAt": pd.to_datetime(published).strftime("%Y-%m-%d %H:%M:%S"),
+            "release_duration": ((published - started).astype(np.int64) // 86400),
+            "created_pull_requests": created,
+            "merged_pull_requests": merged,
+            "released_pull_requests": rng.binomial(merged, 0.9),
+            "sum_submitted_pr_churn": rng.poisson(2000, len(codes)),
+            "practice": np.where(published >= adopted[codes], CI, NO_CI),
+        }
+    )
+
+
+def write_datasets(directory: Path, prs: int, projects: int, seed: int = 0) -> tuple[Path, Path]:
+    """Write pull_requests.csv and releases_meta_data.csv for one scale into directory."""
+    directory.mkdir(parents=True, exist_ok=True)
+    prs_path = directory / "pull_requests.csv"
+    releases_path = directory / "releases_meta_data.csv"
+    generate_pull_requests(prs, projects, seed).to_csv(prs_path, index=False)
+    generate_releases(prs, projects, seed).to_csv(releases_path, index=False)
+    return prs_path, releases_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write synthetic PR and release datasets for benchmarks.")
+    parser.add_argument("output_dir", type=Path)
+    parser.add_argument("--prs", type=int, default=100_000)
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    for path in write_datasets(args.output_dir, args.prs, args.projects, args.seed):
+        print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import json
+import os
+from pathlib import Path
+
+
+class Checkpoint:
+    """Per-project crawl progress stored next to the output CSV."""
+
+    def __init__(self, path: Path, data: dict | None = None) -> None:
+        self.path = path
+        self.data = data or {"last_run": None, "projects": {}}
+
+    @classmethod
+    def for_output(cls, output_path: Path) -> "Checkpoint":
+        path = output_path.with_name(output_path.stem + ".checkpoint.json")
+        if path.exists():
+            return cls(path, json.loads(path.read_text(encoding="utf-8")))
+        return cls(path)
+
+    @property
+    def last_run(self) -> str | None:
+        return self.data.get("last_run")
+
+    def project(self, repo: str) -> dict:
+        return self.data["projects"].setdefault(repo, {"listed": 0, "done": False})
+
+    def reset_projects(self) -> None:
+        self.data["projects"] = {}
+
+    def finish_run(self, started_at: str) -> None:
+        self.data["last_run"] = started_at
+        self.save()
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.data, indent=2), encoding="utf-8")
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,173 @@
+import argparse
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config import CI, CI_ADOPTION_CSV, GIT_MIRRORS_DIR, NO_CI, OUTPUT_CSV, RELEASES_OUTPUT_CSV, resolve_input_path
+from timestamps import MISSING, to_epoch_seconds
+
+GIT_BASE = "https://github.com"
+# Pathspecs of CI service configurations; the first commit adding any of them marks the adoption.
+CI_CONFIG_PATHS = (
+    ".travis.yml",
+    ".github/workflows/",
+    ".circleci/config.yml",
+    "appveyor.yml",
+    ".appveyor.yml",
+    ".gitlab-ci.yml",
+    "azure-pipelines.yml",
+    ".drone.yml",
+    "Jenkinsfile",
+)
+ADOPTION_COLUMNS = ["project", "adopted_at", "commit", "path"]
+
+
+def git(*args: str, cwd: Path | None = None) -> str:
+    result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def mirror_path(mirrors: Path, repo: str) -> Path:
+    return mirrors / f"{repo.replace('/', '__')}.git"
+
+
+def update_mirror(repo: str, mirrors: Path, base: str = GIT_BASE, fetch: bool = True) -> Path:
+    """Clone `repo` as a bare, blob-less mirror on first use, else fetch its branches into the mirror.
+
+    Only commits and trees are transferred: the adoption walk needs the paths a commit adds,
+    never the file contents.
+    """
+    path = mirror_path(mirrors, repo)
+    if not path.exists():
+        if not fetch:
+            raise SystemExit(f"No mirror of {repo} at {path}; run without --offline first.")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        git("clone", "--bare", "--quiet", "--filter=blob:none", f"{base.rstrip('/')}/{repo}", str(path))
+    elif fetch:
+        git("fetch", "--quiet", "--prune", "origin", "+refs/heads/*:refs/heads/*", cwd=path)
+    return path
+
+
+def find_adoption(path: Path, config_paths: tuple[str, ...] = CI_CONFIG_PATHS) -> tuple[int, str, str] | None:
+    """(commit time, commit, added path) of the earliest commit on HEAD adding a CI configuration, if any.
+
+    A single `git log` walks the history once, limited to commits that add one of the pathspecs.
+    """
+    output = git("log", "--diff-filter=A", "--no-renames", "--name-only", "--format=%x00%ct %h", "HEAD", "--", *config_paths, cwd=path)
+    adoption = None
+    for entry in output.split("\0")[1:]:
+        header, _, names = entry.partition("\n")
+        seconds, commit = header.split()
+        if adoption is None or int(seconds) <= adoption[0]:
+            adoption = (int(seconds), commit, names.strip().partition("\n")[0])
+    return adoption
+
+
+def find_adoptions(projects: list[str], mirrors: Path, base: str = GIT_BASE, fetch: bool = True, jobs: int = 4) -> pd.DataFrame:
+    """One row per project: when, in which commit and with which file it adopted CI (blank if never)."""
+
+    def adoption(repo: str) -> dict:
+        found = find_adoption(update_mirror(repo, mirrors, base, fetch))
+        if found is None:
+            return {"project": repo, "adopted_at": "", "commit": "", "path": ""}
+        seconds, commit, path = found
+        adopted_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(seconds))
+        return {"project": repo, "adopted_at": adopted_at, "commit": commit, "path": path}
+
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        return pd.DataFrame(list(executor.map(adoption, projects)), columns=ADOPTION_COLUMNS)
+
+
+def label_practice(projects: pd.Series, timestamps: pd.Series, adoptions: pd.DataFrame) -> np.ndarray:
+    """CI for rows at or after their project's adoption, NO-CI before it or when the project never adopted CI."""
+    adopted = adoptions.loc[adoptions["adopted_at"] != ""].set_index("project")["adopted_at"]
+    # Never-adopted projects map to MISSING, the smallest int64, so they are masked before comparing.
+    seconds = to_epoch_seconds(projects.map(adopted))
+    return np.where((seconds != MISSING) & (to_epoch_seconds(timestamps) >= seconds), CI, NO_CI)
+
+
+def read_collected(path: Path) -> pd.DataFrame:
+    # The collected PRs' unnamed index column reads back as "Unnamed: 0"
+    return pd.read_csv(path, dtype=str, keep_default_na=False).rename(columns={"Unnamed: 0": ""})
+
+
+def label_collected(path: Path, timestamp_column: str, mirrors: Path, base: str = GIT_BASE, jobs: int = 4) -> pd.DataFrame:
+    """Label the practice of every row of a collected CSV in place; returns the projects' adoptions."""
+    frame = read_collected(path)
+    adoptions = find_adoptions(list(dict.fromkeys(frame["project"])), mirrors, base, jobs=jobs)
+    frame["practice"] = label_practice(frame["project"], frame[timestamp_column], adoptions)
+    frame.to_csv(path, index=False)
+    print(f"Labelled {(frame['practice'] == CI).sum()}/{len(frame)} rows of {path} as CI.")
+    return adoptions
+
+
+def add_label_arguments(parser: argparse.ArgumentParser) -> None:
+    """Options of the collectors for labelling their output with ci_adoption once collected."""
+    parser.add_argument(
+        "--label-practice",
+        action="store_true",
+        help="Label each row CI or NO-CI from its project's git history (else practice stays blank until ci_adoption.py runs).",
+    )
+    parser.add_argument("--mirrors", default=GIT_MIRRORS_DIR, help="Directory of the bare git mirrors used by --label-practice.")
+    parser.add_argument(
+        "--git-base",
+        default=os.getenv("GIT_BASE", GIT_BASE),
+        help="Base URL or directory the repositories are cloned from, as <base>/<owner>/<repo>.",
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Date each project's CI adoption from a local git mirror and label the collected PRs and releases."
+    )
+    parser.add_argument("--prs", default=OUTPUT_CSV, help="PR CSV to update in place.")
+    parser.add_argument("--releases", default=RELEASES_OUTPUT_CSV, help="Release CSV to update in place.")
+    parser.add_argument("--output", default=CI_ADOPTION_CSV, help="CSV of the adoption date, commit and file per project.")
+    parser.add_argument("--mirrors", default=GIT_MIRRORS_DIR, help="Directory of the bare git mirrors (relative to repo root or absolute).")
+    parser.add_argument(
+        "--git-base",
+        default=os.getenv("GIT_BASE", GIT_BASE),
+        help="Base URL or directory the repositories are cloned from, as <base>/<owner>/<repo>.",
+    )
+    parser.add_argument("--offline", action="store_true", help="Use the existing mirrors without fetching.")
+    parser.add_argument("--jobs", type=int, default=4, help="Mirrors cloned or fetched at once.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    prs_path = resolve_input_path(args.prs)
+    releases_path = resolve_input_path(args.releases)
+
+    started = time.perf_counter()
+    prs = read_collected(prs_path)
+    releases = read_collected(releases_path)
+    projects = list(dict.fromkeys([*prs["project"], *releases["project"]]))
+    adoptions = find_adoptions(projects, resolve_input_path(args.mirrors), args.git_base, not args.offline, args.jobs)
+    prs["practice"] = label_practice(prs["project"], prs["created_at"], adoptions)
+    releases["practice"] = label_practice(releases["project"], releases["publishedAt"], adoptions)
+
+    output_path = resolve_input_path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    adoptions.to_csv(output_path, index=False)
+    prs.to_csv(prs_path, index=False)
+    releases.to_csv(releases_path, index=False)
+
+    for row in adoptions.itertuples():
+        print(f"{row.project}: " + (f"CI since {row.adopted_at} ({row.path} in {row.commit})" if row.adopted_at else "no CI configuration found"))
+    print(
+        f"Labelled {(prs['practice'] == CI).sum()}/{len(prs)} PRs and {(releases['practice'] == CI).sum()}/{len(releases)}"
+        f" releases as CI in {time.perf_counter() - started:.2f}s."
+    )
+    print(f"Done. Wrote {prs_path}, {releases_path} and {output_path}")
+
+
+if __name__ == "__main__":
+    main()
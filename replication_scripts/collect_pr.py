@@ -2,13 +2,36 @@ import argparse
 import csv
 import os
 import time
-from datetime import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from operator import itemgetter
 from pathlib import Path
 
-import requests
 from dotenv import load_dotenv
 
-from config import OUTPUT_CSV, PROJECTS
+from archive import PULL_REQUEST, ResponseArchive, add_archive_arguments, archive_path, archived, iter_archive
+from checkpoint import Checkpoint
+from ci_adoption import add_label_arguments, label_collected
+from config import HTTP_CACHE_PATH, OUTPUT_CSV, PROJECTS
+from github_api import (
+	add_cache_arguments,
+	add_telemetry_arguments,
+	build_headers,
+	configure_cache,
+	configure_session,
+	configure_telemetry,
+	configure_tokens,
+	finish_telemetry,
+	get_with_rate_limit,
+	read_tokens,
+)
+from github_graphql import DEFAULT_PAGE_SIZE, iter_merged_pull_requests
+from pr_features import annotate_pull_requests
+from shards import add_shard_arguments, is_sharded, merge_shards, run_sharded, shard_dir, shard_path
+from timestamps import HOUR, epoch_seconds
+
+PER_PAGE = 100
 
 # Language mappings for repositories (can be extended)
 LANGUAGE_MAP = {
@@ -19,36 +42,50 @@ LANGUAGE_MAP = {
 	"laravel/laravel": "PHP",
 }
 
-
-def build_headers(token: str | None) -> dict:
-	headers = {"Accept": "application/vnd.github.v3+json"}
-	if token:
-		headers["Authorization"] = f"token {token}"
-	return headers
-
-
-def get_with_rate_limit(url: str, headers: dict, params: dict | None = None) -> tuple[dict, dict]:
-	while True:
-		response = requests.get(url, headers=headers, params=params, timeout=30)
-		if response.status_code == 403 and response.headers.get("X-RateLimit-Remaining") == "0":
-			reset_at = int(response.headers.get("X-RateLimit-Reset", "0"))
-			wait_seconds = max(reset_at - int(time.time()), 5)
-			print(f"Rate limit reached. Sleeping for {wait_seconds}s...")
-			time.sleep(wait_seconds)
-			continue
-		response.raise_for_status()
-		return response.json(), response.headers
-
-
-def iter_pull_requests(api_base: str, repo: str, headers: dict):
-	page = 1
+FIELDS = [
+	"",
+	"X.",
+	"project",
+	"language",
+	"pull_id",
+	"pull_number",
+	"commits_per_pr",
+	"changed_files",
+	"churn",
+	"comments",
+	"comments_interval",
+	"merge_workload",
+	"description_length",
+	"contributor_experience",
+	"queue_rank",
+	"contributor_integration",
+	"stacktrace_attached",
+	"activities",
+	"merge_time",
+	"delivery_time",
+	"practice",
+	"author",
+	"created_at",
+	"merged_at",
+]
+# Columns added after the original layout; a CSV without them is upgraded before appending to it.
+ADDED_FIELDS = ["author", "created_at", "merged_at"]
+
+
+def iter_pull_requests(api_base: str, repo: str, headers: dict, start_page: int = 1, since: str | None = None):
+	"""Yield PRs newest first; with `since`, order by update time and stop at older PRs."""
+	page = start_page
 	while True:
 		url = f"{api_base}/repos/{repo}/pulls"
-		payload = {"state": "all", "per_page": 100, "page": page}
+		payload = {"state": "all", "per_page": PER_PAGE, "page": page}
+		if since:
+			payload.update(sort="updated", direction="desc")
 		data, _ = get_with_rate_limit(url, headers, payload)
 		if not data:
 			break
 		for pr in data:
+			if since and (pr.get("updated_at") or "") < since:
+				return
 			yield pr
 		page += 1
 
@@ -59,145 +96,281 @@ def fetch_pr_detail(api_base: str, repo: str, number: int, headers: dict) -> dic
 	return data
 
 
-def parse_timestamp(ts: str | None) -> float:
-	"""Convert ISO 8601 timestamp to hours since epoch-like reference."""
-	if not ts:
-		return 0.0
-	try:
-		dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-		return dt.timestamp() / 3600.0  # Convert to hours
-	except (ValueError, AttributeError):
-		return 0.0
+def iter_pr_details(pulls, api_base: str, repo: str, headers: dict, workers: int = 1, skip: set | None = None):
+	"""Yield (listing, detail) pairs in listing order, fetching details with up to `workers` threads.
+
+	PRs whose number is in `skip` are yielded with a None detail and never fetched.
+	"""
+	skip = skip or set()
+
+	def fetch(pr: dict) -> dict | None:
+		number = pr.get("number")
+		if number is None or number in skip:
+			return None
+		return fetch_pr_detail(api_base, repo, number, headers)
+
+	if workers <= 1:
+		for pr in pulls:
+			yield pr, fetch(pr)
+		return
+
+	window = workers * 4
+	pending = deque()
+	with ThreadPoolExecutor(max_workers=workers) as executor:
+		for pr in pulls:
+			pending.append((pr, executor.submit(fetch, pr)))
+			if len(pending) >= window:
+				listed, future = pending.popleft()
+				yield listed, future.result()
+		while pending:
+			listed, future = pending.popleft()
+			yield listed, future.result()
+
+
+def upgrade_layout(output_path: Path) -> bool:
+	"""Rewrite a CSV in the layout from before ADDED_FIELDS with those columns left blank."""
+	with output_path.open(newline="", encoding="utf-8") as csvfile:
+		reader = csv.DictReader(csvfile)
+		if reader.fieldnames != [field for field in FIELDS if field not in ADDED_FIELDS]:
+			return False
+		rows = list(reader)
+	upgraded = output_path.with_name(output_path.name + ".upgrade")
+	with upgraded.open("w", newline="", encoding="utf-8") as csvfile:
+		writer = csv.DictWriter(csvfile, fieldnames=FIELDS, restval="")
+		writer.writeheader()
+		writer.writerows(rows)
+	os.replace(upgraded, output_path)
+	print(f"Upgraded {output_path} to the current layout; its {len(rows)} existing rows have no {', '.join(ADDED_FIELDS)}.")
+	return True
+
+
+def read_written_rows(output_path: Path) -> tuple[int, dict[str, set[int]]]:
+	"""Return the last row index and the PR numbers per project already in the CSV."""
+	last_index = 0
+	written: dict[str, set[int]] = {}
+	if not output_path.exists():
+		return last_index, written
+	with output_path.open(newline="", encoding="utf-8") as csvfile:
+		reader = csv.DictReader(csvfile)
+		if reader.fieldnames != FIELDS:
+			raise SystemExit(
+				f"{output_path} has a different column layout (expected: {', '.join(FIELDS[2:])}); "
+				"collect into a new file instead of appending."
+			)
+		for row in reader:
+			try:
+				last_index = max(last_index, int(row[""]))
+				written.setdefault(row["project"], set()).add(int(row["pull_number"]))
+			except (KeyError, TypeError, ValueError):
+				continue
+	return last_index, written
+
+
+def normalize_since(value: str | None, checkpoint: Checkpoint) -> str | None:
+	if not value:
+		return None
+	if value == "last":
+		if not checkpoint.last_run:
+			raise SystemExit(f"--since last: no completed run recorded in {checkpoint.path}")
+		value = checkpoint.last_run
+	seconds = epoch_seconds(value)
+	if seconds is None:
+		raise SystemExit(f"--since expects an ISO 8601 timestamp or 'last', got {value!r}")
+	return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(seconds))
 
 
 def calculate_merge_time(created_at: str, merged_at: str) -> float:
 	"""Calculate merge time in hours."""
-	if not created_at or not merged_at:
-		return 0.0
-	try:
-		created = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
-		merged = datetime.fromisoformat(merged_at.replace("Z", "+00:00"))
-		delta_hours = (merged - created).total_seconds() / 3600.0
-		return max(delta_hours, 0.0)
-	except (ValueError, AttributeError):
+	created = epoch_seconds(created_at)
+	merged = epoch_seconds(merged_at)
+	if created is None or merged is None:
 		return 0.0
+	return max(merged - created, 0) / HOUR
 
 
 def ensure_parent_dir(path: Path) -> None:
 	path.parent.mkdir(parents=True, exist_ok=True)
 
 
-def collect_pull_requests(api_base: str, headers: dict, output_path: Path) -> None:
-	fields = [
-		"",
-		"X.",
-		"project",
-		"language",
-		"pull_id",
-		"pull_number",
-		"commits_per_pr",
-		"changed_files",
-		"churn",
-		"comments",
-		"comments_interval",
-		"merge_workload",
-		"description_length",
-		"contributor_experience",
-		"queue_rank",
-		"contributor_integration",
-		"stacktrace_attached",
-		"activities",
-		"merge_time",
-		"delivery_time",
-		"practice",
-	]
-
+def is_new_merged(detail: dict | None, written: set) -> bool:
+	"""Filter stage: a fetched, merged PR whose number is not in the CSV yet."""
+	return detail is not None and bool(detail.get("merged_at")) and detail.get("number") not in written
+
+
+def build_row(row_index: int, repo: str, language: str, detail: dict) -> dict:
+	# Extract basic info
+	created_at = detail.get("created_at")
+	merged_at = detail.get("merged_at")
+	pr_id = detail.get("id")
+
+	# Calculate derived metrics
+	additions = detail.get("additions", 0) or 0
+	deletions = detail.get("deletions", 0) or 0
+	churn = additions + deletions
+	commits_count = detail.get("commits", 0) or 0
+	changed_files_count = detail.get("changed_files", 0) or 0
+	comments_count = detail.get("comments", 0) or 0
+	review_comments_count = detail.get("review_comments", 0) or 0
+
+	# Calculate merge time (hours)
+	merge_time_hours = calculate_merge_time(created_at, merged_at)
+
+	# Use merge_time as delivery_time until release_join.py matches the PR to its release
+	delivery_time_hours = merge_time_hours
+
+	# Body/description length
+	body = detail.get("body") or ""
+	description_length = len(body)
+
+	# Cross-PR factors, filled in by pr_features.py once the whole history is collected
+	comments_interval = 0
+	merge_workload = 0
+	contributor_experience = 0
+	queue_rank = 0
+	contributor_integration = 0
+	stacktrace_attached = 1 if "stacktrace" in body.lower() or "traceback" in body.lower() else 0
+	activities = comments_count + review_comments_count + commits_count
+
+	# Left blank until ci_adoption.py labels the PR from its project's git history
+	practice = ""
+
+	return {
+		"": row_index,
+		"X.": row_index,
+		"project": repo,
+		"language": language,
+		"pull_id": pr_id,
+		"pull_number": detail.get("number"),
+		"commits_per_pr": commits_count,
+		"changed_files": changed_files_count,
+		"churn": churn,
+		"comments": comments_count,
+		"comments_interval": comments_interval,
+		"merge_workload": merge_workload,
+		"description_length": description_length,
+		"contributor_experience": contributor_experience,
+		"queue_rank": queue_rank,
+		"contributor_integration": contributor_integration,
+		"stacktrace_attached": stacktrace_attached,
+		"activities": activities,
+		"merge_time": merge_time_hours,
+		"delivery_time": delivery_time_hours,
+		"practice": practice,
+		"author": (detail.get("user") or {}).get("login") or "",
+		"created_at": created_at,
+		"merged_at": merged_at,
+	}
+
+
+def iter_rest_details(api_base: str, repo: str, headers: dict, progress: dict, skip: set, since: str | None, workers: int):
+	"""Yield (detail, checkpoint state) pairs from the REST listing plus one detail call per PR."""
+	# Listing offsets only grow as new PRs are opened, so restarting at the
+	# recorded page can re-list a few PRs but never miss one.
+	start_page = 1 if since else progress.get("listed", 0) // PER_PAGE + 1
+	listed = (start_page - 1) * PER_PAGE
+	pulls = iter_pull_requests(api_base, repo, headers, start_page, since)
+	for _, detail in iter_pr_details(pulls, api_base, repo, headers, workers, skip):
+		listed += 1
+		yield detail, ({"listed": listed} if not since and listed % PER_PAGE == 0 else None)
+
+
+def iter_graphql_details(api_base: str, repo: str, headers: dict, progress: dict, since: str | None, page_size: int):
+	"""Yield (detail, checkpoint state) pairs from batched GraphQL pages of merged PRs."""
+	after = None if since else progress.get("cursor")
+	for details, cursor in iter_merged_pull_requests(api_base, repo, headers, page_size, after, since):
+		for position, detail in enumerate(details, start=1):
+			yield detail, ({"cursor": cursor} if not since and position == len(details) else None)
+
+
+def collect_pull_requests(
+	api_base: str,
+	headers: dict,
+	output_path: Path,
+	workers: int = 1,
+	resume: bool = False,
+	since: str | None = None,
+	backend: str = "rest",
+	page_size: int = DEFAULT_PAGE_SIZE,
+	projects: list[str] | None = None,
+	archive_file: Path | None = None,
+) -> None:
+	"""Fetch -> archive -> filter -> transform -> write, one PR at a time.
+
+	Each fetched detail is appended to the NDJSON archive (if given) as it streams past, so the
+	CSV can later be re-derived offline by derive_pull_requests.
+	"""
 	ensure_parent_dir(output_path)
-
-	with output_path.open("w", newline="", encoding="utf-8") as csvfile:
-		writer = csv.DictWriter(csvfile, fieldnames=fields)
-		writer.writeheader()
-
-		row_index = 0
-		for repo in PROJECTS:
+	run_started_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+	checkpoint = Checkpoint.for_output(output_path)
+	since = normalize_since(since, checkpoint)
+	append = (resume or since is not None) and output_path.exists()
+	if not resume:
+		checkpoint.reset_projects()
+
+	if append:
+		upgrade_layout(output_path)
+	row_index, written = read_written_rows(output_path) if append else (0, {})
+	archive = ResponseArchive(archive_file, append) if archive_file else None
+
+	with output_path.open("a" if append else "w", newline="", encoding="utf-8") as csvfile:
+		writer = csv.DictWriter(csvfile, fieldnames=FIELDS)
+		if not append:
+			writer.writeheader()
+
+		for repo in projects or PROJECTS:
+			progress = checkpoint.project(repo)
+			if progress["done"]:
+				print(f"Skipping {repo} (already collected).")
+				continue
 			print(f"Collecting PRs from {repo}...")
 			language = LANGUAGE_MAP.get(repo, "Unknown")
-
-			for pr in iter_pull_requests(api_base, repo, headers):
-				number = pr.get("number")
-				if number is None:
-					continue
-
-				detail = fetch_pr_detail(api_base, repo, number, headers)
-				merged_at = detail.get("merged_at")
-				if not merged_at:
-					continue
-
+			skip = written.setdefault(repo, set())
+
+			if backend == "graphql":
+				details = iter_graphql_details(api_base, repo, headers, progress, since, page_size)
+			else:
+				details = iter_rest_details(api_base, repo, headers, progress, skip, since, workers)
+
+			for detail, state in archived(details, archive, PULL_REQUEST, repo, itemgetter(0)):
+				if is_new_merged(detail, skip):
+					row_index += 1
+					writer.writerow(build_row(row_index, repo, language, detail))
+					skip.add(detail.get("number"))
+					if row_index % 50 == 0:
+						print(f"  Processed {row_index} PRs...")
+				if state:
+					csvfile.flush()
+					if archive:
+						archive.flush()
+					progress.update(state)
+					checkpoint.save()
+
+			csvfile.flush()
+			if archive:
+				archive.flush()
+			progress["done"] = True
+			checkpoint.save()
+
+	if archive:
+		archive.close()
+	checkpoint.finish_run(run_started_at)
+
+
+def derive_pull_requests(archive_file: Path, output_path: Path) -> int:
+	"""Rewrite the PR CSV from the archived details of the last full run and its appends, offline."""
+	ensure_parent_dir(output_path)
+	row_index = 0
+	written: dict[str, set[int]] = {}
+	with output_path.open("w", newline="", encoding="utf-8") as csvfile:
+		writer = csv.DictWriter(csvfile, fieldnames=FIELDS)
+		writer.writeheader()
+		for repo, detail in iter_archive(archive_file, PULL_REQUEST):
+			skip = written.setdefault(repo, set())
+			if is_new_merged(detail, skip):
 				row_index += 1
-				
-				# Extract basic info
-				created_at = detail.get("created_at")
-				pr_id = detail.get("id")
-				
-				# Calculate derived metrics
-				additions = detail.get("additions", 0) or 0
-				deletions = detail.get("deletions", 0) or 0
-				churn = additions + deletions
-				commits_count = detail.get("commits", 0) or 0
-				changed_files_count = detail.get("changed_files", 0) or 0
-				comments_count = detail.get("comments", 0) or 0
-				review_comments_count = detail.get("review_comments", 0) or 0
-				
-				# Calculate merge time (hours)
-				merge_time_hours = calculate_merge_time(created_at, merged_at)
-				
-				# Use merge_time as delivery_time (can be refined later)
-				delivery_time_hours = merge_time_hours
-				
-				# Body/description length
-				body = detail.get("body") or ""
-				description_length = len(body)
-				
-				# Placeholder values (not available from GitHub API directly)
-				comments_interval = 0  # Would need to analyze comment timestamps
-				merge_workload = 0  # Would need release data
-				contributor_experience = 0  # Would need historical contributor data
-				queue_rank = 0  # Would need temporal analysis
-				contributor_integration = 0  # Would need contribution history
-				stacktrace_attached = 1 if "stacktrace" in body.lower() or "traceback" in body.lower() else 0
-				activities = comments_count + review_comments_count + commits_count
-				
-				# Determine practice (placeholder - would need CI detection logic)
-				practice = "CI"  # Default to CI; would need release/commit analysis to determine
-
-				writer.writerow(
-					{
-						"": row_index,
-						"X.": row_index,
-						"project": repo,
-						"language": language,
-						"pull_id": pr_id,
-						"pull_number": number,
-						"commits_per_pr": commits_count,
-						"changed_files": changed_files_count,
-						"churn": churn,
-						"comments": comments_count,
-						"comments_interval": comments_interval,
-						"merge_workload": merge_workload,
-						"description_length": description_length,
-						"contributor_experience": contributor_experience,
-						"queue_rank": queue_rank,
-						"contributor_integration": contributor_integration,
-						"stacktrace_attached": stacktrace_attached,
-						"activities": activities,
-						"merge_time": merge_time_hours,
-						"delivery_time": delivery_time_hours,
-						"practice": practice,
-					}
-				)
-				
-				if row_index % 50 == 0:
-					print(f"  Processed {row_index} PRs...")
+				writer.writerow(build_row(row_index, repo, LANGUAGE_MAP.get(repo, "Unknown"), detail))
+				skip.add(detail.get("number"))
+	return row_index
 
 
 def parse_args(default_output: str) -> argparse.Namespace:
@@ -207,6 +380,38 @@ def parse_args(default_output: str) -> argparse.Namespace:
 		default=default_output,
 		help="Output CSV path (relative to repo root or absolute).",
 	)
+	parser.add_argument(
+		"--workers",
+		type=int,
+		default=1,
+		help="Number of PR detail requests to run concurrently.",
+	)
+	parser.add_argument(
+		"--resume",
+		action="store_true",
+		help="Continue an interrupted run from its checkpoint, appending to the existing CSV.",
+	)
+	parser.add_argument(
+		"--since",
+		help="Only fetch PRs updated after this ISO 8601 timestamp ('last' = start of the last completed run) and append them.",
+	)
+	parser.add_argument(
+		"--backend",
+		choices=("rest", "graphql"),
+		default="rest",
+		help="REST makes one detail call per PR; GraphQL fetches the metrics for a whole page of merged PRs at once.",
+	)
+	parser.add_argument(
+		"--page-size",
+		type=int,
+		default=DEFAULT_PAGE_SIZE,
+		help="Merged PRs per GraphQL query (max 100).",
+	)
+	add_label_arguments(parser)
+	add_shard_arguments(parser)
+	add_archive_arguments(parser)
+	add_cache_arguments(parser, HTTP_CACHE_PATH)
+	add_telemetry_arguments(parser)
 	return parser.parse_args()
 
 
@@ -218,19 +423,92 @@ def resolve_output_path(output: str) -> Path:
 	return repo_root / output_path
 
 
+def configure_clients(args: argparse.Namespace, repo: str | None = None) -> None:
+	configure_cache(
+		None if args.no_cache else resolve_output_path(args.cache),
+		args.cache_ttl_days,
+		args.cache_max_mb,
+		args.offline,
+	)
+	configure_session(max(args.workers, 1))
+	# Each shard process exports its own telemetry file under <telemetry>.shards/
+	telemetry_path = resolve_output_path(args.telemetry) if args.telemetry else None
+	if telemetry_path and repo:
+		telemetry_path = shard_path(telemetry_path, repo)
+	configure_telemetry(telemetry_path, not args.no_telemetry)
+	configure_tokens(read_tokens())
+
+
+def run_collection(
+	api_base: str,
+	headers: dict,
+	output_path: Path,
+	args: argparse.Namespace,
+	projects: list[str] | None = None,
+	archive_file: Path | None = None,
+) -> None:
+	if args.from_archive:
+		total = derive_pull_requests(archive_file, output_path)
+		print(f"Derived {total} PRs from {archive_file}")
+		return
+	collect_pull_requests(
+		api_base,
+		headers,
+		output_path,
+		args.workers,
+		args.resume,
+		args.since,
+		args.backend,
+		min(max(args.page_size, 1), 100),
+		projects,
+		archive_file,
+	)
+
+
+def collect_project_shard(repo: str, api_base: str, headers: dict, output_path: Path, args: argparse.Namespace) -> None:
+	configure_clients(args, repo)
+	archive_file = archive_path(args, output_path)
+	try:
+		run_collection(
+			api_base, headers, shard_path(output_path, repo), args, [repo], archive_file and shard_path(archive_file, repo)
+		)
+	finally:
+		finish_telemetry()
+
+
 def main() -> None:
 	load_dotenv()
-	token = os.getenv("GITHUB_TOKEN")
-	if not token:
-		raise SystemExit("Missing GITHUB_TOKEN. Set it in replication_scripts/.env")
+	args = parse_args(OUTPUT_CSV)
+	tokens = read_tokens()
+	if not tokens and not (args.offline or args.from_archive):
+		raise SystemExit("Missing GITHUB_TOKEN (or GITHUB_TOKENS). Set it in replication_scripts/.env")
+	if args.backend == "graphql" and args.offline:
+		raise SystemExit("--offline only works with the REST backend; GraphQL responses are not cached.")
 
 	api_base = os.getenv("GITHUB_API_BASE", "https://api.github.com").rstrip("/")
-	args = parse_args(OUTPUT_CSV)
 	output_path = resolve_output_path(args.output)
-	headers = build_headers(token)
-
-	collect_pull_requests(api_base, headers, output_path)
-	print(f"Done. Wrote {output_path}")
+	headers = build_headers(tokens[0] if tokens else None)
+
+	if not is_sharded(args):
+		configure_clients(args)
+		try:
+			run_collection(api_base, headers, output_path, args, archive_file=archive_path(args, output_path))
+		finally:
+			finish_telemetry()
+		annotate_pull_requests(output_path)
+		if args.label_practice:
+			label_collected(output_path, "created_at", resolve_output_path(args.mirrors), args.git_base)
+		print(f"Done. Wrote {output_path}")
+		return
+
+	failed = run_sharded(collect_project_shard, args.projects or PROJECTS, args.jobs, api_base, headers, output_path, args)
+	if failed:
+		raise SystemExit(f"Some projects failed; retry them with --projects {' '.join(failed)}")
+	total = merge_shards(output_path, PROJECTS, ("", "X."))
+	annotate_pull_requests(output_path)
+	if args.label_practice:
+		label_collected(output_path, "created_at", resolve_output_path(args.mirrors), args.git_base)
+	print(f"Done. Merged {total} PRs from {shard_dir(output_path)} into {output_path}")
 
 
 if __name__ == "__main__":
@@ -1,40 +1,46 @@
 import argparse
 import csv
 import os
-import time
-from datetime import datetime, timedelta, timezone
+from array import array
 from pathlib import Path
 
-import requests
+import numpy as np
 from dotenv import load_dotenv
 
-from config import PROJECTS, RELEASES_OUTPUT_CSV
+from archive import RELEASE, ResponseArchive, add_archive_arguments, archive_path, archived, iter_archive
+from ci_adoption import add_label_arguments, label_collected
+from config import HTTP_CACHE_PATH, PROJECTS, RELEASES_OUTPUT_CSV
+from github_api import (
+    add_cache_arguments,
+    add_telemetry_arguments,
+    build_headers,
+    configure_cache,
+    configure_telemetry,
+    configure_tokens,
+    finish_telemetry,
+    get_with_rate_limit,
+    read_tokens,
+)
+from shards import add_shard_arguments, is_sharded, merge_shards, run_sharded, shard_dir, shard_path
+from timestamps import DAY, epoch_seconds, format_epoch_seconds
 
 UNSTABLE_TAG_TOKENS = ("alpha", "beta", "rc", "pre", "dev")
-DEFAULT_PRACTICE = "CI"
-
-
-def build_headers(token: str | None) -> dict:
-    headers = {"Accept": "application/vnd.github.v3+json"}
-    if token:
-        headers["Authorization"] = f"token {token}"
-    return headers
-
-
-def get_with_rate_limit(url: str, headers: dict, params: dict | None = None) -> tuple[list | dict, dict]:
-    while True:
-        response = requests.get(url, headers=headers, params=params, timeout=30)
-        if response.status_code == 403 and response.headers.get("X-RateLimit-Remaining") == "0":
-            reset_at = int(response.headers.get("X-RateLimit-Reset", "0"))
-            wait_seconds = max(reset_at - int(time.time()), 5)
-            print(f"Rate limit reached. Sleeping for {wait_seconds}s...")
-            time.sleep(wait_seconds)
-            continue
-        response.raise_for_status()
-        return response.json(), response.headers
+FIELDS = [
+    "project",
+    "title",
+    "startedAt",
+    "publishedAt",
+    "release_duration",
+    "created_pull_requests",
+    "merged_pull_requests",
+    "released_pull_requests",
+    "sum_submitted_pr_churn",
+    "practice",
+]
 
 
 def iter_releases(api_base: str, repo: str, headers: dict):
+    """Yield every release of the repo, one page of at most 100 in memory."""
     page = 1
     while True:
         url = f"{api_base}/repos/{repo}/releases"
@@ -47,104 +53,127 @@ def iter_releases(api_base: str, repo: str, headers: dict):
         page += 1
 
 
-def is_stable_release(tag_name: str, prerelease: bool, draft: bool) -> bool:
+def is_stable_release(tag_name: str, prerelease: bool, draft: bool, unstable_tokens=UNSTABLE_TAG_TOKENS) -> bool:
     if prerelease or draft:
         return False
     lowered = (tag_name or "").lower()
-    return not any(token in lowered for token in UNSTABLE_TAG_TOKENS)
+    return not any(token in lowered for token in unstable_tokens)
 
 
 def ensure_parent_dir(path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
 
 
-def parse_github_datetime(value: str | None) -> datetime | None:
-    if not value:
-        return None
-    try:
-        return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc)
-    except ValueError:
-        return None
-
-
-def to_output_datetime(value: datetime | None) -> str:
-    if not value:
-        return ""
-    return value.strftime("%Y-%m-%d %H:%M:%S")
-
-
-def collect_releases(api_base: str, headers: dict, output_path: Path) -> None:
-    fields = [
-        "project",
-        "title",
-        "startedAt",
-        "publishedAt",
-        "release_duration",
-        "created_pull_requests",
-        "merged_pull_requests",
-        "released_pull_requests",
-        "sum_submitted_pr_churn",
-        "practice",
-    ]
-
+def release_columns() -> tuple[list[str], array, array]:
+    """Empty (tags, published, created) columns; the times are epoch seconds in int64 arrays."""
+    return [], array("q"), array("q")
+
+
+def add_stable_release(
+    columns: tuple[list[str], array, array], release: dict, unstable_tokens=UNSTABLE_TAG_TOKENS
+) -> None:
+    """Filter stage: append a stable, published release to the project's columns; skip anything else."""
+    tag_name = (release.get("tag_name") or "").strip()
+    published_at = epoch_seconds(release.get("published_at"))
+    if not tag_name or published_at is None:
+        return
+    prerelease = bool(release.get("prerelease", False))
+    if not is_stable_release(tag_name, prerelease, bool(release.get("draft", False)), unstable_tokens):
+        return
+    created_at = epoch_seconds(release.get("created_at"))
+    tags, published, created = columns
+    tags.append(tag_name)
+    published.append(published_at)
+    created.append(published_at if created_at is None else created_at)
+
+
+def release_rows(repo: str, columns: tuple[list[str], array, array]):
+    """Transform stage: CSV rows of one project's stable releases, newest first.
+
+    A release starts a second after the previous stable release was published; the oldest one
+    starts when it was created.
+    """
+    tags, published, created = columns
+    if not tags:
+        return
+    published = np.frombuffer(published, dtype=np.int64)
+    # A stable sort keeps releases published in the same second in API order.
+    order = np.argsort(-published, kind="stable")
+    published = published[order]
+    started = np.append(published[1:] + 1, np.frombuffer(created, dtype=np.int64)[order[-1]])
+    durations = np.maximum(published - started, 0) // DAY
+    for index, started_at, published_at, duration in zip(
+        order.tolist(), format_epoch_seconds(started), format_epoch_seconds(published), durations.tolist()
+    ):
+        yield {
+            "project": repo,
+            "title": tags[index],
+            "startedAt": started_at,
+            "publishedAt": published_at,
+            "release_duration": duration,
+            "created_pull_requests": 0,
+            "merged_pull_requests": 0,
+            "released_pull_requests": 0,
+            "sum_submitted_pr_churn": "",
+            "practice": "",  # labelled by ci_adoption.py
+        }
+
+
+def collect_releases(
+    api_base: str,
+    headers: dict,
+    output_path: Path,
+    projects: list[str] | None = None,
+    archive_file: Path | None = None,
+    unstable_tokens=UNSTABLE_TAG_TOKENS,
+) -> None:
+    """Fetch -> archive -> filter -> transform -> write, project by project.
+
+    Only the compact columns of a project's stable releases are held in memory; every fetched
+    release is appended to the NDJSON archive (if given) for derive_releases.
+    """
     ensure_parent_dir(output_path)
+    archive = ResponseArchive(archive_file, append=False) if archive_file else None
     with output_path.open("w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fields)
+        writer = csv.DictWriter(csvfile, fieldnames=FIELDS)
         writer.writeheader()
 
         total_written = 0
-        for repo in PROJECTS:
+        for repo in projects or PROJECTS:
             print(f"Collecting releases from {repo}...")
-            stable_releases: list[dict] = []
-            for release in iter_releases(api_base, repo, headers):
-                tag_name = (release.get("tag_name") or "").strip()
-                published_at = release.get("published_at")
-                created_at = release.get("created_at")
-                prerelease = bool(release.get("prerelease", False))
-                draft = bool(release.get("draft", False))
-
-                if not tag_name or not published_at:
-                    continue
-                if not is_stable_release(tag_name, prerelease, draft):
-                    continue
-
-                stable_releases.append(
-                    {
-                        "tag_name": tag_name,
-                        "published_at": parse_github_datetime(published_at),
-                        "created_at": parse_github_datetime(created_at),
-                    }
-                )
-
-            stable_releases = [r for r in stable_releases if r["published_at"] is not None]
-            stable_releases.sort(key=lambda r: r["published_at"], reverse=True)
-
-            for index, release in enumerate(stable_releases):
-                published_at_dt = release["published_at"]
-                if index + 1 < len(stable_releases):
-                    started_at_dt = stable_releases[index + 1]["published_at"] + timedelta(seconds=1)
-                else:
-                    started_at_dt = release["created_at"] or published_at_dt
-
-                release_duration = int(max((published_at_dt - started_at_dt).total_seconds(), 0) // 86400)
-
-                writer.writerow(
-                    {
-                        "project": repo,
-                        "title": release["tag_name"],
-                        "startedAt": to_output_datetime(started_at_dt),
-                        "publishedAt": to_output_datetime(published_at_dt),
-                        "release_duration": release_duration,
-                        "created_pull_requests": 0,
-                        "merged_pull_requests": 0,
-                        "released_pull_requests": 0,
-                        "sum_submitted_pr_churn": "",
-                        "practice": DEFAULT_PRACTICE,
-                    }
-                )
+            columns = release_columns()
+            for release in archived(iter_releases(api_base, repo, headers), archive, RELEASE, repo):
+                add_stable_release(columns, release, unstable_tokens)
+            for row in release_rows(repo, columns):
+                writer.writerow(row)
                 total_written += 1
+            if archive:
+                archive.flush()
 
         print(f"Collected {total_written} stable releases.")
+    if archive:
+        archive.close()
+
+
+def derive_releases(archive_file: Path, output_path: Path, unstable_tokens=UNSTABLE_TAG_TOKENS) -> int:
+    """Rewrite the releases CSV from the archived releases of the last run, offline.
+
+    With other unstable_tokens this derives a variant of the dataset for sensitivity analyses.
+    """
+    projects: dict[str, tuple[list[str], array, array]] = {}
+    for repo, release in iter_archive(archive_file, RELEASE):
+        add_stable_release(projects.setdefault(repo, release_columns()), release, unstable_tokens)
+
+    ensure_parent_dir(output_path)
+    total_written = 0
+    with output_path.open("w", newline="", encoding="utf-8") as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=FIELDS)
+        writer.writeheader()
+        for repo, columns in projects.items():
+            for row in release_rows(repo, columns):
+                writer.writerow(row)
+                total_written += 1
+    return total_written
 
 
 def parse_args(default_output: str) -> argparse.Namespace:
@@ -154,6 +183,17 @@ def parse_args(default_output: str) -> argparse.Namespace:
         default=default_output,
         help="Output CSV path (relative to repo root or absolute).",
     )
+    parser.add_argument(
+        "--unstable-tokens",
+        nargs="*",
+        default=list(UNSTABLE_TAG_TOKENS),
+        help="Tag substrings that mark a release as unstable (default: %(default)s).",
+    )
+    add_label_arguments(parser)
+    add_shard_arguments(parser)
+    add_archive_arguments(parser)
+    add_cache_arguments(parser, HTTP_CACHE_PATH)
+    add_telemetry_arguments(parser)
     return parser.parse_args()
 
 
@@ -165,20 +205,77 @@ def resolve_output_path(output: str) -> Path:
     return repo_root / output_path
 
 
+def configure_clients(args: argparse.Namespace, repo: str | None = None) -> None:
+    configure_cache(
+        None if args.no_cache else resolve_output_path(args.cache),
+        args.cache_ttl_days,
+        args.cache_max_mb,
+        args.offline,
+    )
+    # Each shard process exports its own telemetry file under <telemetry>.shards/
+    telemetry_path = resolve_output_path(args.telemetry) if args.telemetry else None
+    if telemetry_path and repo:
+        telemetry_path = shard_path(telemetry_path, repo)
+    configure_telemetry(telemetry_path, not args.no_telemetry)
+    configure_tokens(read_tokens())
+
+
+def run_collection(
+    api_base: str,
+    headers: dict,
+    output_path: Path,
+    args: argparse.Namespace,
+    projects: list[str] | None = None,
+    archive_file: Path | None = None,
+) -> None:
+    if args.from_archive:
+        total = derive_releases(archive_file, output_path, tuple(args.unstable_tokens))
+        print(f"Derived {total} stable releases from {archive_file}")
+        return
+    collect_releases(api_base, headers, output_path, projects, archive_file, tuple(args.unstable_tokens))
+
+
+def collect_project_shard(repo: str, api_base: str, headers: dict, output_path: Path, args: argparse.Namespace) -> None:
+    configure_clients(args, repo)
+    archive_file = archive_path(args, output_path)
+    try:
+        run_collection(
+            api_base, headers, shard_path(output_path, repo), args, [repo], archive_file and shard_path(archive_file, repo)
+        )
+    finally:
+        finish_telemetry()
+
+
 def main() -> None:
     load_dotenv()
-    token = os.getenv("GITHUB_TOKEN")
-    if not token:
-        raise SystemExit("Missing GITHUB_TOKEN. Set it in replication_scripts/.env")
+    args = parse_args(RELEASES_OUTPUT_CSV)
+    tokens = read_tokens()
+    if not tokens and not (args.offline or args.from_archive):
+        raise SystemExit("Missing GITHUB_TOKEN (or GITHUB_TOKENS). Set it in replication_scripts/.env")
 
     api_base = os.getenv("GITHUB_API_BASE", "https://api.github.com").rstrip("/")
-    args = parse_args(RELEASES_OUTPUT_CSV)
     output_path = resolve_output_path(args.output)
-    headers = build_headers(token)
-
-    collect_releases(api_base, headers, output_path)
-    print(f"Done. Wrote {output_path}")
+    headers = build_headers(tokens[0] if tokens else None)
+
+    if not is_sharded(args):
+        configure_clients(args)
+        try:
+            run_collection(api_base, headers, output_path, args, archive_file=archive_path(args, output_path))
+        finally:
+            finish_telemetry()
+        if args.label_practice:
+            label_collected(output_path, "publishedAt", resolve_output_path(args.mirrors), args.git_base)
+        print(f"Done. Wrote {output_path}")
+        return
+
+    failed = run_sharded(collect_project_shard, args.projects or PROJECTS, args.jobs, api_base, headers, output_path, args)
+    if failed:
+        raise SystemExit(f"Some projects failed; retry them with --projects {' '.join(failed)}")
+    total = merge_shards(output_path, PROJECTS)
+    if args.label_practice:
+        label_collected(output_path, "publishedAt", resolve_output_path(args.mirrors), args.git_base)
+    print(f"Done. Merged {total} releases from {shard_dir(output_path)} into {output_path}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,101 @@
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from analysis import AnalysisContext, run_findings
+from artifact_cache import ArtifactCache
+from config import resolve_input_path
+from datasets_io import columnar_sibling, pa, read_dataset, write_dataset
+from findings import select_findings
+from streaming import StreamingContext
+
+# Entries of a finding result that identify it rather than measure something
+RESULT_KEYS = ("id", "rq", "finding", "text")
+
+
+def share_datasets(configs: dict[str, dict[str, str]], directory: Path) -> dict[str, dict[str, str]]:
+    """Point the configurations at one Arrow IPC copy of every CSV that several of them read.
+
+    Workers memory-map that copy, so it is parsed once instead of once per configuration and the
+    operating system keeps a single copy of its pages for all of them. CSVs with an up-to-date
+    Parquet/Arrow sibling are memory-mapped already; without pyarrow nothing changes.
+    """
+    if pa is None:
+        return configs
+    uses = Counter(str(resolve_input_path(path)) for paths in configs.values() for path in paths.values())
+    shared = {}
+    for index, (path, count) in enumerate(uses.items()):
+        source = Path(path)
+        if count > 1 and source.suffix == ".csv" and columnar_sibling(source) is None:
+            frame = read_dataset(source, prefer_columnar=False)
+            shared[path] = str(write_dataset(frame, directory / f"{index}.arrow"))
+    return {
+        name: {kind: shared.get(str(resolve_input_path(path)), path) for kind, path in paths.items()}
+        for name, paths in configs.items()
+    }
+
+
+def evaluate(
+    paths: dict[str, str],
+    finding_ids: list[str],
+    stream: bool,
+    chunk_rows: int,
+    options: dict,
+    cache_path: Path | None,
+    cache_max_bytes: int,
+) -> tuple[list[dict], dict[str, int]]:
+    """Results of the findings on one dataset configuration and the rows of each dataset (in a worker process)."""
+    findings = select_findings(ids=finding_ids)
+    cache = ArtifactCache(cache_path, cache_max_bytes) if cache_path else None
+    if stream:
+        context = StreamingContext(findings, paths, chunk_rows, cache=cache, **options)
+    else:
+        context = AnalysisContext(findings, paths, cache=cache, **options)
+    try:
+        results = run_findings(findings, context)
+        return results, {name: info["rows"] for name, info in context.datasets_info().items()}
+    finally:
+        context.close()
+        if cache:
+            cache.close()
+
+
+def compare_datasets(configs: dict[str, dict[str, str]], finding_ids: list[str], jobs: int, *options) -> dict:
+    """Run the findings on every configuration at once, one process per configuration (at most `jobs`).
+
+    `options` are evaluate's arguments after finding_ids. Returns name -> (results, rows) in
+    configuration order.
+    """
+    with tempfile.TemporaryDirectory(prefix="replication-compare-") as directory:
+        shared = share_datasets(configs, Path(directory))
+        with ProcessPoolExecutor(max_workers=max(min(jobs, len(configs)), 1)) as executor:
+            futures = {name: executor.submit(evaluate, shared[name], finding_ids, *options) for name in configs}
+            return {name: future.result() for name, future in futures.items()}
+
+
+def finding_metrics(result: dict, prefix: str = "") -> dict[str, float]:
+    """Numeric entries of a finding result; nested dicts (e.g. bootstrap) become "bootstrap.projects"."""
+    metrics = {}
+    for key, value in result.items():
+        if isinstance(value, dict):
+            metrics.update(finding_metrics(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and (prefix or key not in RESULT_KEYS):
+            metrics[prefix + key] = value
+    return metrics
+
+
+def diff_table(results: dict[str, list[dict]]) -> pd.DataFrame:
+    """One row per (finding, metric) with its value on every dataset, their spread and whether they differ."""
+    values = {}
+    for name, findings in results.items():
+        values[name] = {
+            (result["id"], metric): value for result in findings for metric, value in finding_metrics(result).items()
+        }
+    table = pd.DataFrame(values, columns=list(results))
+    table.index = table.index.set_names(["finding", "metric"])
+    table["spread"] = table.max(axis=1) - table.min(axis=1)
+    table["differs"] = table[list(results)].nunique(axis=1, dropna=False) > 1
+    return table
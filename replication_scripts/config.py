@@ -1,3 +1,9 @@
+from pathlib import Path
+
+# Practice labels of the PR and release datasets
+CI = "CI"
+NO_CI = "NO-CI"
+
 PROJECTS = [
     "serverless/serverless",
     "scikit-image/scikit-image",
@@ -7,4 +13,24 @@ PROJECTS = [
 ]
 
 OUTPUT_CSV = "datasets/Collected Data/pull_requests.csv"
-RELEASES_OUTPUT_CSV = "datasets/Collected Data/releases.csv"
\ No newline at end of file
+RELEASES_OUTPUT_CSV = "datasets/Collected Data/releases.csv"
+PROVIDED_PRS_CSV = "datasets/Provided Data/pull_requests_meta_data.csv"
+PROVIDED_RELEASES_CSV = "datasets/Provided Data/releases_meta_data.csv"
+RESULTS_JSON = "outputs/results.json"
+COMPARISON_JSON = "outputs/comparison.json"
+HTTP_CACHE_PATH = ".cache/github_responses.sqlite"
+ARTIFACT_CACHE_PATH = ".cache/analysis_artifacts.sqlite"
+CI_ADOPTION_CSV = "datasets/Collected Data/ci_adoption.csv"
+GIT_MIRRORS_DIR = ".cache/git"
+
+# Defaults of the analysis runner's options, kept here so its CLI starts without the analysis modules
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+def resolve_input_path(value: str) -> Path:
+    """`value` if absolute, else the path relative to the repository root."""
+    path = Path(value)
+    if path.is_absolute():
+        return path
+    return Path(__file__).resolve().parents[1] / path
@@ -0,0 +1,47 @@
+import argparse
+import time
+from pathlib import Path
+
+from datasets_io import read_dataset, write_dataset
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DATASETS_DIR = REPO_ROOT / "datasets"
+
+
+def convert(source: Path, fmt: str) -> Path:
+    target = source.with_suffix(f".{fmt}")
+    if target == source:
+        raise SystemExit(f"{source} is already {fmt}")
+    frame = read_dataset(source, prefer_columnar=False)
+    return write_dataset(frame, target)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Convert datasets between CSV and typed Parquet/Arrow files.")
+    parser.add_argument(
+        "sources",
+        nargs="*",
+        type=Path,
+        help="Files to convert (default: every CSV under datasets/).",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("parquet", "arrow", "csv"),
+        default="parquet",
+        help="Target format; each file is written next to its source with the new suffix.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    sources = args.sources or sorted(DATASETS_DIR.rglob("*.csv"))
+    for source in sources:
+        started = time.perf_counter()
+        target = convert(source, args.format)
+        size_change = target.stat().st_size / source.stat().st_size
+        print(f"{source.name} -> {target.name} ({size_change:.0%} of the size, {time.perf_counter() - started:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
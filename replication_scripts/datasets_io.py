@@ -0,0 +1,159 @@
+from pathlib import Path
+
+import pandas as pd
+
+from timestamps import to_epoch_seconds
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:  # CSV still works without pyarrow
+    pa = None
+
+COLUMNAR_SUFFIXES = (".parquet", ".arrow")
+
+PULL_REQUEST_SCHEMA = {
+    "": "int64",
+    "X.": "int64",
+    "project": "category",
+    "language": "category",
+    "pull_id": "int64",
+    "pull_number": "int64",
+    "commits_per_pr": "int64",
+    "changed_files": "int64",
+    "churn": "int64",
+    "comments": "int64",
+    "comments_interval": "float64",
+    "merge_workload": "int64",
+    "description_length": "int64",
+    "contributor_experience": "int64",
+    "queue_rank": "int64",
+    "contributor_integration": "float64",
+    "stacktrace_attached": "int64",
+    "activities": "int64",
+    "merge_time": "float64",
+    "delivery_time": "float64",
+    "practice": "category",
+    "author": "string",
+    "created_at": "datetime64[s, UTC]",
+    "merged_at": "datetime64[s, UTC]",
+}
+
+RELEASE_SCHEMA = {
+    "project": "category",
+    "title": "string",
+    "startedAt": "datetime64[s]",
+    "publishedAt": "datetime64[s]",
+    "release_duration": "int64",
+    "created_pull_requests": "Int64",
+    "merged_pull_requests": "Int64",
+    "released_pull_requests": "Int64",
+    "sum_submitted_pr_churn": "Int64",
+    "practice": "category",
+}
+
+
+def schema_for(columns) -> dict:
+    """Pick the schema whose columns match a table (PR tables have pull_number, releases have publishedAt)."""
+    columns = set(columns)
+    if "pull_number" in columns or "merge_time" in columns:
+        return PULL_REQUEST_SCHEMA
+    if "publishedAt" in columns:
+        return RELEASE_SCHEMA
+    return {}
+
+
+def apply_schema(frame: pd.DataFrame, schema: dict | None = None) -> pd.DataFrame:
+    schema = schema if schema is not None else schema_for(frame.columns)
+    frame = frame.rename(columns={"Unnamed: 0": ""})
+    for column, dtype in schema.items():
+        if column not in frame.columns or str(frame[column].dtype) == dtype:
+            continue
+        if dtype.startswith("datetime64"):
+            values = pd.Series(to_epoch_seconds(frame[column]).astype("datetime64[s]"), index=frame.index)
+            frame[column] = values.dt.tz_localize("UTC") if "UTC" in dtype else values
+        elif dtype in ("int64", "Int64", "float64"):
+            values = pd.to_numeric(frame[column], errors="coerce")
+            # Blank integers (e.g. unfilled release counts) need the nullable dtype.
+            frame[column] = values.astype("Int64" if dtype == "int64" and values.isna().any() else dtype)
+        else:
+            frame[column] = frame[column].astype(dtype)
+    return frame
+
+
+def columnar_sibling(path: Path) -> Path | None:
+    """Newest up-to-date .parquet/.arrow copy of a CSV, if pyarrow can read it."""
+    if pa is None:
+        return None
+    for suffix in COLUMNAR_SUFFIXES:
+        candidate = path.with_suffix(suffix)
+        if candidate.exists() and (not path.exists() or candidate.stat().st_mtime >= path.stat().st_mtime):
+            return candidate
+    return None
+
+
+def csv_read_options(path: Path, columns: list[str] | None) -> dict:
+    header = pd.read_csv(path, nrows=0).columns
+    schema = schema_for(header)
+    # Timestamps are read as text and parsed in bulk by apply_schema.
+    dtypes = {c: dtype for c, dtype in schema.items() if dtype in ("category", "string") and c in header}
+    return {"usecols": columns, "dtype": dtypes}
+
+
+def read_dataset(path: str | Path, columns: list[str] | None = None, prefer_columnar: bool = True) -> pd.DataFrame:
+    """Load a dataset with typed columns, reading only `columns`.
+
+    A CSV path transparently uses its .parquet/.arrow copy when one is at least as new.
+    Parquet and Arrow IPC files are memory-mapped.
+    """
+    path = Path(path)
+    if path.suffix == ".csv" and prefer_columnar:
+        path = columnar_sibling(path) or path
+
+    if path.suffix == ".parquet":
+        frame = pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+    elif path.suffix == ".arrow":
+        frame = feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+    else:
+        frame = pd.read_csv(path, **csv_read_options(path, columns))
+    return apply_schema(frame)
+
+
+def iter_dataset(path: str | Path, columns: list[str] | None = None, chunk_rows: int = 100_000, prefer_columnar: bool = True):
+    """Yield a dataset as typed DataFrames of at most chunk_rows rows, holding one chunk in memory at a time."""
+    path = Path(path)
+    if path.suffix == ".csv" and prefer_columnar:
+        path = columnar_sibling(path) or path
+
+    if path.suffix == ".parquet":
+        batches = pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=chunk_rows, columns=columns)
+        chunks = (batch.to_pandas() for batch in batches)
+    elif path.suffix == ".arrow":
+        # Memory-mapped, so slicing only touches the pages of the current chunk.
+        table = ipc.open_file(pa.memory_map(str(path))).read_all()
+        table = table.select(columns) if columns else table
+        chunks = (table.slice(start, chunk_rows).to_pandas() for start in range(0, table.num_rows, chunk_rows))
+    else:
+        chunks = pd.read_csv(path, chunksize=chunk_rows, **csv_read_options(path, columns))
+    for chunk in chunks:
+        yield apply_schema(chunk)
+
+
+def write_dataset(frame: pd.DataFrame, path: str | Path) -> Path:
+    """Write a typed table as Parquet (zstd), Arrow IPC or CSV, chosen by the file suffix.
+
+    Arrow IPC files are left uncompressed so memory-mapped reads are zero-copy.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix in COLUMNAR_SUFFIXES and pa is None:
+        raise SystemExit("Writing Parquet/Arrow files needs pyarrow: pip install pyarrow")
+    if path.suffix == ".parquet":
+        pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), path, compression="zstd")
+    elif path.suffix == ".arrow":
+        feather.write_feather(frame, path, compression="uncompressed")
+    else:
+        frame.to_csv(path, index=False, date_format="%Y-%m-%d %H:%M:%S")
+    return path
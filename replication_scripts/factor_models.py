@@ -0,0 +1,226 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.stats import t as t_distribution
+
+from config import CI, PROVIDED_PRS_CSV, resolve_input_path
+from datasets_io import read_dataset
+from pr_features import PR_FACTORS
+
+FACTOR_MODELS_CSV = "outputs/factor_models.csv"
+RESPONSE = "delivery_time"
+# CI adoption enters the models as a 0/1 column next to the PR factors.
+CI_FACTOR = "ci"
+MODEL_FACTORS = [factor for factor in PR_FACTORS if factor != RESPONSE] + [CI_FACTOR]
+# Left untransformed; every other factor and the response are log1p-transformed.
+INDICATOR_FACTORS = ("stacktrace_attached", CI_FACTOR)
+POOLED = "pooled"
+
+# Spearman |rho| above which one factor of a pair is dropped, and the R^2 of a factor on all
+# remaining ones above which it is dropped as redundant (the usual 0.7 / 0.9 cut-offs).
+CORRELATION_THRESHOLD = 0.7
+REDUNDANCY_THRESHOLD = 0.9
+
+MODEL_COLUMNS = [
+    "project", "n", "r2", "adj_r2", "factor",
+    "coefficient", "std_coefficient", "p_value", "delta_r2", "importance_rank",
+]
+
+
+def model_frame(data: pd.DataFrame, factors: list[str] = MODEL_FACTORS) -> pd.DataFrame:
+    """Project, log1p(response) and factors of the PRs with a finite response and finite factors."""
+    frame = pd.DataFrame({"project": data["project"].astype(str).to_numpy()})
+    for column in [RESPONSE, *factors]:
+        if column == CI_FACTOR:
+            values = (data["practice"] == CI).to_numpy(dtype=float)
+        else:
+            values = data[column].to_numpy(dtype=float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frame[column] = values if column in INDICATOR_FACTORS else np.log1p(values)
+    finite = np.isfinite(frame[[RESPONSE, *factors]].to_numpy()).all(axis=1)
+    return frame.loc[finite].reset_index(drop=True)
+
+
+def prune_correlated(frame: pd.DataFrame, factors: list[str], threshold: float = CORRELATION_THRESHOLD) -> dict[str, str]:
+    """Drop one factor of every pair with |Spearman rho| > threshold, the one more correlated with the rest.
+
+    Returns dropped factor -> reason. Constant factors are dropped too.
+    """
+    dropped = {factor: "constant" for factor in factors if frame[factor].nunique() < 2}
+    kept = [factor for factor in factors if factor not in dropped]
+    if len(kept) < 2:  # no pairs; np.corrcoef of one column is a scalar
+        return dropped
+    rho = np.abs(np.corrcoef(frame[kept].rank().to_numpy(), rowvar=False))
+    np.fill_diagonal(rho, 0)
+    alive = np.ones(len(kept), dtype=bool)
+    for i, j in zip(*np.unravel_index(np.argsort(rho, axis=None)[::-1], rho.shape)):
+        if rho[i, j] <= threshold:
+            break
+        if i < j and alive[i] and alive[j]:
+            mean_rho = rho[:, alive][[i, j]].mean(axis=1)
+            drop, other = (i, j) if mean_rho[0] >= mean_rho[1] else (j, i)
+            alive[drop] = False
+            dropped[kept[drop]] = f"|rho| {rho[i, j]:.2f} with {kept[other]}"
+    return dropped
+
+
+def prune_redundant(frame: pd.DataFrame, factors: list[str], threshold: float = REDUNDANCY_THRESHOLD) -> dict[str, str]:
+    """Repeatedly drop the factor best explained by the others while its R^2 exceeds threshold.
+
+    The R^2 of factor k on the rest is 1 - 1 / inv(corr)[k, k], so one inverse per step suffices.
+    """
+    dropped = {}
+    kept = list(factors)
+    while len(kept) > 1:
+        explained = 1 - 1 / np.diag(np.linalg.pinv(np.corrcoef(frame[kept].to_numpy(), rowvar=False), hermitian=True))
+        worst = int(np.argmax(explained))
+        if explained[worst] <= threshold:
+            break
+        dropped[kept.pop(worst)] = f"R2 {explained[worst]:.2f} from the other factors"
+    return dropped
+
+
+def group_moments(codes: np.ndarray, columns: np.ndarray, groups: int) -> tuple[np.ndarray, np.ndarray]:
+    """Row counts and centered cross-product matrices (X'X about the group means) of every group.
+
+    Each upper-triangle entry of all groups' X'X is one bincount over the rows, so the stack of
+    (groups, p, p) matrices is built without a Python loop over groups.
+    """
+    columns = columns - columns.mean(axis=0)  # better conditioned sums of products
+    n = np.bincount(codes, minlength=groups).astype(float)
+    p = columns.shape[1]
+    sums = np.column_stack([np.bincount(codes, columns[:, i], minlength=groups) for i in range(p)])
+    cross = np.empty((groups, p, p))
+    for i in range(p):
+        for j in range(i, p):
+            cross[:, i, j] = cross[:, j, i] = np.bincount(codes, columns[:, i] * columns[:, j], minlength=groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        centered = cross - sums[:, :, None] * sums[:, None, :] / n[:, None, None]
+    return n, centered
+
+
+def fit_centered(moments: np.ndarray, selected: list[int]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Slopes, R^2 and diag((X'X)^-1) of the response (last column) on the selected columns, per group."""
+    xx = moments[:, selected][:, :, selected]
+    xy = moments[:, selected, -1]
+    yy = moments[:, -1, -1]
+    inverse = np.full_like(xx, np.nan)
+    fitted = np.isfinite(xx).all(axis=(1, 2))
+    inverse[fitted] = np.linalg.pinv(xx[fitted], hermitian=True)
+    slopes = np.einsum("gij,gj->gi", inverse, xy)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r2 = np.einsum("gi,gi->g", slopes, xy) / yy
+    return slopes, r2, np.diagonal(inverse, axis1=1, axis2=2)
+
+
+def fit_models(frame: pd.DataFrame, factors: list[str]) -> pd.DataFrame:
+    """OLS of log1p(response) on the factors per project and pooled within projects, as one long table.
+
+    Per-project models have their own intercept; the pooled model has one intercept per project
+    (a fixed-effects fit), so its moments are the sum of the per-project centered moments.
+    delta_r2 is the drop in R^2 when a factor is left out of its model.
+    """
+    codes, projects = pd.factorize(frame["project"])
+    n, moments = group_moments(codes, frame[[*factors, RESPONSE]].to_numpy(), len(projects))
+    usable = n > len(factors) + 1
+    moments = np.concatenate([np.where(usable[:, None, None], moments, np.nan), moments[usable].sum(axis=0)[None]])
+    labels = [*projects, POOLED]
+    n = np.append(n, n[usable].sum())
+    # One intercept per project model, one per project in the pooled model
+    intercepts = np.append(np.ones(len(projects)), usable.sum())
+    dof = n - intercepts - len(factors)
+
+    all_columns = list(range(len(factors)))
+    slopes, r2, inverse_diagonal = fit_centered(moments, all_columns)
+    delta_r2 = np.column_stack(
+        [r2 - fit_centered(moments, [c for c in all_columns if c != k])[1] for k in all_columns]
+    )
+    yy = moments[:, -1, -1]
+    xx_diagonal = np.diagonal(moments, axis1=1, axis2=2)[:, :-1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        residual_variance = (1 - r2) * yy / dof
+        t_values = slopes / np.sqrt(residual_variance[:, None] * inverse_diagonal)
+        adj_r2 = 1 - (1 - r2) * (n - intercepts) / dof
+        std_slopes = slopes * np.sqrt(xx_diagonal / yy[:, None])
+
+    rows = len(labels) * len(factors)
+    table = pd.DataFrame(
+        {
+            "project": np.repeat(labels, len(factors)),
+            "n": np.repeat(n, len(factors)).astype(np.int64),
+            "r2": np.repeat(r2, len(factors)),
+            "adj_r2": np.repeat(adj_r2, len(factors)),
+            "factor": np.tile(factors, len(labels)),
+            "coefficient": slopes.reshape(rows),
+            "std_coefficient": std_slopes.reshape(rows),
+            "p_value": (2 * t_distribution.sf(np.abs(t_values), dof[:, None])).reshape(rows),
+            "delta_r2": delta_r2.reshape(rows),
+        }
+    )
+    table["importance_rank"] = table.groupby("project", sort=False)["delta_r2"].rank(ascending=False, method="min")
+    return table[MODEL_COLUMNS]
+
+
+def model_factors(
+    data: pd.DataFrame,
+    factors: list[str] = MODEL_FACTORS,
+    correlation: float = CORRELATION_THRESHOLD,
+    redundancy: float = REDUNDANCY_THRESHOLD,
+) -> tuple[pd.DataFrame, dict[str, str]]:
+    """Prune correlated/redundant factors over the pooled data, then fit all models; returns (table, dropped)."""
+    frame = model_frame(data, factors)
+    dropped = prune_correlated(frame, factors, correlation)
+    dropped.update(prune_redundant(frame, [f for f in factors if f not in dropped], redundancy))
+    return fit_models(frame, [factor for factor in factors if factor not in dropped]), dropped
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Fit per-project and pooled OLS models of log delivery time on the PR factors."
+    )
+    parser.add_argument("--input", default=PROVIDED_PRS_CSV, help="PR dataset (relative to repo root or absolute).")
+    parser.add_argument("--output", default=FACTOR_MODELS_CSV, help="Model table CSV (relative to repo root or absolute).")
+    parser.add_argument(
+        "--correlation",
+        type=float,
+        default=CORRELATION_THRESHOLD,
+        help="Drop one factor of every pair whose |Spearman rho| exceeds this.",
+    )
+    parser.add_argument(
+        "--redundancy",
+        type=float,
+        default=REDUNDANCY_THRESHOLD,
+        help="Drop factors whose R^2 on the remaining factors exceeds this.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    started = time.perf_counter()
+    columns = ["project", "practice", *[factor for factor in MODEL_FACTORS if factor != CI_FACTOR], RESPONSE]
+    data = read_dataset(resolve_input_path(args.input), columns=columns)
+    table, dropped = model_factors(data, correlation=args.correlation, redundancy=args.redundancy)
+    elapsed = time.perf_counter() - started
+
+    output_path = resolve_input_path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    table.to_csv(output_path, index=False)
+
+    for factor, reason in dropped.items():
+        print(f"Dropped {factor}: {reason}")
+    pooled = table[table["project"] == POOLED].sort_values("importance_rank")
+    projects = table.loc[table["project"] != POOLED].drop_duplicates("project")
+    print(
+        f"Fitted {projects['r2'].notna().sum()} project models and the pooled model in {elapsed:.2f}s."
+        f" Median project R2 {projects['r2'].median():.3f}, pooled within-project R2 {pooled['r2'].iloc[0]:.3f}."
+    )
+    for row in pooled.itertuples():
+        print(f"  {int(row.importance_rank):>2}. {row.factor}: delta R2 {row.delta_r2:.4f}, coefficient {row.coefficient:+.3f} (p={row.p_value:.3g})")
+    print(f"Wrote {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import argparse
+import time
+
+from config import PROVIDED_PRS_CSV, resolve_input_path
+from datasets_io import read_dataset
+from pr_features import PR_FACTORS
+from stats_engine import corrected_practice_tests
+
+FACTOR_TESTS_CSV = "outputs/factor_tests.csv"
+FAMILIES = {"all": None, "value": "value", "project": "project"}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Test CI vs NO-CI for every PR factor in every project, with Holm and BH corrected p-values."
+    )
+    parser.add_argument("--input", default=PROVIDED_PRS_CSV, help="PR dataset (relative to repo root or absolute).")
+    parser.add_argument("--output", default=FACTOR_TESTS_CSV, help="Test table CSV (relative to repo root or absolute).")
+    parser.add_argument(
+        "--family",
+        choices=sorted(FAMILIES),
+        default="all",
+        help="Correct over all tests at once, or within each factor or each project.",
+    )
+    parser.add_argument("--alpha", type=float, default=0.05, help="Significance level of the summary.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    started = time.perf_counter()
+    data = read_dataset(resolve_input_path(args.input), columns=["project", "practice", *PR_FACTORS])
+    factors = [factor for factor in PR_FACTORS if factor in data.columns]
+    table = corrected_practice_tests(data, factors, family=FAMILIES[args.family])
+    elapsed = time.perf_counter() - started
+
+    output_path = resolve_input_path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    table.to_csv(output_path, index=False)
+
+    tested = table["p_value"].notna()
+    print(f"Ran {int(tested.sum())} tests ({len(factors)} factors x {table['project'].nunique()} projects) in {elapsed:.2f}s.")
+    for column in ("p_value", "p_holm", "p_bh"):
+        print(f"  {column}: {int((table[column] < args.alpha).sum())} below {args.alpha}")
+    print(f"Wrote {output_path}")
+
+
+if __name__ == "__main__":
+    main()
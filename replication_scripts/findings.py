@@ -0,0 +1,78 @@
+import importlib
+
+# RQ -> module whose @finding functions make up that RQ; imported only when the RQ is selected.
+FINDING_MODULES = {1: "rq1", 2: "rq2"}
+
+# (rq, number) -> Finding, filled by the @finding decorator in rq1.py / rq2.py
+FINDINGS = {}
+
+
+class Finding:
+    def __init__(self, rq: int, number: int, function, columns: dict[str, list[str]], whole_datasets: bool = False) -> None:
+        self.rq = rq
+        self.number = number
+        self.function = function
+        self.columns = columns
+        self.whole_datasets = whole_datasets
+
+    @property
+    def id(self) -> str:
+        return f"rq{self.rq}.{self.number}"
+
+
+def finding(rq: int, number: int, whole_datasets: bool = False, **columns: list[str]):
+    """Register a function(context) -> dict as finding `number` of RQ `rq`.
+
+    Keyword arguments name the dataset columns the finding reads, e.g. pull_requests=["merge_time"];
+    the context loads the union of the selected findings' columns once per dataset.
+    Findings that read rows through context.dataset() instead of its aggregates pass
+    whole_datasets=True; they cannot run streamed.
+    The returned dict must hold a "text" entry; everything else goes to the results file as is.
+    """
+    def register(function):
+        FINDINGS[(rq, number)] = Finding(rq, number, function, columns, whole_datasets)
+        return function
+
+    return register
+
+
+def load_findings(rqs: list[int] | None = None) -> None:
+    """Import the finding modules of the given RQs (all by default), registering their findings."""
+    for rq in rqs or FINDING_MODULES:
+        importlib.import_module(FINDING_MODULES[rq])
+
+
+def select_findings(rqs: list[int] | None = None, ids: list[str] | None = None) -> list[Finding]:
+    """Findings of the given RQs, or with the given ids (e.g. "rq1.3"), in registration order."""
+    if ids:
+        rqs = [rq for rq in FINDING_MODULES if any(item.startswith(f"rq{rq}.") for item in ids)]
+    load_findings(rqs)
+    selected = [FINDINGS[key] for key in sorted(FINDINGS) if rqs is None or key[0] in rqs]
+    if ids:
+        unknown = set(ids) - {item.id for item in selected}
+        if unknown:
+            raise SystemExit(f"Unknown finding(s): {', '.join(sorted(unknown))}")
+        selected = [item for item in selected if item.id in ids]
+    return selected
+
+
+def add_uncertainty(context, result: dict, name: str, value: str, stat: str, increase: bool) -> dict:
+    """With resampling enabled, count the projects whose bootstrap CI of the CI minus NO-CI
+    difference in `stat` lies entirely above (increase) or below zero, and say so in the text."""
+    if not context.resamples:
+        return result
+    resampled = context.resampling(name, value).dropna(subset=[f"{stat}_diff"])
+    agree = resampled[f"{stat}_diff_low"] > 0 if increase else resampled[f"{stat}_diff_high"] < 0
+    result["bootstrap"] = {
+        "statistic": stat,
+        "resamples": context.resamples,
+        "confidence": context.confidence,
+        "projects": int(agree.sum()),
+        "total": len(resampled),
+        "permutation_significant": int((resampled["permutation_p_value"] < 0.05).sum()),
+    }
+    result["text"] += (
+        f" The bootstrap {context.confidence:.0%} CI of the {stat} difference agrees in"
+        f" {int(agree.sum())}/{len(resampled)} projects."
+    )
+    return result
@@ -0,0 +1,336 @@
+import argparse
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_cache import DEFAULT_MAX_MB, DEFAULT_TTL_DAYS, CacheMiss, ResponseCache
+from telemetry import Telemetry
+from timestamps import epoch_seconds
+
+DEFAULT_POOL_SIZE = 10
+# Keep enough GraphQL points in reserve for this many more queries of the last cost.
+GRAPHQL_COST_RESERVE = 2
+# Below this share of its quota, a token's requests are paced until its window resets.
+PACE_BELOW = 0.2
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 6
+# Rate-limit responses (exhausted quota, Retry-After, secondary limits) retried per request
+MAX_RATE_LIMIT_RETRIES = 10
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+# GitHub asks clients to wait at least a minute after a secondary rate limit without Retry-After.
+SECONDARY_LIMIT_WAIT = 60.0
+
+# Process-wide client state, set up by the configure_* functions below. The session starts with
+# requests' default pools (DEFAULT_POOL_SIZE connections); the token schedulers are created on
+# first use, so a caller that never calls configure_tokens() sends its own Authorization header.
+_session = requests.Session()
+_cache: ResponseCache | None = None
+_offline = False
+_telemetry: Telemetry | None = None
+_schedulers: "dict[str, TokenScheduler]" = {}
+_schedulers_lock = threading.Lock()
+
+
+def build_headers(token: str | None) -> dict:
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    if token:
+        headers["Authorization"] = f"token {token}"
+    return headers
+
+
+def read_tokens() -> list[str]:
+    """API tokens from GITHUB_TOKENS (comma or whitespace separated), else the single GITHUB_TOKEN."""
+    tokens = os.getenv("GITHUB_TOKENS", "").replace(",", " ").split()
+    if not tokens and os.getenv("GITHUB_TOKEN"):
+        tokens = [os.environ["GITHUB_TOKEN"]]
+    return tokens
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2**attempt))
+
+
+def retry_after_seconds(value: str) -> float:
+    """Retry-After as seconds from now; GitHub sends seconds, HTTP also allows a date."""
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+
+
+def sleep(seconds: float) -> None:
+    time.sleep(seconds)
+    if _telemetry:
+        _telemetry.record_sleep(seconds)
+
+
+class RateLimitBudget:
+    """Rate-limit state of one token for one resource (REST core or GraphQL)."""
+
+    def __init__(self, token: str | None, label: str) -> None:
+        self.token = token
+        self.label = label
+        self.remaining = None
+        self.limit = None
+        self.reset_at = 0.0
+        self.resume_at = 0.0  # paused until then (quota exhausted or secondary limit)
+        self.next_at = 0.0  # paced: earliest start of this token's next request
+        self.interval = 0.0
+        self.used = 0
+
+    def available_at(self) -> float:
+        return max(self.resume_at, self.next_at)
+
+    def update(self, remaining: int, limit: int | None, reset_at: float) -> None:
+        now = time.time()
+        self.remaining, self.reset_at = remaining, reset_at
+        self.limit = limit or max(self.limit or 0, remaining)
+        if remaining < self.limit * PACE_BELOW:
+            self.interval = max(reset_at - now, 0.0) / max(remaining, 1)
+        else:
+            self.interval = 0.0
+
+
+class TokenScheduler:
+    """Hands out the token for each request of one rate-limit resource, shared by every thread.
+
+    Each request goes to the token that is available first, and ties go to the least used one,
+    so requests rotate over the pool while all tokens have quota. Every response's X-RateLimit-*
+    headers update its token's budget. Below PACE_BELOW of its quota, a token's remaining requests
+    are spread evenly until its reset instead of running dry and then waiting out the window.
+    """
+
+    def __init__(self, resource: str, tokens: list[str]) -> None:
+        self.resource = resource
+        labels = [resource] if len(tokens) <= 1 else [f"{resource}:token{i + 1}" for i in range(len(tokens))]
+        self.budgets = [RateLimitBudget(token, label) for token, label in zip(tokens or [None], labels)]
+        self._lock = threading.Lock()
+
+    def acquire(self) -> RateLimitBudget:
+        while True:
+            with self._lock:
+                now = time.time()
+                budget = min(self.budgets, key=lambda item: (max(item.available_at(), now), item.used))
+                delay = budget.available_at() - now
+                if delay <= 0:
+                    budget.used += 1
+                    budget.next_at = now + budget.interval
+                    return budget
+            sleep(delay)
+
+    def observe(self, budget: RateLimitBudget, remaining: int, limit: int | None, reset_at: float) -> None:
+        with self._lock:
+            budget.update(remaining, limit, reset_at)
+        if _telemetry:
+            _telemetry.record_rate_limit(budget.label, remaining, reset_at)
+        if remaining <= 0:
+            self.pause(budget, max(reset_at, time.time() + 5), "Rate limit reached")
+
+    def observe_headers(self, budget: RateLimitBudget, headers) -> None:
+        if headers.get("X-RateLimit-Remaining") is None:
+            return
+        limit = headers.get("X-RateLimit-Limit")
+        self.observe(
+            budget,
+            int(headers["X-RateLimit-Remaining"]),
+            int(limit) if limit else None,
+            float(headers.get("X-RateLimit-Reset", "0")),
+        )
+
+    def pause(self, budget: RateLimitBudget, resume_at: float, reason: str) -> None:
+        with self._lock:
+            if resume_at <= budget.resume_at:
+                return
+            budget.resume_at = resume_at
+            others = any(item.available_at() <= time.time() for item in self.budgets if item is not budget)
+        if _telemetry:
+            _telemetry.record_pause(resume_at - time.time())
+        suffix = "; continuing with the other tokens" if others else ""
+        print(f"{reason} ({budget.label}). Pausing it for {round(resume_at - time.time())}s{suffix}...")
+
+
+def send(scheduler: TokenScheduler, method: str, url: str, headers: dict, **kwargs) -> tuple[RateLimitBudget, requests.Response]:
+    """Send a request with a token from `scheduler`, retrying rate limits, 429/5xx and connection errors.
+
+    Retry-After (secondary rate limits, 429, 503) pauses the token for that long plus jittered
+    backoff; a secondary limit without Retry-After pauses it for SECONDARY_LIMIT_WAIT. These
+    rate-limit responses are retried up to MAX_RATE_LIMIT_RETRIES times. Other 429/5xx responses
+    and connection errors are retried up to MAX_RETRIES times after exponential backoff with full
+    jitter. Once a limit is reached, the last response is returned as is.
+    """
+    attempt = 0
+    rate_limited = 0
+    while True:
+        budget = scheduler.acquire()
+        request_headers = {**headers, "Authorization": f"token {budget.token}"} if budget.token else headers
+        started = time.perf_counter()
+        try:
+            response = _session.request(method, url, headers=request_headers, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= MAX_RETRIES:
+                raise
+            sleep(backoff_delay(attempt))
+            attempt += 1
+            continue
+        if _telemetry:
+            _telemetry.record_request(method, url, response.status_code, time.perf_counter() - started, len(response.content))
+        scheduler.observe_headers(budget, response.headers)
+
+        status = response.status_code
+        exhausted = status == 403 and response.headers.get("X-RateLimit-Remaining") == "0"
+        retry_after = response.headers.get("Retry-After") if status in (403, *RETRY_STATUSES) else None
+        secondary = status == 403 and "secondary rate limit" in response.text.lower()
+        if exhausted or retry_after or secondary:
+            if rate_limited >= MAX_RATE_LIMIT_RETRIES:
+                return budget, response
+            # An exhausted token was already paused until its reset by observe_headers.
+            if not exhausted and retry_after:
+                wait = retry_after_seconds(retry_after) + backoff_delay(rate_limited)
+                scheduler.pause(budget, time.time() + wait, f"Retry-After on HTTP {status}")
+            elif not exhausted:
+                wait = SECONDARY_LIMIT_WAIT + backoff_delay(rate_limited)
+                scheduler.pause(budget, time.time() + wait, "Secondary rate limit")
+            rate_limited += 1
+            continue
+        if status in RETRY_STATUSES and attempt < MAX_RETRIES:
+            sleep(backoff_delay(attempt))
+            attempt += 1
+            continue
+        return budget, response
+
+
+def configure_session(pool_size: int = DEFAULT_POOL_SIZE) -> None:
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    _session.mount("https://", adapter)
+    _session.mount("http://", adapter)
+
+
+def configure_tokens(tokens: list[str]) -> None:
+    """Rotate requests over these tokens; with none, requests keep the caller's Authorization header."""
+    global _schedulers
+    _schedulers = {resource: TokenScheduler(resource, tokens) for resource in ("core", "graphql")}
+
+
+def _scheduler_for(resource: str) -> TokenScheduler:
+    with _schedulers_lock:
+        if not _schedulers:
+            configure_tokens([])
+        return _schedulers[resource]
+
+
+def configure_cache(path: Path | None, ttl_days: float = DEFAULT_TTL_DAYS, max_mb: float = DEFAULT_MAX_MB, offline: bool = False) -> None:
+    global _cache, _offline
+    if offline and path is None:
+        raise SystemExit("--offline needs a response cache; drop --no-cache.")
+    _cache = ResponseCache(path, ttl_days * 86400, int(max_mb * 1024 * 1024), offline) if path else None
+    _offline = offline
+
+
+def configure_telemetry(path: Path | None, enabled: bool = True) -> None:
+    """Record request telemetry for this process; with a path, also export it there (see telemetry.py)."""
+    global _telemetry
+    _telemetry = Telemetry(path) if enabled else None
+
+
+def finish_telemetry() -> dict | None:
+    """Print the telemetry summary and write the export file, if telemetry is on."""
+    return _telemetry.finish() if _telemetry else None
+
+
+def add_telemetry_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--telemetry",
+        help="Export request telemetry: a .prom/.txt path gets a Prometheus text file, any other path JSON lines.",
+    )
+    parser.add_argument("--no-telemetry", action="store_true", help="Do not record or summarise requests.")
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser, default_cache: str) -> None:
+    parser.add_argument(
+        "--cache",
+        default=default_cache,
+        help="SQLite response cache path (relative to repo root or absolute).",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Disable the response cache.")
+    parser.add_argument(
+        "--cache-ttl-days",
+        type=float,
+        default=DEFAULT_TTL_DAYS,
+        help="Evict cached responses older than this many days.",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=DEFAULT_MAX_MB,
+        help="Evict least recently used responses once the cache exceeds this size.",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Serve every request from the cache and never contact GitHub.",
+    )
+
+
+def get_with_rate_limit(url: str, headers: dict, params: dict | None = None) -> tuple[list | dict, dict]:
+    cached = _cache.get(url, params) if _cache else None
+    if _offline:
+        if cached is None:
+            raise CacheMiss(f"No cached response for {url} {params or ''}")
+        if _telemetry:
+            _telemetry.record_request("GET", url, 200, 0.0, len(cached.body), "cache")
+        return cached.json(), cached.headers
+
+    request_headers = headers
+    if cached is not None:
+        request_headers = dict(headers)
+        if cached.etag:
+            request_headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            request_headers["If-Modified-Since"] = cached.last_modified
+
+    _, response = send(_scheduler_for("core"), "GET", url, request_headers, params=params, timeout=30)
+    if response.status_code == 304 and cached is not None:
+        _cache.refresh(url, params)
+        return cached.json(), {**cached.headers, **response.headers}
+    response.raise_for_status()
+    if _cache:
+        _cache.put(url, params, response.content, response.headers)
+    return response.json(), response.headers
+
+
+def post_graphql(url: str, headers: dict, query: str, variables: dict) -> dict:
+    """Run a GraphQL query, pausing its token early if the rateLimit block shows the budget running out.
+
+    RATE_LIMITED errors pause the token until its reset and are retried up to MAX_RATE_LIMIT_RETRIES times.
+    """
+    scheduler = _scheduler_for("graphql")
+    rate_limited = 0
+    while True:
+        budget, response = send(scheduler, "POST", url, headers, json={"query": query, "variables": variables}, timeout=60)
+        response.raise_for_status()
+        payload = response.json()
+        errors = payload.get("errors") or []
+        if any(error.get("type") == "RATE_LIMITED" for error in errors) and rate_limited < MAX_RATE_LIMIT_RETRIES:
+            reset_at = float(response.headers.get("X-RateLimit-Reset", "0"))
+            scheduler.pause(budget, max(reset_at, time.time() + 5), "GraphQL rate limit reached")
+            rate_limited += 1
+            continue
+        if errors:
+            raise RuntimeError(f"GraphQL query failed: {errors[0].get('message', errors)}")
+
+        data = payload["data"]
+        rate = data.get("rateLimit")
+        if rate:
+            reset_at = epoch_seconds(rate["resetAt"]) or 0
+            scheduler.observe(budget, rate["remaining"], None, reset_at)
+            if rate["remaining"] < rate["cost"] * GRAPHQL_COST_RESERVE:
+                scheduler.pause(budget, max(reset_at, time.time() + 5), "GraphQL points running low")
+        return data
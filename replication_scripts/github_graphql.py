@@ -0,0 +1,163 @@
+from github_api import post_graphql
+
+DEFAULT_PAGE_SIZE = 50
+# Reviews fetched along with each PR. GraphQL charges a point per 100 nodes its connections could
+# return, so 50 PRs with reviews(first: 100) cost ~51 points, as much as the REST detail calls they
+# replace; with 25, a page of 50 PRs costs ~13. PRs with more reviews page through the rest with
+# REVIEWS_QUERY, so review_comments still matches REST.
+REVIEWS_PAGE_SIZE = 25
+
+PULL_REQUESTS_QUERY = """
+query($owner: String!, $name: String!, $first: Int!, $after: String, $orderField: IssueOrderField!, $reviews: Int!) {
+  rateLimit {
+    cost
+    remaining
+    resetAt
+  }
+  repository(owner: $owner, name: $name) {
+    pullRequests(states: MERGED, first: $first, after: $after, orderBy: {field: $orderField, direction: DESC}) {
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+      nodes {
+        databaseId
+        number
+        createdAt
+        updatedAt
+        mergedAt
+        body
+        additions
+        deletions
+        changedFiles
+        author {
+          login
+        }
+        commits {
+          totalCount
+        }
+        comments {
+          totalCount
+        }
+        reviews(first: $reviews) {
+          pageInfo {
+            hasNextPage
+            endCursor
+          }
+          nodes {
+            comments {
+              totalCount
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+REVIEWS_QUERY = """
+query($owner: String!, $name: String!, $number: Int!, $first: Int!, $after: String) {
+  rateLimit {
+    cost
+    remaining
+    resetAt
+  }
+  repository(owner: $owner, name: $name) {
+    pullRequest(number: $number) {
+      reviews(first: $first, after: $after) {
+        pageInfo {
+          hasNextPage
+          endCursor
+        }
+        nodes {
+          comments {
+            totalCount
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+def to_rest_detail(node: dict) -> dict:
+    """Reshape a GraphQL pull request node into the fields of a REST pull request detail.
+
+    review_comments counts the first page of reviews only; iter_merged_pull_requests adds the rest.
+    """
+    return {
+        "id": node.get("databaseId"),
+        "number": node.get("number"),
+        "created_at": node.get("createdAt"),
+        "updated_at": node.get("updatedAt"),
+        "merged_at": node.get("mergedAt"),
+        "body": node.get("body"),
+        "additions": node.get("additions"),
+        "deletions": node.get("deletions"),
+        "changed_files": node.get("changedFiles"),
+        "commits": node["commits"]["totalCount"],
+        "comments": node["comments"]["totalCount"],
+        "review_comments": count_review_comments(node.get("reviews") or {}),
+        "user": {"login": (node.get("author") or {}).get("login")},
+    }
+
+
+def count_review_comments(reviews: dict) -> int:
+    return sum(review["comments"]["totalCount"] for review in reviews.get("nodes") or [])
+
+
+def remaining_review_comments(api_base: str, repo: str, headers: dict, number: int, reviews: dict) -> int:
+    """Review comments on the reviews after the first page of a PR's reviews connection."""
+    owner, name = repo.split("/", 1)
+    total = 0
+    while (reviews.get("pageInfo") or {}).get("hasNextPage"):
+        cursor = reviews["pageInfo"]["endCursor"]
+        variables = {"owner": owner, "name": name, "number": number, "first": 100, "after": cursor}
+        data = post_graphql(f"{api_base}/graphql", headers, REVIEWS_QUERY, variables)
+        reviews = data["repository"]["pullRequest"]["reviews"]
+        total += count_review_comments(reviews)
+    return total
+
+
+def iter_merged_pull_requests(
+    api_base: str,
+    repo: str,
+    headers: dict,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    after: str | None = None,
+    since: str | None = None,
+):
+    """Yield (details, end cursor) per page of merged PRs, newest first.
+
+    With `since`, PRs are ordered by update time and paging stops at the first older one.
+    """
+    owner, name = repo.split("/", 1)
+    variables = {
+        "owner": owner,
+        "name": name,
+        "first": page_size,
+        "after": after,
+        "orderField": "UPDATED_AT" if since else "CREATED_AT",
+        "reviews": REVIEWS_PAGE_SIZE,
+    }
+    while True:
+        data = post_graphql(f"{api_base}/graphql", headers, PULL_REQUESTS_QUERY, variables)
+        connection = data["repository"]["pullRequests"]
+        details = [to_rest_detail(node) for node in connection["nodes"]]
+        for node, detail in zip(connection["nodes"], details):
+            reviews = node.get("reviews") or {}
+            detail["review_comments"] += remaining_review_comments(api_base, repo, headers, node["number"], reviews)
+        cursor = connection["pageInfo"]["endCursor"]
+        if since:
+            fresh = [detail for detail in details if (detail["updated_at"] or "") >= since]
+            if fresh:
+                yield fresh, cursor
+            if len(fresh) < len(details):
+                return
+        elif details:
+            yield details, cursor
+        if not connection["pageInfo"]["hasNextPage"]:
+            return
+        variables["after"] = cursor
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_MB = 1024
+EVICT_EVERY = 200
+
+
+class CacheMiss(LookupError):
+    pass
+
+
+class CachedResponse:
+    def __init__(self, body: bytes, headers: dict, etag: str | None, last_modified: str | None) -> None:
+        self.body = body
+        self.headers = headers
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def json(self):
+        return json.loads(self.body)
+
+
+def cache_key(url: str, params: dict | None) -> str:
+    items = sorted((params or {}).items())
+    raw = url + "?" + "&".join(f"{k}={v}" for k, v in items)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite store of GitHub responses keyed by URL and query parameters.
+
+    An offline cache is only replayed: the TTL is ignored and expired responses are kept, since
+    there is no way to fetch them again.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float, max_bytes: int, offline: bool = False) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.offline = offline
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._conn = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+        self.evict()
+
+    def get(self, url: str, params: dict | None = None) -> CachedResponse | None:
+        key = cache_key(url, params)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, headers, etag, last_modified, fetched_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            body, headers, etag, last_modified, fetched_at = row
+            if not self.offline and time.time() - fetched_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return CachedResponse(body, json.loads(headers), etag, last_modified)
+
+    def put(self, url: str, params: dict | None, body: bytes, headers) -> None:
+        now = time.time()
+        stored_headers = {k: v for k, v in headers.items() if k.lower().startswith(("etag", "last-modified", "link", "x-ratelimit"))}
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    cache_key(url, params),
+                    url,
+                    headers.get("ETag"),
+                    headers.get("Last-Modified"),
+                    json.dumps(stored_headers),
+                    body,
+                    len(body),
+                    now,
+                    now,
+                ),
+            )
+            self._conn.commit()
+            self._puts += 1
+            due = self._puts % EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def refresh(self, url: str, params: dict | None) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, cache_key(url, params)),
+            )
+            self._conn.commit()
+
+    def evict(self) -> None:
+        """Drop expired entries (unless offline), then least recently used ones until under max_bytes."""
+        with self._lock:
+            if not self.offline:
+                self._conn.execute("DELETE FROM responses WHERE fetched_at < ?", (time.time() - self.ttl_seconds,))
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                cursor = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at")
+                doomed = []
+                for key, size in cursor:
+                    if total <= self.max_bytes:
+                        break
+                    doomed.append((key,))
+                    total -= size
+                self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,167 @@
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config import OUTPUT_CSV, resolve_input_path
+from timestamps import MISSING, to_epoch_seconds
+
+REQUIRED_COLUMNS = ("project", "author", "created_at", "merged_at", "comments", "merge_time", "delivery_time")
+
+# Numeric per-PR factors of the PR dataset, in dataset column order
+PR_FACTORS = (
+    "commits_per_pr",
+    "changed_files",
+    "churn",
+    "comments",
+    "comments_interval",
+    "merge_workload",
+    "description_length",
+    "contributor_experience",
+    "queue_rank",
+    "contributor_integration",
+    "stacktrace_attached",
+    "activities",
+    "merge_time",
+    "delivery_time",
+)
+
+# Sort keys pack a group code above the epoch seconds, which stay below 2**33 until the year 2242,
+# so one global sorted array answers "how many in my group before t" with a single searchsorted.
+GROUP_SHIFT = np.int64(2**33)
+# Key of a MISSING time: past every group, so no search of a real key counts it.
+MISSING_KEY = np.iinfo(np.int64).max
+
+
+def group_keys(codes: np.ndarray, seconds: np.ndarray) -> np.ndarray:
+    missing = seconds == MISSING
+    # Masked before packing: MISSING (the smallest int64) plus a group offset overflows.
+    return np.where(missing, MISSING_KEY, codes.astype(np.int64) * GROUP_SHIFT + np.where(missing, 0, seconds))
+
+
+def blank_where(counts: np.ndarray, mask: np.ndarray) -> pd.arrays.IntegerArray:
+    """Counts as a nullable integer column, blank where `mask` is set."""
+    return pd.arrays.IntegerArray(np.where(mask, 0, counts).astype(np.int64), mask)
+
+
+def compute_pr_factors(prs: pd.DataFrame) -> pd.DataFrame:
+    """Return the five cross-PR factors for every row of a merged-PR table.
+
+    - merge_workload: PRs of the project opened and not yet merged when this PR was opened
+    - queue_rank: PRs of the project still open when this PR was merged
+    - contributor_experience: PRs the author opened in the project before this one
+    - contributor_integration: mean delivery_time of the author's PRs merged before this one was opened
+    - comments_interval: mean hours between the events of the PR (opening, each comment, merge)
+
+    PRs without a merge time count as still open. Factors that need a PR's own missing
+    created_at/merged_at are left blank.
+    """
+    created = to_epoch_seconds(prs["created_at"])
+    merged = to_epoch_seconds(prs["merged_at"])
+
+    project_codes = pd.factorize(prs["project"])[0]
+    created_keys = group_keys(project_codes, created)
+    merged_keys = group_keys(project_codes, merged)
+    created_sorted = np.sort(created_keys)
+    merged_sorted = np.sort(merged_keys)
+    # Lower-coded projects sit in front of both arrays and cancel out in each difference.
+    merge_workload = np.searchsorted(created_sorted, created_keys, "left") - np.searchsorted(merged_sorted, created_keys, "left")
+    queue_rank = np.searchsorted(created_sorted, merged_keys, "left") - np.searchsorted(merged_sorted, merged_keys, "right")
+
+    authors = prs["author"].fillna("").astype(str)
+    author_codes = prs.assign(author=authors).groupby(["project", "author"], sort=False).ngroup().to_numpy()
+    group_start = author_codes.astype(np.int64) * GROUP_SHIFT
+    author_created = group_keys(author_codes, created)
+    author_created_sorted = np.sort(author_created)
+    contributor_experience = np.searchsorted(author_created_sorted, author_created, "left") - np.searchsorted(
+        author_created_sorted, group_start, "left"
+    )
+
+    author_merged = group_keys(author_codes, merged)
+    order = np.argsort(author_merged, kind="stable")
+    merged_by_author = author_merged[order]
+    # PRs not yet shipped in a release have no delivery_time and are left out of the average.
+    delivery = prs["delivery_time"].to_numpy(dtype=float)[order]
+    delivered = ~np.isnan(delivery)
+    delivery_sums = np.concatenate(([0.0], np.cumsum(np.where(delivered, delivery, 0.0))))
+    delivered_counts = np.concatenate(([0], np.cumsum(delivered)))
+    upper = np.searchsorted(merged_by_author, author_created, "left")
+    lower = np.searchsorted(merged_by_author, group_start, "left")
+    prior_delivered = delivered_counts[upper] - delivered_counts[lower]
+    contributor_integration = np.divide(
+        delivery_sums[upper] - delivery_sums[lower],
+        prior_delivered,
+        out=np.zeros(len(prs)),
+        where=prior_delivered > 0,
+    )
+
+    anonymous = (authors == "").to_numpy()
+    contributor_experience[anonymous] = 0
+    contributor_integration[anonymous] = 0.0
+    unknown_created = created == MISSING
+    contributor_integration[unknown_created] = np.nan
+
+    comments = prs["comments"].to_numpy(dtype=float)
+    comments_interval = prs["merge_time"].to_numpy(dtype=float) / (comments + 1)
+
+    return pd.DataFrame(
+        {
+            "comments_interval": comments_interval,
+            "merge_workload": blank_where(np.maximum(merge_workload, 0), unknown_created),
+            "contributor_experience": blank_where(contributor_experience, unknown_created),
+            "queue_rank": blank_where(np.maximum(queue_rank, 0), unknown_created | (merged == MISSING)),
+            "contributor_integration": contributor_integration,
+        },
+        index=prs.index,
+    )
+
+
+def read_pull_requests(path: Path) -> pd.DataFrame:
+    """Read a collected PR CSV as text so untouched columns are written back unchanged."""
+    prs = pd.read_csv(path, dtype=str, keep_default_na=False)
+    prs = prs.rename(columns={"Unnamed: 0": ""})
+    missing = [column for column in REQUIRED_COLUMNS if column not in prs.columns]
+    if missing:
+        raise SystemExit(f"{path} lacks {', '.join(missing)}; re-collect it with collect_pr.py to compute PR factors.")
+    return prs
+
+
+def apply_pr_factors(prs: pd.DataFrame) -> pd.DataFrame:
+    if prs.empty:
+        return prs
+    numeric = prs[["comments", "merge_time", "delivery_time"]].apply(pd.to_numeric, errors="coerce")
+    factors = compute_pr_factors(prs[["project", "author", "created_at", "merged_at"]].join(numeric))
+    for column in factors.columns:
+        prs[column] = factors[column]
+    return prs
+
+
+def annotate_pull_requests(path: Path) -> int:
+    """Recompute the cross-PR factor columns of a collected pull_requests.csv in place."""
+    prs = apply_pr_factors(read_pull_requests(path))
+    prs.to_csv(path, index=False)
+    return len(prs)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compute cross-PR factors for a collected pull_requests.csv.")
+    parser.add_argument(
+        "--input",
+        default=OUTPUT_CSV,
+        help="PR CSV to update in place (relative to repo root or absolute).",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    path = resolve_input_path(args.input)
+    started = time.perf_counter()
+    rows = annotate_pull_requests(path)
+    print(f"Computed PR factors for {rows} PRs in {time.perf_counter() - started:.2f}s. Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
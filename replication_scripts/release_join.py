@@ -0,0 +1,92 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import OUTPUT_CSV, RELEASES_OUTPUT_CSV, resolve_input_path
+from pr_features import MISSING_KEY, apply_pr_factors, blank_where, group_keys, read_pull_requests
+from timestamps import MISSING, hours_between, to_epoch_seconds
+
+
+def prefix_counts(sorted_keys: np.ndarray, start_keys: np.ndarray, end_keys: np.ndarray) -> np.ndarray:
+    """Number of sorted_keys inside each closed window [start, end]."""
+    return np.searchsorted(sorted_keys, end_keys, "right") - np.searchsorted(sorted_keys, start_keys, "left")
+
+
+def join_releases(prs: pd.DataFrame, releases: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Assign every merged PR to the first stable release of its project published after the merge.
+
+    Fills the PRs' delivery_time (hours from merge to release; blank if not released yet) and the
+    releases' created/merged/released PR counts and the churn of the PRs submitted in their window.
+    PRs and releases with missing timestamps are left out of every window; the window counts of a
+    release without startedAt/publishedAt are blank.
+    """
+    project_codes, _ = pd.factorize(pd.concat([prs["project"], releases["project"]], ignore_index=True))
+    pr_codes = project_codes[: len(prs)]
+    release_codes = project_codes[len(prs) :]
+
+    merged_seconds = to_epoch_seconds(prs["merged_at"])
+    started_seconds = to_epoch_seconds(releases["startedAt"])
+    published_seconds = to_epoch_seconds(releases["publishedAt"])
+    created = group_keys(pr_codes, to_epoch_seconds(prs["created_at"]))
+    merged = group_keys(pr_codes, merged_seconds)
+    started = group_keys(release_codes, started_seconds)
+    published = group_keys(release_codes, published_seconds)
+
+    # A sentinel past every real release stands for "not released yet"; PRs without a merge time
+    # and releases without a publish time sort onto (or into) it.
+    release_order = np.argsort(published, kind="stable")
+    published_sorted = np.append(published[release_order], MISSING_KEY)
+    codes_sorted = np.append(release_codes[release_order], -1)
+    position = np.minimum(np.searchsorted(published_sorted, merged, "right"), len(release_order))
+    released = (codes_sorted[position] == pr_codes) & (published_sorted[position] != MISSING_KEY)
+    release_index = np.append(release_order, -1)[position]
+    delivered_at = np.append(published_seconds[release_order], MISSING)[position]
+    prs["delivery_time"] = np.where(released, hours_between(merged_seconds, delivered_at), np.nan)
+
+    churn = pd.to_numeric(prs["churn"], errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+    created_order = np.argsort(created, kind="stable")
+    created_sorted = created[created_order]
+    churn_sums = np.concatenate(([0], np.cumsum(churn[created_order])))
+    window_start = np.searchsorted(created_sorted, started, "left")
+    window_end = np.searchsorted(created_sorted, published, "right")
+
+    unknown_window = (started_seconds == MISSING) | (published_seconds == MISSING)
+
+    releases["created_pull_requests"] = blank_where(window_end - window_start, unknown_window)
+    releases["merged_pull_requests"] = blank_where(prefix_counts(np.sort(merged), started, published), unknown_window)
+    releases["released_pull_requests"] = np.bincount(release_index[released], minlength=len(releases))
+    sums = churn_sums[window_end] - churn_sums[window_start]
+    releases["sum_submitted_pr_churn"] = blank_where(sums, unknown_window)
+    return prs, releases
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Join collected PRs to the stable releases that delivered them.")
+    parser.add_argument("--prs", default=OUTPUT_CSV, help="PR CSV to update in place.")
+    parser.add_argument("--releases", default=RELEASES_OUTPUT_CSV, help="Release CSV to update in place.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    prs_path = resolve_input_path(args.prs)
+    releases_path = resolve_input_path(args.releases)
+
+    started = time.perf_counter()
+    prs = read_pull_requests(prs_path)
+    releases = pd.read_csv(releases_path, dtype=str, keep_default_na=False)
+    prs, releases = join_releases(prs, releases)
+    # contributor_integration averages delivery times, so it changes with the join.
+    prs = apply_pr_factors(prs)
+    prs.to_csv(prs_path, index=False)
+    releases.to_csv(releases_path, index=False)
+
+    delivered = prs["delivery_time"].notna().sum()
+    print(f"Assigned {delivered}/{len(prs)} PRs to {len(releases)} releases in {time.perf_counter() - started:.2f}s.")
+    print(f"Done. Wrote {prs_path} and {releases_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+
+from artifact_cache import DEFAULT_MAX_MB, ArtifactCache
+from config import (
+    ARTIFACT_CACHE_PATH,
+    COMPARISON_JSON,
+    DEFAULT_CHUNK_ROWS,
+    DEFAULT_CONFIDENCE,
+    OUTPUT_CSV,
+    PROVIDED_PRS_CSV,
+    PROVIDED_RELEASES_CSV,
+    RELEASES_OUTPUT_CSV,
+    RESULTS_JSON,
+    resolve_input_path,
+)
+from findings import select_findings
+
+# Only the standard library, config, the finding registry and the artifact cache are imported up
+# front, so --list and --help answer without loading pandas or scipy; `run` imports the analysis
+# modules when it starts.
+
+RQS = {"1": [1], "2": [2], "all": None}
+# (name, PR dataset, release dataset) configurations compared by default: the paper's data and ours
+DEFAULT_COMPARISON = [
+    ("provided", PROVIDED_PRS_CSV, PROVIDED_RELEASES_CSV),
+    ("collected", OUTPUT_CSV, RELEASES_OUTPUT_CSV),
+]
+
+
+def add_analysis_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--rq", choices=sorted(RQS), default="all", help="Research question to run.")
+    parser.add_argument(
+        "--finding",
+        action="append",
+        help="Run only this finding (e.g. rq1.3, see --list) instead of a whole RQ; repeatable.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read datasets in chunks and aggregate incrementally, for datasets larger than memory.",
+    )
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Rows per chunk with --stream.")
+    parser.add_argument(
+        "--resamples",
+        type=int,
+        default=0,
+        help="Bootstrap/permutation resamples per project (e.g. 10000); 0 skips resampling.",
+    )
+    parser.add_argument("--confidence", type=float, default=DEFAULT_CONFIDENCE, help="Bootstrap CI level.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the resampling RNG.")
+    parser.add_argument(
+        "--resample-jobs",
+        type=int,
+        help="Processes that resample projects in parallel (default: all cores, split between datasets with compare).",
+    )
+    parser.add_argument(
+        "--artifact-cache",
+        default=ARTIFACT_CACHE_PATH,
+        help="SQLite cache of aggregates keyed by dataset fingerprint (relative to repo root or absolute).",
+    )
+    parser.add_argument("--no-artifact-cache", action="store_true", help="Compute every aggregate from the datasets.")
+    parser.add_argument(
+        "--artifact-cache-max-mb",
+        type=float,
+        default=DEFAULT_MAX_MB,
+        help="Evict least recently used aggregates once the cache exceeds this size.",
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the replication analyses over the datasets.")
+    parser.add_argument("--list", action="store_true", help="List the findings and the columns they read, then exit.")
+    commands = parser.add_subparsers(dest="command")
+    run = commands.add_parser("run", help="Run the findings of one or all RQs and write one results file.")
+    add_analysis_arguments(run)
+    run.add_argument("--output", default=RESULTS_JSON, help="Results JSON (relative to repo root or absolute).")
+    run.add_argument("--jobs", type=int, default=1, help="Run this many findings at once in threads.")
+    run.add_argument("--prs", help="PR dataset to analyse instead of the provided one.")
+    run.add_argument("--releases", help="Release dataset to analyse instead of the provided one.")
+    run.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Also trace Python allocations and report their peak (slows allocation-heavy findings).",
+    )
+
+    compare = commands.add_parser(
+        "compare", help="Run the findings on several datasets at once and tabulate where their results differ."
+    )
+    add_analysis_arguments(compare)
+    compare.add_argument(
+        "--dataset",
+        nargs=3,
+        action="append",
+        metavar=("NAME", "PRS", "RELEASES"),
+        help="A dataset configuration to compare; repeatable (default: the provided and the collected data).",
+    )
+    compare.add_argument(
+        "--output",
+        default=COMPARISON_JSON,
+        help="Comparison JSON (relative to repo root or absolute); the diff table is also written next to it as CSV.",
+    )
+    compare.add_argument("--jobs", type=int, help="Datasets analysed at once, in separate processes (default: all).")
+    args = parser.parse_args()
+    if not args.list and args.command is None:
+        parser.error("a command is required unless --list is given")
+    return args
+
+
+def open_cache(args: argparse.Namespace) -> ArtifactCache | None:
+    if args.no_artifact_cache:
+        return None
+    return ArtifactCache(resolve_input_path(args.artifact_cache), int(args.artifact_cache_max_mb * 1024 * 1024))
+
+
+def list_findings() -> None:
+    for item in select_findings():
+        columns = "; ".join(f"{name}: {', '.join(columns)}" for name, columns in item.columns.items())
+        print(f"{item.id:<7} {item.function.__name__:<32} {columns}")
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process so far, in MB; None without the resource module."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)  # bytes on macOS, kilobytes elsewhere
+
+
+def run(args: argparse.Namespace) -> None:
+    from analysis import AnalysisContext, run_findings
+    from resampling import default_jobs
+    from streaming import StreamingContext
+
+    paths = {name: path for name, path in (("pull_requests", args.prs), ("releases", args.releases)) if path}
+    cache = open_cache(args)
+
+    if args.profile_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    findings = select_findings(RQS[args.rq], args.finding)
+    options = {
+        "resamples": args.resamples,
+        "confidence": args.confidence,
+        "seed": args.seed,
+        "resample_jobs": args.resample_jobs or default_jobs(),
+        "cache": cache,
+    }
+    if args.stream:
+        context = StreamingContext(findings, paths, args.chunk_rows, **options)
+    else:
+        context = AnalysisContext(findings, paths, **options)
+    try:
+        results = run_findings(findings, context, args.jobs)
+        datasets = context.datasets_info()
+    finally:
+        context.close()
+        if cache:
+            cache.close()
+    elapsed = time.perf_counter() - started
+    memory = {"peak_rss_mb": peak_rss_mb()}
+    if args.profile_memory:
+        memory["peak_traced_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    memory = {key: round(value, 1) for key, value in memory.items() if value is not None}
+
+    for result in results:
+        print(f"RQ{result['rq']} {result['finding']}. {result['text']}")
+
+    output_path = resolve_input_path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "elapsed_seconds": round(elapsed, 3),
+        "mode": "stream" if args.stream else "memory",
+        **memory,
+        "datasets": datasets,
+        "findings": results,
+    }
+    output_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    if cache:
+        print(f"Artifact cache: {cache.hits} hits, {cache.misses} misses.")
+    labels = {"peak_rss_mb": "peak RSS", "peak_traced_mb": "peak traced"}
+    usage = ", ".join(f"{labels[key]} {value:.1f} MB" for key, value in memory.items())
+    print(f"Ran {len(results)} findings in {elapsed:.2f}s ({usage or 'memory not measured'}). Wrote {output_path}")
+
+
+def compare(args: argparse.Namespace) -> None:
+    from comparison import compare_datasets, diff_table
+    from resampling import default_jobs
+
+    datasets = args.dataset or DEFAULT_COMPARISON
+    configs = {name: {"pull_requests": prs, "releases": releases} for name, prs, releases in datasets}
+    if len(configs) < len(datasets):
+        raise SystemExit("Each --dataset needs a distinct NAME.")
+    jobs = args.jobs or len(configs)
+    options = {
+        "resamples": args.resamples,
+        "confidence": args.confidence,
+        "seed": args.seed,
+        # The dataset processes share the cores, so each resamples with its share of them.
+        "resample_jobs": args.resample_jobs or max(default_jobs() // min(jobs, len(configs)), 1),
+    }
+    cache_path = None if args.no_artifact_cache else resolve_input_path(args.artifact_cache)
+
+    started = time.perf_counter()
+    findings = select_findings(RQS[args.rq], args.finding)
+    evaluated = compare_datasets(
+        configs,
+        [item.id for item in findings],
+        jobs,
+        args.stream,
+        args.chunk_rows,
+        options,
+        cache_path,
+        int(args.artifact_cache_max_mb * 1024 * 1024),
+    )
+    elapsed = time.perf_counter() - started
+    table = diff_table({name: results for name, (results, _) in evaluated.items()})
+
+    print(table.to_string())
+
+    output_path = resolve_input_path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "elapsed_seconds": round(elapsed, 3),
+        "mode": "stream" if args.stream else "memory",
+        "datasets": {name: {"paths": configs[name], "rows": rows} for name, (_, rows) in evaluated.items()},
+        "findings": {name: results for name, (results, _) in evaluated.items()},
+        "diff": table.reset_index().to_dict("records"),
+    }
+    output_path.write_text(json.dumps(report, indent=2, default=str) + "\n", encoding="utf-8")
+    table.to_csv(output_path.with_suffix(".csv"))
+    differing = int(table["differs"].sum())
+    print(
+        f"Compared {len(findings)} findings on {len(configs)} datasets in {elapsed:.2f}s; {differing}/{len(table)}"
+        f" values differ. Wrote {output_path} and {output_path.with_suffix('.csv')}"
+    )
+
+
+def main() -> None:
+    args = parse_args()
+    if args.list:
+        list_findings()
+    elif args.command == "compare":
+        compare(args)
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,71 +1,59 @@
-import pandas as pd
-from scipy.stats import mannwhitneyu
-# from cliffs_delta import cliffs_delta # There seems to be differences between this package and the calculations used by the authors
+from findings import add_uncertainty, finding, select_findings
 
-csv = pd.read_csv("datasets/Provided Data/pull_requests_meta_data.csv", )
-
-project_names = csv["project"].unique()
-
-csv["lifetime"] = csv["merge_time"] + csv["delivery_time"]
-
-mean_times = csv.groupby(["project", "practice"]).agg(
-    merge_time=("merge_time", "mean"),
-    delivery_time=("delivery_time", "mean"),
-	lifetime=("lifetime", "mean"),
-).reset_index()
+# Each finding reads the per-project test table of one value (CI/NO-CI means and medians, the
+# Mann-Whitney test and Cliff's delta with the paper's magnitude thresholds) from the shared context.
 
 
 ## 1
 
-projects_passed_delivery_p = []
-for project in project_names:
-
-	proj_post_ci_dt = csv.loc[(csv["project"] == project) & (csv["practice"] == "CI"), "delivery_time"]
-	proj_pre_ci_dt = csv.loc[(csv["project"] == project) & (csv["practice"] == "NO-CI"), "delivery_time"]
+@finding(1, 1, pull_requests=["delivery_time"])
+def faster_delivery(context):
+	delivery = context.practice_tests("pull_requests", "delivery_time")
+	passed_delivery_p = delivery[delivery["p_value"] < 0.05]  # & (delivery["cliffs_delta_magnitude"] != "negligible")
+	n = int((passed_delivery_p["mean_treatment"] < passed_delivery_p["mean_control"]).sum())
 
-	if (mannwhitneyu(proj_post_ci_dt, proj_pre_ci_dt)[1] < 0.05): # and cliffs_delta(proj_post_ci_dt, proj_pre_ci_dt)[1] == "negligible"
-		projects_passed_delivery_p.append(project)
-
-n = 0
-for project in projects_passed_delivery_p:
-	x = mean_times.loc[(mean_times["project"] == project)]
-	if (x.loc[x["practice"] == "CI", "delivery_time"].values[0]
-		< x.loc[x["practice"] == "NO-CI", "delivery_time"].values[0]):
-		n += 1
-
-print(f"1. {n/len(projects_passed_delivery_p):.1%} ({n}/{len(projects_passed_delivery_p)}) of the projects deliver merged PRs more quickly after the adoption of CI.")
+	result = {
+		"text": f"{n/len(passed_delivery_p):.1%} ({n}/{len(passed_delivery_p)}) of the projects deliver merged PRs more quickly after the adoption of CI.",
+		"projects": n,
+		"total": len(passed_delivery_p),
+	}
+	return add_uncertainty(context, result, "pull_requests", "delivery_time", "mean", increase=False)
 
 
 ## 2
 
-projects_passed_merge_p = []
-for project in project_names:
-	if (mannwhitneyu(
-		csv.loc[(csv["project"] == project) & (csv["practice"] == "CI"), "merge_time"],
-		csv.loc[(csv["project"] == project) & (csv["practice"] == "NO-CI"), "merge_time"]
-	)[1] < 0.05):
-		projects_passed_merge_p.append(project)
+@finding(1, 2, pull_requests=["merge_time"])
+def faster_merge_before_ci(context):
+	merge = context.practice_tests("pull_requests", "merge_time")
+	passed_merge_p = merge[merge["p_value"] < 0.05]
+	n = int((passed_merge_p["mean_treatment"] > passed_merge_p["mean_control"]).sum())
 
-n = 0
-for project in projects_passed_merge_p:
-	x = mean_times.loc[(mean_times["project"] == project)]
-	if (x.loc[x["practice"] == "CI", "merge_time"].values[0]
-		> x.loc[x["practice"] == "NO-CI", "merge_time"].values[0]):
-		n += 1
-
-print(f"2. In {n/len(projects_passed_merge_p):.1%} ({n}/{len(projects_passed_merge_p)}) of the projects, PRs are merged faster before adopting CI.")
+	result = {
+		"text": f"In {n/len(passed_merge_p):.1%} ({n}/{len(passed_merge_p)}) of the projects, PRs are merged faster before adopting CI.",
+		"projects": n,
+		"total": len(passed_merge_p),
+	}
+	return add_uncertainty(context, result, "pull_requests", "merge_time", "mean", increase=True)
 
 
 ## 3
 
-n = 0
-for project in project_names:
-	x = mean_times.loc[(mean_times["project"] == project)]
-	if (x.loc[x["practice"] == "CI", "lifetime"].values[0]
-		> x.loc[x["practice"] == "NO-CI", "lifetime"].values[0]):
-		n += 1
+@finding(1, 3, pull_requests=["merge_time", "delivery_time", "lifetime"])
+def longer_lifetime(context):
+	lifetime = context.practice_tests("pull_requests", "lifetime")
+	n = int((lifetime["mean_treatment"] > lifetime["mean_control"]).sum())
+
+	result = {
+		"text": f"In {n/len(lifetime):.1%} ({n}/{len(lifetime)}) of the projects, PRs have a longer lifetime after adopting CI.",
+		"projects": n,
+		"total": len(lifetime),
+	}
+	return add_uncertainty(context, result, "pull_requests", "lifetime", "mean", increase=True)
 
-print(f"3. In {n/len(project_names):.1%} ({n}/{len(project_names)}) of the projects, PRs have a longer lifetime after adopting CI.")
 
+if __name__ == "__main__":
+	from analysis import AnalysisContext, run_findings
 
-# Yeaa.... not the best code
+	findings = select_findings([1])
+	for result in run_findings(findings, AnalysisContext(findings)):
+		print(f"{result['finding']}. {result['text']}")
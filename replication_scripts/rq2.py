@@ -1,23 +1,5 @@
-import pandas as pd
-from scipy.stats import mannwhitneyu, pearsonr
-from cliffs_delta import cliffs_delta
-import matplotlib.pyplot as plt
-
-releases_csv = pd.read_csv("datasets/Provided Data/releases_meta_data.csv", parse_dates=["startedAt", "publishedAt"])
-
-project_names = releases_csv["project"].unique()
-
-mean_data = releases_csv.groupby(["project", "practice"]).agg(
-	created_pull_requests=("created_pull_requests", "mean"),
-	merged_pull_requests=("merged_pull_requests", "mean"),
-	released_pull_requests=("released_pull_requests", "mean"),
-)
-
-median_data = releases_csv.groupby(["practice"]).agg(
-	created_pull_requests=("created_pull_requests", "median"),
-	merged_pull_requests=("merged_pull_requests", "median"),
-	released_pull_requests=("released_pull_requests", "median"),
-)
+from config import CI, NO_CI
+from findings import add_uncertainty, finding, select_findings
 
 # Idk why the authors changed the terminology between the code and paper, but
 #   -   created_pull_requests -> Submitted PRs
@@ -26,96 +8,96 @@ median_data = releases_csv.groupby(["practice"]).agg(
 #   - (sum_submitted_pr_churn -> Amount of code changes in PRs)
 
 
-## 1 - Increase in PR submissions after CI (by number of projects)
+def project_names(context):
+	return context.projects("releases")
 
-n = 0
-for project in project_names:
-	if (mean_data.at[(project, 'CI'), "created_pull_requests"] > mean_data.at[(project, 'NO-CI'), "created_pull_requests"]):
-		n += 1
-
-print(f"1. {n/len(project_names):.1%} ({n}/{len(project_names)}) of the projects increase PR submissions after adopting CI.")
-
-
-## 2 - Increase in PRs delivered after CI (overall)
-
-pre_ci_released_prs_list = []
-post_ci_released_prs_list = []
-
-n = 0
-for project in project_names:
-	pre_ci_released_prs_list.append(mean_data.at[(project, 'CI'), "released_pull_requests"])
-	post_ci_released_prs_list.append(mean_data.at[(project, 'NO-CI'), "released_pull_requests"])
-
-print(f"2. After adopting CI projects deliver {pd.Series(pre_ci_released_prs_list).agg("median")/pd.Series(post_ci_released_prs_list).agg("median"):.2f} times more PRs per release than before CI.")
-
-
-# for i in ["created_pull_requests", "merged_pull_requests", "released_pull_requests"]:
-#     print(csv[["practice", i]].groupby("practice").describe())
-
-# csv.loc[csv["practice"] == "CI", "merged_pull_requests"].to_csv("oooooo.csv")
-# csv.boxplot(column=["merged_pull_requests"], by=["practice"])
-# plt.show()
 
+def per_project(context, name, value, stat, practice):
+	# Per-(project, practice) means/medians come from the context's shared summary
+	return context.practice_stat(name, value, stat, practice).reindex(project_names(context))
 
 
+## 1 - Increase in PR submissions after CI (by number of projects)
 
+@finding(2, 1, releases=["created_pull_requests"])
+def more_submissions(context):
+	projects = project_names(context)
+	n = int((per_project(context, "releases", "created_pull_requests", "mean", CI)
+		> per_project(context, "releases", "created_pull_requests", "mean", NO_CI)).sum())
 
-# print(csv.loc[csv["practice"] == "CI", "merged_pull_requests"])
+	result = {
+		"text": f"{n/len(projects):.1%} ({n}/{len(projects)}) of the projects increase PR submissions after adopting CI.",
+		"projects": n,
+		"total": len(projects),
+	}
+	return add_uncertainty(context, result, "releases", "created_pull_requests", "mean", increase=True)
 
-# print(csv.loc[csv["practice"] == "CI", "merged_pull_requests"])
-# print(csv.loc[csv["practice"] == "CI", :])
-# print(csv.loc[csv["practice"] == "CI", "merged_pull_requests"])
-# csv.loc[csv["practice"] == "CI", "merged_pull_requests"]
 
-# boxx = csv.boxplot(by=["merged_pull_requests"])
-# print("boxx", boxx)
+## 2 - Increase in PRs delivered after CI (overall)
 
+@finding(2, 2, releases=["released_pull_requests"])
+def more_delivered(context):
+	post_ci_median = per_project(context, "releases", "released_pull_requests", "mean", CI).median()
+	pre_ci_median = per_project(context, "releases", "released_pull_requests", "mean", NO_CI).median()
+	ratio = post_ci_median / pre_ci_median
 
-# plt.boxplot(csv.loc[csv["practice"] == "CI", "merged_pull_requests"].fillna(0))
-# plt.show()
+	return {
+		"text": f"After adopting CI projects deliver {ratio:.2f} times more PRs per release than before CI.",
+		"ratio": float(ratio),
+		"median_ci": float(post_ci_median),
+		"median_no_ci": float(pre_ci_median),
+	}
 
 
 ## 3 - (No) Difference in release frequency after CI
 
-pre_ci_releases_per_year_list = []
-post_ci_releases_per_year_list = []
-for project in project_names:
-	release_counts = releases_csv.loc[(releases_csv["project"] == project), :].groupby(["practice", releases_csv["publishedAt"].dt.year]).count()["title"]
+@finding(2, 3, releases=["title", "publishedAt"])
+def release_frequency(context):
+	release_counts = context.yearly_counts("releases", "publishedAt", "title")
 	# In the form (Series):
 
-	# practice  publishedAt
-	# CI        2015           3
-	#           2016           4
-	#           ...
-	# NO-CI     2009           3
-	#           2011           5
-	#           ...
+	# project     practice  publishedAt
+	# owner/repo  CI        2015           3
+	#                       2016           4
+	#                       ...
+	#             NO-CI     2009           3
+	#                       2011           5
+	#                       ...
 	# Name: title, dtype: int64
 
-	pre_ci_releases_per_year_list.extend(release_counts["NO-CI"])
-	post_ci_releases_per_year_list.extend(release_counts["CI"])
+	pre_ci = release_counts.xs(NO_CI, level="practice").median()
+	post_ci = release_counts.xs(CI, level="practice").median()
 
-# plt.boxplot(post_ci_releases_per_year_list)
-# plt.savefig("releases_per_year_(ci)_boxplot.png", bbox_inches='tight')
-# plt.show()
+	# plt.boxplot(release_counts.xs(CI, level="practice"))
+	# plt.savefig("releases_per_year_(ci)_boxplot.png", bbox_inches='tight')
+	# plt.show()
 
-print(f"3. Median releases before and after adopting CI: {pd.Series(pre_ci_releases_per_year_list).agg("median")}, {pd.Series(post_ci_releases_per_year_list).agg("median")}")
+	return {
+		"text": f"Median releases before and after adopting CI: {pre_ci}, {post_ci}",
+		"median_no_ci": float(pre_ci),
+		"median_ci": float(post_ci),
+	}
 
 
 ## 4
 
-prs_csv = pd.read_csv("datasets/Provided Data/pull_requests_meta_data.csv")
+@finding(2, 4, pull_requests=["contributor_integration"])
+def more_contributors(context):
+	projects = project_names(context)
+	n = int((per_project(context, "pull_requests", "contributor_integration", "median", CI)
+		> per_project(context, "pull_requests", "contributor_integration", "median", NO_CI)).sum())
 
-median_prs_csv = prs_csv.groupby(["project", "practice"]).agg(
-    contributor_integration_median=("contributor_integration", "median"),
-    contributor_experience_median=("contributor_experience", "median"),
-)
+	result = {
+		"text": f"In {n/len(projects):.1%} ({n}/{len(projects)}) of the projects tend to increase the number of PR contributors per release after adopting CI.",
+		"projects": n,
+		"total": len(projects),
+	}
+	return add_uncertainty(context, result, "pull_requests", "contributor_integration", "median", increase=True)
 
-n = 0
-for project in project_names:
-	if (median_prs_csv.at[(project, 'CI'), "contributor_integration_median"]
-		> median_prs_csv.at[(project, 'NO-CI'), "contributor_integration_median"]):
-		n += 1
 
+if __name__ == "__main__":
+	from analysis import AnalysisContext, run_findings
 
-print(f"4. In {n/len(project_names):.1%} ({n}/{len(project_names)}) of the projects tend to increase the number of PR contributors per release after adopting CI.")
+	findings = select_findings([2])
+	for result in run_findings(findings, AnalysisContext(findings)):
+		print(f"{result['finding']}. {result['text']}")
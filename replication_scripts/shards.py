@@ -0,0 +1,69 @@
+import argparse
+import csv
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+
+def add_shard_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Crawl this many projects at once, each into its own shard file, then merge the shards.",
+    )
+    parser.add_argument(
+        "--projects",
+        nargs="+",
+        help="Only (re)crawl these projects' shards before merging; defaults to every project in config.py.",
+    )
+
+
+def is_sharded(args: argparse.Namespace) -> bool:
+    return args.jobs > 1 or bool(args.projects)
+
+
+def shard_dir(output_path: Path) -> Path:
+    return output_path.parent / f"{output_path.stem}.shards"
+
+
+def shard_path(output_path: Path, repo: str) -> Path:
+    return shard_dir(output_path) / (repo.replace("/", "__") + output_path.suffix)
+
+
+def run_sharded(crawl_project, projects: list[str], jobs: int, *args) -> list[str]:
+    """Run crawl_project(repo, *args) for each project in a process pool; return the projects that failed."""
+    failed = []
+    with ProcessPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        futures = {executor.submit(crawl_project, repo, *args): repo for repo in projects}
+        for future in as_completed(futures):
+            repo = futures[future]
+            try:
+                future.result()
+            except Exception as exc:
+                print(f"Failed to collect {repo}: {exc!r}")
+                failed.append(repo)
+    return [repo for repo in projects if repo in failed]
+
+
+def merge_shards(output_path: Path, projects: list[str], index_fields: tuple[str, ...] = ()) -> int:
+    """Concatenate project shards in `projects` order into output_path, renumbering index_fields globally."""
+    missing = [repo for repo in projects if not shard_path(output_path, repo).exists()]
+    if missing:
+        raise SystemExit(f"Missing shards for {', '.join(missing)}; re-run with --projects {' '.join(missing)}")
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    row_index = 0
+    writer = None
+    with output_path.open("w", newline="", encoding="utf-8") as csvfile:
+        for repo in projects:
+            with shard_path(output_path, repo).open(newline="", encoding="utf-8") as shard:
+                reader = csv.DictReader(shard)
+                if writer is None:
+                    writer = csv.DictWriter(csvfile, fieldnames=reader.fieldnames)
+                    writer.writeheader()
+                for row in reader:
+                    row_index += 1
+                    for field in index_fields:
+                        row[field] = row_index
+                    writer.writerow(row)
+    return row_index
@@ -0,0 +1,268 @@
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+from scipy.stats import mannwhitneyu
+
+from config import CI, NO_CI
+
+# Magnitude thresholds of Romano et al. (2006), used by the paper (and by the cliffs-delta package)
+CLIFFS_DELTA_THRESHOLDS = {"small": 0.147, "medium": 0.33, "large": 0.474}
+
+
+def cliffs_delta_magnitude(delta, thresholds: dict | None = None):
+    """Label |delta| as negligible/small/medium/large; works on scalars and arrays."""
+    thresholds = thresholds or CLIFFS_DELTA_THRESHOLDS
+    size = np.abs(np.asarray(delta, dtype=float))
+    labels = np.select(
+        [size < thresholds["small"], size < thresholds["medium"], size < thresholds["large"], size >= thresholds["large"]],
+        ["negligible", "small", "medium", "large"],
+        default="",
+    )
+    return labels.item() if labels.ndim == 0 else labels
+
+
+def cliffs_delta(x, y, thresholds: dict | None = None) -> tuple[float, str]:
+    """Cliff's delta of x vs y and its magnitude in O((n+m) log(n+m)).
+
+    Both samples are sorted and each distinct x value counts the y values below and above it
+    with one searchsorted, weighted by how often it repeats. Drop-in for
+    cliffs_delta.cliffs_delta, which walks the same runs in pure Python.
+    """
+    x = np.sort(np.asarray(x, dtype=float))
+    y = np.sort(np.asarray(y, dtype=float))
+    if not len(x) or not len(y):
+        return float("nan"), cliffs_delta_magnitude(np.nan, thresholds)
+    run_starts = np.concatenate(([0], np.flatnonzero(np.diff(x)) + 1))
+    values = x[run_starts]
+    repeats = np.diff(np.append(run_starts, len(x)))
+    below = np.dot(np.searchsorted(y, values, "left"), repeats)
+    above = np.dot(len(y) - np.searchsorted(y, values, "right"), repeats)
+    delta = float(below - above) / (len(x) * len(y))
+    return delta, cliffs_delta_magnitude(delta, thresholds)
+
+
+def practice_summary(data: pd.DataFrame, values: list[str], group: str = "project", split: str = "practice") -> pd.DataFrame:
+    """Mean, median and count of each value column per (group, split), computed in one groupby."""
+    summary = data.groupby([group, split], observed=True)[values].agg(["mean", "median", "count"])
+    summary.columns = [f"{value}_{stat}" for value, stat in summary.columns]
+    return summary.reset_index()
+
+
+def mann_whitney_by_code(codes: np.ndarray, x: np.ndarray, is_treatment: np.ndarray, count: int, value_sorted: bool = False) -> dict:
+    """Rank-sum statistics of the samples grouped by integer codes in [0, count).
+
+    Sorting by value (skipped if x is already sorted within each code) and then stably by code
+    gives every group's values in order, so average ranks, rank sums and tie runs are all
+    cumulative sums over one sorted array.
+    """
+    order = np.arange(len(x)) if value_sorted else np.argsort(x)
+    # Stable sorts of integers of 16 bits or less are radix sorts.
+    narrow = codes.astype(np.int16) if count <= np.iinfo(np.int16).max else codes
+    order = order[np.argsort(narrow[order], kind="stable")]
+    codes, x, is_treatment = codes[order], x[order], is_treatment[order]
+
+    run_starts = np.flatnonzero(np.diff(codes, prepend=-1) | (np.diff(x, prepend=np.nan) != 0))
+    run_lengths = np.diff(np.append(run_starts, len(x)))
+    run_codes = codes[run_starts]
+    n = np.bincount(codes, minlength=count)
+    group_starts = np.concatenate(([0], np.cumsum(n)[:-1]))
+    # Tied values share the average of the 1-based ranks they span within their group.
+    ranks = np.repeat(run_starts - group_starts[run_codes] + (run_lengths + 1) / 2, run_lengths)
+
+    return {
+        "n": n,
+        "n1": np.bincount(codes, weights=is_treatment, minlength=count),
+        "rank_sum": np.bincount(codes, weights=np.where(is_treatment, ranks, 0.0), minlength=count),
+        "tie_term": np.bincount(run_codes, weights=run_lengths.astype(float) ** 3 - run_lengths, minlength=count),
+        "has_ties": np.bincount(run_codes, weights=run_lengths > 1, minlength=count) > 0,
+        "group_starts": group_starts,
+        "x": x,
+        "is_treatment": is_treatment,
+    }
+
+
+def mann_whitney_results(stats: dict) -> pd.DataFrame:
+    """U, two-sided p-value and Cliff's delta per code from mann_whitney_by_code statistics."""
+    n, n1 = stats["n"], stats["n1"]
+    n2 = n - n1
+    u_statistic = stats["rank_sum"] - n1 * (n1 + 1) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = np.maximum(u_statistic, n1 * n2 - u_statistic)
+        sigma = np.sqrt(n1 * n2 / 12 * ((n + 1) - stats["tie_term"] / (n * (n - 1))))
+        z = (u - n1 * n2 / 2 - 0.5) / sigma
+        results = pd.DataFrame(
+            {
+                "n_treatment": n1.astype(np.int64),
+                "n_control": n2.astype(np.int64),
+                "u_statistic": u_statistic,
+                "p_value": np.clip(2 * ndtr(-z), 0.0, 1.0),
+                "cliffs_delta": 2 * u_statistic / (n1 * n2) - 1,
+            }
+        )
+
+    empty = (n1 == 0) | (n2 == 0)
+    results.loc[empty, ["u_statistic", "p_value", "cliffs_delta"]] = np.nan
+    exact = ~empty & ((n1 <= 8) | (n2 <= 8)) & ~stats["has_ties"]
+    for code in np.flatnonzero(exact):
+        rows = slice(stats["group_starts"][code], stats["group_starts"][code] + n[code])
+        values, treated = stats["x"][rows], stats["is_treatment"][rows]
+        results.loc[code, "p_value"] = mannwhitneyu(values[treated], values[~treated]).pvalue
+    return results
+
+
+def grouped_mann_whitney(
+    data: pd.DataFrame,
+    value: str,
+    group: str = "project",
+    split: str = "practice",
+    treatment: str = CI,
+    control: str = NO_CI,
+) -> pd.DataFrame:
+    """Two-sided Mann-Whitney U test of treatment vs control for every group at once.
+
+    U, the tie-corrected normal approximation (with continuity correction) and Cliff's delta
+    (2U / (n1 n2) - 1) follow from per-group rank sums, so the result matches
+    scipy.stats.mannwhitneyu group by group. Small tie-free groups, for which scipy uses the
+    exact distribution, are delegated to scipy.
+    """
+    frame = data.loc[data[split].isin([treatment, control]) & data[value].notna() & data[group].notna(), [group, split, value]]
+    codes, names = pd.factorize(frame[group], sort=True)
+    is_treatment = (frame[split] == treatment).to_numpy()
+    stats = mann_whitney_by_code(codes, frame[value].to_numpy(dtype=float), is_treatment, len(names))
+    results = mann_whitney_results(stats)
+    results.insert(0, group, names)
+    return results
+
+
+def batched_mann_whitney(
+    data: pd.DataFrame,
+    values: list[str],
+    group: str = "project",
+    split: str = "practice",
+    treatment: str = CI,
+    control: str = NO_CI,
+) -> pd.DataFrame:
+    """grouped_mann_whitney for every (group, value column) pair in one pass.
+
+    Groups and the practice split are resolved once and each column is sorted once; the sorted
+    columns are then stacked under one integer code per (group, value), so a single radix sort,
+    rank-sum and tie pass covers every test. Returns one row per (group, value) with a "value"
+    column naming the tested column.
+    """
+    frame = data.loc[data[split].isin([treatment, control]) & data[group].notna()]
+    group_codes, names = pd.factorize(frame[group], sort=True)
+    matrix = frame[values].to_numpy(dtype=float)
+    # Column-wise sort; NaNs go last and are dropped below.
+    rows = np.argsort(matrix, axis=0).T.ravel()
+    columns = np.repeat(np.arange(len(values)), len(matrix))
+    x = matrix[rows, columns]
+    present = ~np.isnan(x)
+    rows, columns, x = rows[present], columns[present], x[present]
+    codes = group_codes[rows] * len(values) + columns
+    is_treatment = (frame[split] == treatment).to_numpy()[rows]
+
+    stats = mann_whitney_by_code(codes, x, is_treatment, len(names) * len(values), value_sorted=True)
+    results = mann_whitney_results(stats)
+    results.insert(0, "value", np.tile(np.asarray(values, dtype=object), len(names)))
+    results.insert(0, group, np.repeat(np.asarray(names), len(values)))
+    # (group, value) pairs without a single sample are absent, as in grouped_mann_whitney.
+    return results.loc[stats["n"] > 0].reset_index(drop=True)
+
+
+def adjust_p_values(p_values, method: str = "holm") -> np.ndarray:
+    """Holm (family-wise) or Benjamini-Hochberg ("bh", false discovery rate) adjusted p-values.
+
+    NaN p-values are left as NaN and do not count towards the number of tests.
+    """
+    p_values = np.asarray(p_values, dtype=float)
+    adjusted = np.full(p_values.shape, np.nan)
+    tested = np.flatnonzero(~np.isnan(p_values))
+    m = len(tested)
+    if not m:
+        return adjusted
+    order = tested[np.argsort(p_values[tested], kind="stable")]
+    ranked = p_values[order]
+    if method == "holm":
+        values = np.maximum.accumulate((m - np.arange(m)) * ranked)
+    elif method == "bh":
+        values = np.minimum.accumulate((ranked * m / np.arange(1, m + 1))[::-1])[::-1]
+    else:
+        raise ValueError(f"Unknown p-value adjustment {method!r}; use 'holm' or 'bh'.")
+    adjusted[order] = np.minimum(values, 1.0)
+    return adjusted
+
+
+def attach_practice_stats(
+    tested: pd.DataFrame,
+    summary: pd.DataFrame,
+    group: str = "project",
+    split: str = "practice",
+    treatment: str = CI,
+    control: str = NO_CI,
+    thresholds: dict | None = None,
+) -> pd.DataFrame:
+    """Add per-practice means/medians from a practice_summary to a long (group, value) test table."""
+    summary = summary.set_index([group, split])
+    values = list(tested["value"].unique())
+    keys = pd.MultiIndex.from_arrays([tested[group], tested["value"]])
+    tested = tested.copy()
+    for label, practice in (("treatment", treatment), ("control", control)):
+        stats = summary.xs(practice, level=split)
+        for stat in ("mean", "median"):
+            wide = stats[[f"{value}_{stat}" for value in values]].set_axis(values, axis=1)
+            tested[f"{stat}_{label}"] = wide.stack().reindex(keys).to_numpy()
+    tested["cliffs_delta_magnitude"] = cliffs_delta_magnitude(tested["cliffs_delta"].to_numpy(), thresholds)
+    columns = [group, "value", "n_treatment", "n_control", "mean_treatment", "mean_control",
+               "median_treatment", "median_control", "u_statistic", "p_value", "cliffs_delta", "cliffs_delta_magnitude"]
+    return tested[columns]
+
+
+def compare_practices(
+    data: pd.DataFrame,
+    values: list[str],
+    group: str = "project",
+    split: str = "practice",
+    treatment: str = CI,
+    control: str = NO_CI,
+    thresholds: dict | None = None,
+    summary: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """Tidy table with one row per (group, value): per-practice means/medians and the U test.
+
+    A practice_summary of the data covering `values` can be passed in to skip recomputing it.
+    """
+    if summary is None:
+        summary = practice_summary(data, values, group, split)
+    if len(values) == 1:
+        tested = grouped_mann_whitney(data, values[0], group, split, treatment, control).assign(value=values[0])
+    else:
+        tested = batched_mann_whitney(data, values, group, split, treatment, control)
+        # One block of groups per value column, in the order given
+        tested = tested.iloc[np.lexsort((tested.index, tested["value"].map(values.index)))]
+    table = attach_practice_stats(tested, summary, group, split, treatment, control, thresholds)
+    return table.reset_index(drop=True)
+
+
+def corrected_practice_tests(
+    data: pd.DataFrame,
+    values: list[str],
+    group: str = "project",
+    split: str = "practice",
+    treatment: str = CI,
+    control: str = NO_CI,
+    thresholds: dict | None = None,
+    family: str | None = None,
+) -> pd.DataFrame:
+    """compare_practices over many value columns, with Holm and Benjamini-Hochberg adjusted p-values.
+
+    By default all (group, value) tests form one family; family="value" (or group) corrects
+    within each value column (or group) instead.
+    """
+    table = compare_practices(data, values, group, split, treatment, control, thresholds)
+    families = table.groupby(family, sort=False).indices.values() if family else [np.arange(len(table))]
+    for method in ("holm", "bh"):
+        adjusted = np.full(len(table), np.nan)
+        for rows in families:
+            adjusted[rows] = adjust_p_values(table["p_value"].to_numpy()[rows], method)
+        table.insert(table.columns.get_loc("p_value") + 1 + (method == "bh"), f"p_{method}", adjusted)
+    return table
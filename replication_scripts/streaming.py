@@ -0,0 +1,195 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analysis import GROUP_COLUMNS, AnalysisContext, add_derived_columns, require_practice
+from config import DEFAULT_CHUNK_ROWS, resolve_input_path
+from datasets_io import iter_dataset
+from resampling import resample_practices
+from stats_engine import attach_practice_stats, grouped_mann_whitney
+
+
+def global_codes(column: pd.Series, known: dict) -> np.ndarray:
+    """Codes of a chunk's labels in a run-wide label -> code dict, extended in order of first appearance."""
+    column = column.astype("category")
+    local = column.cat.codes.to_numpy()
+    for label in column.cat.categories[pd.unique(local)]:
+        known.setdefault(label, len(known))
+    mapping = np.array([known[label] for label in column.cat.categories], dtype=np.int64)
+    return mapping[local]
+
+
+class DatasetPass:
+    """Aggregates of one dataset built from a single pass over its chunks.
+
+    Sums, counts and per-year counts are running totals per (project, practice). The numeric
+    values themselves are appended to one spill file per project, so exact medians and rank
+    tests later need only one project's rows in memory, however many projects there are.
+    """
+
+    def __init__(self, spill_dir: Path) -> None:
+        self.spill_dir = spill_dir
+        self.projects = {}
+        self.practices = {}
+        self.values = None
+        self.totals = None
+        self.yearly = {}
+        self.rows = 0
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        self.rows += len(chunk)
+        chunk = chunk.dropna(subset=GROUP_COLUMNS)
+        if self.values is None:
+            self.values = [c for c in chunk.select_dtypes("number").columns if c not in GROUP_COLUMNS]
+        projects = global_codes(chunk["project"], self.projects)
+        practices = global_codes(chunk["practice"], self.practices)
+
+        values = chunk[self.values].astype(float)
+        if self.values:  # a finding may read only dates and labels of a dataset
+            totals = values.groupby([projects, practices]).agg(["sum", "count"])
+            self.totals = totals if self.totals is None else self.totals.add(totals, fill_value=0)
+
+        dates = chunk.select_dtypes("datetime").columns
+        others = [c for c in chunk.columns if c not in GROUP_COLUMNS and c not in self.values and c not in dates]
+        for date_column in dates:
+            years = chunk[date_column].dt.year.to_numpy()
+            for count_column in others:
+                counts = chunk[count_column].groupby([projects, practices, years]).count()
+                key = (date_column, count_column)
+                self.yearly[key] = counts if key not in self.yearly else self.yearly[key].add(counts, fill_value=0)
+
+        rows = np.column_stack([practices, values.to_numpy()])
+        order = np.argsort(projects, kind="stable")
+        codes, rows = projects[order], rows[order]
+        starts = np.flatnonzero(np.diff(codes, prepend=-1))
+        for start, block in zip(starts, np.split(rows, starts[1:])):
+            with open(self.spill_path(codes[start]), "ab") as spill:
+                spill.write(np.ascontiguousarray(block).tobytes())
+
+    def labelled(self, index: pd.MultiIndex) -> pd.MultiIndex:
+        """Replace the project and practice codes of an aggregate's index with their names."""
+        names = [pd.Index(list(self.projects)), pd.Index(list(self.practices))]
+        levels = [names[i].take(index.get_level_values(i)) for i in range(2)]
+        levels += [index.get_level_values(i) for i in range(2, index.nlevels)]
+        return pd.MultiIndex.from_arrays(levels, names=["project", "practice", *index.names[2:]])
+
+    def spill_path(self, code: int) -> str:
+        return f"{self.spill_dir}/{code}.bin"
+
+    def partitions(self, columns: list[str], batch_rows: int):
+        """Yield DataFrames of whole projects, about batch_rows rows each, with project, practice and columns."""
+        names = pd.Index(list(self.projects))
+        labels = pd.Index(list(self.practices))
+        positions = [1 + self.values.index(column) for column in columns]
+        blocks, codes, size = [], [], 0
+        for code in self.projects.values():
+            rows = np.fromfile(self.spill_path(code)).reshape(-1, 1 + len(self.values))
+            blocks.append(rows[:, [0, *positions]])
+            codes.append(np.full(len(rows), code))
+            size += len(rows)
+            if size >= batch_rows or code == len(names) - 1:
+                rows = np.concatenate(blocks)
+                frame = pd.DataFrame(rows[:, 1:], columns=columns)
+                frame.insert(0, "practice", pd.Categorical.from_codes(rows[:, 0].astype(int), labels))
+                frame.insert(0, "project", pd.Categorical.from_codes(np.concatenate(codes), names))
+                yield frame
+                blocks, codes, size = [], [], 0
+
+
+class StreamingContext(AnalysisContext):
+    """AnalysisContext that never holds a whole dataset in memory.
+
+    Each dataset is read once in chunks of chunk_rows. Means, counts and per-year counts are
+    accumulated per chunk; medians and the Mann-Whitney tests are exact and computed from
+    per-project spill files, so peak memory is bounded by the chunk size and the largest project.
+    Findings registered with whole_datasets=True are refused.
+    """
+
+    def __init__(self, findings, paths: dict[str, str] | None = None, chunk_rows: int = DEFAULT_CHUNK_ROWS, **options) -> None:
+        whole = [item.id for item in findings if item.whole_datasets]
+        if whole:
+            raise SystemExit(f"Finding(s) {', '.join(whole)} read whole datasets; run them without --stream.")
+        super().__init__(findings, paths, **options)
+        self.chunk_rows = chunk_rows
+        self._spill_root = Path(tempfile.mkdtemp(prefix="replication-spill-"))
+
+    def scan(self, name: str) -> DatasetPass:
+        def compute() -> DatasetPass:
+            spill_dir = self._spill_root / name
+            spill_dir.mkdir()
+            scanned = DatasetPass(spill_dir)
+            columns = [column for column in self.columns.get(name, []) if column != "lifetime"] or None
+            path = resolve_input_path(self.paths[name])
+            for chunk in iter_dataset(path, columns, self.chunk_rows):
+                scanned.add(add_derived_columns(require_practice(chunk, path)))
+            return scanned
+
+        return self._memo(("scan", name), compute)
+
+    def summary(self, name: str) -> pd.DataFrame:
+        def compute() -> pd.DataFrame:
+            scanned = self.scan(name)
+            medians = pd.concat(
+                [
+                    batch.groupby(GROUP_COLUMNS, observed=True)[scanned.values].median()
+                    for batch in scanned.partitions(scanned.values, self.chunk_rows)
+                ]
+            )
+            medians.index = pd.MultiIndex.from_arrays(
+                [medians.index.get_level_values(level).astype(str) for level in GROUP_COLUMNS], names=GROUP_COLUMNS
+            )
+            totals = scanned.totals.set_axis(scanned.labelled(scanned.totals.index)).reindex(medians.index)
+            summary = pd.DataFrame(index=medians.index)
+            for value in scanned.values:
+                counts = totals[(value, "count")].astype(np.int64)
+                summary[f"{value}_mean"] = totals[(value, "sum")] / counts.where(counts > 0)
+                summary[f"{value}_median"] = medians[value]
+                summary[f"{value}_count"] = counts
+            return summary.sort_index()
+
+        return self._memo(("summary", name), compute)
+
+    def practice_tests(self, name: str, value: str) -> pd.DataFrame:
+        def compute() -> pd.DataFrame:
+            tested = pd.concat(
+                [grouped_mann_whitney(batch, value) for batch in self.scan(name).partitions([value], self.chunk_rows)],
+                ignore_index=True,
+            )
+            tested["project"] = tested["project"].astype(str)
+            tested["value"] = value
+            return attach_practice_stats(tested, self.summary(name).reset_index()).set_index("project").sort_index()
+
+        return self._memo(("tests", name, value), compute)
+
+    def resampling(self, name: str, value: str) -> pd.DataFrame:
+        def compute() -> pd.DataFrame:
+            tables = [
+                resample_practices(batch, value, **self.resampling_options())
+                for batch in self.scan(name).partitions([value], self.chunk_rows)
+            ]
+            table = pd.concat(tables)
+            table.index = table.index.astype(str)
+            return table.sort_index()
+
+        return self._memo(("resampling", name, value), compute)
+
+    def rows(self, name: str) -> int:
+        return self._memo(("rows", name), lambda: self.scan(name).rows)
+
+    def projects(self, name: str) -> list[str]:
+        return self._memo(("projects", name), lambda: list(self.scan(name).projects))
+
+    def yearly_counts(self, name: str, date_column: str, count_column: str) -> pd.Series:
+        def compute() -> pd.Series:
+            scanned = self.scan(name)
+            counts = scanned.yearly[(date_column, count_column)].astype(np.int64)
+            counts.index = scanned.labelled(counts.index.set_names([None, None, date_column]))
+            return counts.sort_index()
+
+        return self._memo(("yearly", name, date_column, count_column), compute)
+
+    def close(self) -> None:
+        shutil.rmtree(self._spill_root, ignore_errors=True)
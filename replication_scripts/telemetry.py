@@ -0,0 +1,183 @@
+import json
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from urllib.parse import urlparse
+
+import numpy as np
+
+# Upper bounds (seconds) of the request latency histogram buckets, as in a Prometheus histogram
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROMETHEUS_SUFFIXES = (".prom", ".txt")
+
+
+def endpoint_name(url: str) -> str:
+    """URL -> endpoint template, e.g. .../repos/a/b/pulls/12 -> /repos/{repo}/pulls/{number}."""
+    path = re.sub(r"/repos/[^/]+/[^/]+", "/repos/{repo}", urlparse(url).path)
+    return re.sub(r"/\d+(?=/|$)", "/{number}", path)
+
+
+class EndpointStats:
+    def __init__(self) -> None:
+        self.latencies = array("d")
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.statuses = {}
+        self.bytes = 0
+
+
+class Telemetry:
+    """Counters of the GitHub requests of one collector process.
+
+    Every network request adds its latency, status and response size to its endpoint's stats;
+    cache hits served offline count as requests with source "cache". Rate-limit headers update
+    the remaining/reset gauges, and time spent waiting for the rate limit is summed. With a
+    .prom/.txt path the counters are written once as a Prometheus text file by finish();
+    any other path gets one JSON line per request as it happens, then a summary line.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path
+        self.started = time.time()
+        self.endpoints = {}
+        self.rate_limits = {}
+        self.sleep_seconds = 0.0
+        self.pauses = 0
+        self._lock = threading.Lock()
+        self._events = None
+        if path is not None and path.suffix not in PROMETHEUS_SUFFIXES:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._events = path.open("w", encoding="utf-8")
+
+    def _emit(self, event: dict) -> None:
+        if self._events is not None:
+            self._events.write(json.dumps(event) + "\n")
+            self._events.flush()
+
+    def record_request(self, method: str, url: str, status: int | str, seconds: float, size: int, source: str = "network") -> None:
+        endpoint = endpoint_name(url)
+        with self._lock:
+            stats = self.endpoints.setdefault(endpoint, EndpointStats())
+            stats.latencies.append(seconds)
+            stats.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            key = (str(status), source)
+            stats.statuses[key] = stats.statuses.get(key, 0) + 1
+            stats.bytes += size
+            self._emit(
+                {
+                    "event": "request",
+                    "time": round(time.time(), 3),
+                    "method": method,
+                    "endpoint": endpoint,
+                    "status": status,
+                    "source": source,
+                    "seconds": round(seconds, 4),
+                    "bytes": size,
+                }
+            )
+
+    def record_rate_limit(self, resource: str, remaining: int, reset_at: float) -> None:
+        with self._lock:
+            self.rate_limits[resource] = {"remaining": remaining, "reset_at": reset_at}
+
+    def record_pause(self, seconds: float) -> None:
+        with self._lock:
+            self.pauses += 1
+            self._emit({"event": "rate_limit_pause", "time": round(time.time(), 3), "seconds": round(seconds, 1)})
+
+    def record_sleep(self, seconds: float) -> None:
+        with self._lock:
+            self.sleep_seconds += seconds
+
+    def summary(self) -> dict:
+        with self._lock:
+            endpoints = {}
+            for endpoint, stats in sorted(self.endpoints.items()):
+                latencies = np.frombuffer(stats.latencies) if len(stats.latencies) else np.zeros(1)
+                p50, p95 = np.percentile(latencies, [50, 95])
+                endpoints[endpoint] = {
+                    "requests": len(stats.latencies),
+                    "statuses": {f"{status}/{source}": count for (status, source), count in sorted(stats.statuses.items())},
+                    "latency_p50": round(float(p50), 4),
+                    "latency_p95": round(float(p95), 4),
+                    "latency_max": round(float(latencies.max()), 4),
+                    "latency_total": round(float(latencies.sum()), 3),
+                    "bytes": stats.bytes,
+                }
+            return {
+                "elapsed_seconds": round(time.time() - self.started, 3),
+                "requests": sum(item["requests"] for item in endpoints.values()),
+                "bytes": sum(item["bytes"] for item in endpoints.values()),
+                "rate_limit_pauses": self.pauses,
+                "rate_limit_sleep_seconds": round(self.sleep_seconds, 3),
+                "rate_limits": dict(self.rate_limits),
+                "endpoints": endpoints,
+            }
+
+    def prometheus(self) -> str:
+        lines = [
+            "# HELP github_requests_total GitHub API requests by endpoint, status and source (network or cache).",
+            "# TYPE github_requests_total counter",
+        ]
+        with self._lock:
+            items = sorted(self.endpoints.items())
+            for endpoint, stats in items:
+                for (status, source), count in sorted(stats.statuses.items()):
+                    lines.append(f'github_requests_total{{endpoint="{endpoint}",status="{status}",source="{source}"}} {count}')
+            lines += ["# HELP github_request_duration_seconds GitHub API request latency.", "# TYPE github_request_duration_seconds histogram"]
+            for endpoint, stats in items:
+                cumulative = np.cumsum(stats.buckets)
+                for bound, count in zip([*map(str, LATENCY_BUCKETS), "+Inf"], cumulative):
+                    lines.append(f'github_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}')
+                lines.append(f'github_request_duration_seconds_sum{{endpoint="{endpoint}"}} {sum(stats.latencies):.6f}')
+                lines.append(f'github_request_duration_seconds_count{{endpoint="{endpoint}"}} {len(stats.latencies)}')
+            lines += ["# HELP github_response_bytes_total Bytes of GitHub API response bodies.", "# TYPE github_response_bytes_total counter"]
+            for endpoint, stats in items:
+                lines.append(f'github_response_bytes_total{{endpoint="{endpoint}"}} {stats.bytes}')
+            lines += ["# HELP github_rate_limit_remaining Requests left in the rate-limit window.", "# TYPE github_rate_limit_remaining gauge"]
+            for resource, limit in sorted(self.rate_limits.items()):
+                lines.append(f'github_rate_limit_remaining{{resource="{resource}"}} {limit["remaining"]}')
+            lines += ["# HELP github_rate_limit_reset_timestamp_seconds When the rate-limit window resets.", "# TYPE github_rate_limit_reset_timestamp_seconds gauge"]
+            for resource, limit in sorted(self.rate_limits.items()):
+                lines.append(f'github_rate_limit_reset_timestamp_seconds{{resource="{resource}"}} {limit["reset_at"]:.0f}')
+            lines += [
+                "# HELP github_rate_limit_pauses_total Times the collector paused for the rate limit.",
+                "# TYPE github_rate_limit_pauses_total counter",
+                f"github_rate_limit_pauses_total {self.pauses}",
+                "# HELP github_rate_limit_sleep_seconds_total Seconds threads spent waiting for the rate limit.",
+                "# TYPE github_rate_limit_sleep_seconds_total counter",
+                f"github_rate_limit_sleep_seconds_total {self.sleep_seconds:.3f}",
+            ]
+        return "\n".join(lines) + "\n"
+
+    def finish(self) -> dict:
+        """Write the summary (JSON line) or the Prometheus file, print a short report and return the summary."""
+        summary = self.summary()
+        if self._events is not None:
+            self._emit({"event": "summary", "time": round(time.time(), 3), **summary})
+            self._events.close()
+            self._events = None
+        elif self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(self.prometheus(), encoding="utf-8")
+        print(format_summary(summary))
+        return summary
+
+
+def format_summary(summary: dict) -> str:
+    lines = [
+        f"{summary['requests']} requests, {summary['bytes'] / 2**20:.1f} MB in {summary['elapsed_seconds']:.1f}s;"
+        f" {summary['rate_limit_pauses']} rate-limit pauses, {summary['rate_limit_sleep_seconds']:.1f}s waiting."
+    ]
+    for endpoint, stats in summary["endpoints"].items():
+        statuses = ", ".join(f"{key} x{count}" for key, count in stats["statuses"].items())
+        lines.append(
+            f"  {endpoint}: {stats['requests']} requests, p50 {stats['latency_p50'] * 1000:.0f} ms,"
+            f" p95 {stats['latency_p95'] * 1000:.0f} ms, {stats['bytes'] / 2**20:.1f} MB ({statuses})"
+        )
+    for resource, limit in summary["rate_limits"].items():
+        reset = time.strftime("%H:%M:%S", time.localtime(limit["reset_at"]))
+        lines.append(f"  rate limit {resource}: {limit['remaining']} remaining, resets at {reset}")
+    return "\n".join(lines)
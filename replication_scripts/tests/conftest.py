@@ -0,0 +1,106 @@
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# The scripts import each other as top-level modules, as when run from replication_scripts/.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import github_api  # noqa: E402
+
+
+class ScriptedServer:
+    """Local HTTP server answering the n-th request with the n-th (status, headers, payload) of a script.
+
+    The last entry repeats once the script runs out. `requests` counts the requests served and
+    `bodies` holds the JSON bodies of POSTs (GraphQL queries).
+    """
+
+    def __init__(self, script: list[tuple[int, dict, object]]) -> None:
+        self.script = script
+        self.requests = 0
+        self.bodies = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                status, headers, payload = server.script[min(server.requests, len(server.script) - 1)]
+                server.requests += 1
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                for name, value in {"Content-Type": "application/json", **headers}.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self) -> None:
+                server.bodies.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+                self.do_GET()
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def api_base(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def github_client(monkeypatch):
+    """github_api without cache, telemetry or tokens, with backoff waits shrunk to milliseconds."""
+    monkeypatch.setattr(github_api, "BACKOFF_BASE", 0.001)
+    monkeypatch.setattr(github_api, "SECONDARY_LIMIT_WAIT", 0.0)
+    github_api.configure_cache(None)
+    github_api.configure_telemetry(None, enabled=False)
+    github_api.configure_tokens([])
+    yield github_api
+    github_api.configure_tokens([])
+
+
+@pytest.fixture
+def scripted_server():
+    servers = []
+
+    def start(script: list[tuple[int, dict, object]]) -> ScriptedServer:
+        servers.append(ScriptedServer(script))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture(scope="module")
+def mock_github():
+    """The benchmarks' mock GitHub (REST and GraphQL) serving 400 synthetic PRs of two projects."""
+    from benchmarks.mock_github import MockGitHub
+
+    with MockGitHub(400, 2) as github:
+        yield github
+
+
+def point_collectors_at(monkeypatch, github):
+    """Point the collectors at a mock server through GITHUB_API_BASE, as a user would."""
+    monkeypatch.setenv("GITHUB_API_BASE", github.api_base)
+    monkeypatch.setenv("GITHUB_TOKEN", "test-token")
+    monkeypatch.delenv("GITHUB_TOKENS", raising=False)
+    # Retried 5xx responses wait milliseconds instead of seconds
+    monkeypatch.setattr(github_api, "BACKOFF_BASE", 0.001)
+    return github
+
+
+@pytest.fixture
+def collector_env(monkeypatch, mock_github):
+    return point_collectors_at(monkeypatch, mock_github)
@@ -0,0 +1,30 @@
+import json
+
+from archive import PULL_REQUEST, RELEASE, ResponseArchive, iter_archive
+
+
+def test_truncated_lines_are_skipped(tmp_path):
+    path = tmp_path / "archive.ndjson"
+    archive = ResponseArchive(path, append=False)
+    archive.write(RELEASE, "o/r", {"tag_name": "v1"})
+    archive.close()
+    archive = ResponseArchive(path, append=True)
+    archive.write(RELEASE, "o/r", {"tag_name": "v2"})
+    archive.write(PULL_REQUEST, "o/r", {"number": 1})
+    archive.close()
+    # A crash cut a record short, and the next run's header was cut short as well
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps({"kind": RELEASE, "project": "o/r", "data": {"tag_name": "v3"}})[:20] + "\n")
+        handle.write(json.dumps({"kind": "run", "started_at": "2024-01-01T00:00:00Z", "append": False})[:25])
+
+    assert list(iter_archive(path, RELEASE)) == [("o/r", {"tag_name": "v1"}), ("o/r", {"tag_name": "v2"})]
+    assert list(iter_archive(path, PULL_REQUEST)) == [("o/r", {"number": 1})]
+
+
+def test_a_rewriting_run_starts_the_replay(tmp_path):
+    path = tmp_path / "archive.ndjson"
+    for append, tag in ((False, "old"), (False, "new"), (True, "newer")):
+        archive = ResponseArchive(path, append)
+        archive.write(RELEASE, "o/r", {"tag_name": tag})
+        archive.close()
+    assert [data["tag_name"] for _, data in iter_archive(path, RELEASE)] == ["new", "newer"]
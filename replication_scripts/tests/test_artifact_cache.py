@@ -0,0 +1,121 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+import analysis
+import artifact_cache
+from analysis import AnalysisContext, run_findings
+from artifact_cache import ArtifactCache
+from benchmarks.synthetic import write_datasets
+from findings import select_findings
+
+
+@pytest.fixture
+def datasets(tmp_path):
+    prs, releases = write_datasets(tmp_path, 2000, 3)
+    return {"pull_requests": str(prs), "releases": str(releases)}
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Names of the files read from disk by analysis contexts."""
+    loaded = []
+    read_dataset = analysis.read_dataset
+
+    def counting(path, **kwargs):
+        loaded.append(path.name)
+        return read_dataset(path, **kwargs)
+
+    monkeypatch.setattr(analysis, "read_dataset", counting)
+    return loaded
+
+
+def run(paths: dict, cache: ArtifactCache) -> dict:
+    findings = select_findings()
+    context = AnalysisContext(findings, paths, resamples=20, cache=cache)
+    try:
+        return run_findings(findings, context)
+    finally:
+        context.close()
+
+
+def test_unchanged_datasets_are_served_from_the_cache(tmp_path, datasets, loads):
+    cache = ArtifactCache(tmp_path / "artifacts.sqlite", 64 << 20)
+    first = run(datasets, cache)
+    assert loads and cache.misses and not cache.hits
+    loads.clear()
+    misses = cache.misses
+
+    assert run(datasets, cache) == first
+    assert loads == []
+    assert cache.hits and cache.misses == misses
+
+
+def test_touched_datasets_are_rehashed_and_edited_ones_recomputed(tmp_path, datasets, loads, monkeypatch):
+    cache = ArtifactCache(tmp_path / "artifacts.sqlite", 64 << 20)
+    first = run(datasets, cache)
+    hashed = []
+    file_digest = artifact_cache.file_digest
+    monkeypatch.setattr(artifact_cache, "file_digest", lambda path: hashed.append(path.name) or file_digest(path))
+    loads.clear()
+
+    # Same content under a new mtime: hashed again, same fingerprint, nothing recomputed
+    prs = analysis.resolve_input_path(datasets["pull_requests"])
+    os.utime(prs, ns=(prs.stat().st_atime_ns, prs.stat().st_mtime_ns + 10**9))
+    assert run(datasets, cache) == first
+    assert hashed == [prs.name] and loads == []
+
+    # Dropping the last PR changes the fingerprint, so its aggregates are recomputed
+    lines = prs.read_text(encoding="utf-8").splitlines(keepends=True)
+    prs.write_text("".join(lines[:-1]), encoding="utf-8")
+    misses = cache.misses
+    run(datasets, cache)
+    assert prs.name in loads and cache.misses > misses
+
+
+def test_code_changes_invalidate_every_artifact(tmp_path, datasets, loads, monkeypatch):
+    cache = ArtifactCache(tmp_path / "artifacts.sqlite", 64 << 20)
+    first = run(datasets, cache)
+    loads.clear()
+    monkeypatch.setattr(artifact_cache, "code_fingerprint", lambda: "edited analysis code")
+    hits = cache.hits
+
+    assert run(datasets, cache) == first
+    assert cache.hits == hits
+    assert sorted(set(loads)) == sorted(analysis.resolve_input_path(path).name for path in datasets.values())
+
+
+def test_least_recently_used_artifacts_are_evicted(tmp_path):
+    cache = ArtifactCache(tmp_path / "artifacts.sqlite", 2500)
+    for key in ("a", "b"):
+        cache.put(key, b"x" * 1000, key)
+    assert cache.get("a") is not None  # b is now the least recently used
+    cache.put("c", b"x" * 1000, "c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    cache.close()
+
+    # A smaller limit evicts on open
+    cache = ArtifactCache(tmp_path / "artifacts.sqlite", 1500)
+    assert [cache.get(key) is not None for key in ("a", "c")] == [False, True]
+    cache.close()
+
+
+@pytest.mark.parametrize("max_mb, kept", [(64, True), (0, False)])
+def test_artifact_cache_max_mb_bounds_the_store(tmp_path, datasets, monkeypatch, max_mb, kept):
+    import replication
+
+    store = tmp_path / "artifacts.sqlite"
+    arguments = ["--prs", datasets["pull_requests"], "--releases", datasets["releases"], "--output", str(tmp_path / "results.json")]
+    monkeypatch.setattr(
+        sys, "argv", ["replication.py", "run", *arguments, "--artifact-cache", str(store), "--artifact-cache-max-mb", str(max_mb)]
+    )
+    replication.main()
+
+    with sqlite3.connect(store) as conn:
+        count, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM artifacts").fetchone()
+    assert size <= max_mb * 1024 * 1024
+    assert bool(count) == kept
@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from ci_adoption import find_adoption, find_adoptions, label_practice
+from config import CI, NO_CI
+
+ADOPTED_AT = "2021-03-04T05:06:07Z"
+
+
+def commit(path, name: str, date: str) -> None:
+    (path / name).parent.mkdir(parents=True, exist_ok=True)
+    (path / name).write_text(name, encoding="utf-8")
+    environment = {**os.environ, "GIT_AUTHOR_DATE": date, "GIT_COMMITTER_DATE": date}
+    subprocess.run(["git", "add", name], cwd=path, check=True)
+    subprocess.run(["git", "commit", "--quiet", "-m", f"Add {name}"], cwd=path, check=True, env=environment)
+
+
+@pytest.fixture
+def git_base(tmp_path):
+    """A directory of two repositories: owner/ci adds a workflow at ADOPTED_AT, owner/plain never adopts CI."""
+    for repo, files in {
+        "owner/ci": [
+            ("README.md", "2020-01-01T00:00:00Z"),
+            (".github/workflows/test.yml", ADOPTED_AT),
+            ("ci.py", "2022-01-01T00:00:00Z"),
+        ],
+        "owner/plain": [("README.md", "2020-01-01T00:00:00Z")],
+    }.items():
+        path = tmp_path / "base" / repo
+        path.mkdir(parents=True)
+        subprocess.run(["git", "init", "--quiet"], cwd=path, check=True)
+        subprocess.run(["git", "config", "user.email", "test@example.com"], cwd=path, check=True)
+        subprocess.run(["git", "config", "user.name", "Test"], cwd=path, check=True)
+        for name, date in files:
+            commit(path, name, date)
+    return tmp_path / "base"
+
+
+def test_find_adoption_dates_the_first_ci_configuration(git_base):
+    seconds, _, path = find_adoption(git_base / "owner" / "ci")
+    assert pd.Timestamp(seconds, unit="s", tz="UTC") == pd.Timestamp(ADOPTED_AT)
+    assert path == ".github/workflows/test.yml"
+    assert find_adoption(git_base / "owner" / "plain") is None
+
+
+def test_label_practice_splits_rows_at_the_adoption(git_base, tmp_path):
+    adoptions = find_adoptions(["owner/ci", "owner/plain"], tmp_path / "mirrors", str(git_base), jobs=2)
+    assert adoptions["adopted_at"].tolist() == [ADOPTED_AT, ""]
+
+    projects = pd.Series(["owner/ci", "owner/ci", "owner/ci", "owner/plain"])
+    created = pd.Series(["2021-03-04T05:06:06Z", ADOPTED_AT, "2022-01-01T00:00:00Z", "2022-01-01T00:00:00Z"])
+    assert label_practice(projects, created, adoptions).tolist() == [NO_CI, CI, CI, NO_CI]
+
+
+def test_collectors_label_practice_without_scipy():
+    # A fresh interpreter, so modules imported by other tests do not count.
+    check = "import sys, collect_pr, collect_release; print('scipy' in sys.modules, 'stats_engine' in sys.modules)"
+    scripts = Path(__file__).resolve().parents[1]
+    result = subprocess.run([sys.executable, "-c", check], cwd=scripts, capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ["False", "False"]
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import write_datasets
+from comparison import compare_datasets, diff_table
+from config import NO_CI
+
+DELIVERY_FINDINGS = {"rq1.1", "rq1.3"}
+
+
+@pytest.fixture(scope="module")
+def datasets(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("comparison")
+    prs, releases = write_datasets(directory, 1500, 3)
+    # The copy delivers NO-CI PRs five times faster; nothing else changes
+    changed = pd.read_csv(prs, dtype=str, keep_default_na=False)
+    delivery = pd.to_numeric(changed["delivery_time"], errors="coerce")
+    faster = (changed["practice"] == NO_CI) & delivery.notna()
+    changed.loc[faster, "delivery_time"] = (delivery[faster] / 5).round(2).astype(str)
+    changed_prs = directory / "changed_pull_requests.csv"
+    changed.to_csv(changed_prs, index=False)
+    return {
+        "original": {"pull_requests": str(prs), "releases": str(releases)},
+        "changed": {"pull_requests": str(changed_prs), "releases": str(releases)},
+    }
+
+
+def compare(configs: dict) -> tuple[dict, pd.DataFrame]:
+    outcome = compare_datasets(configs, None, 2, False, 100_000, {"resamples": 0}, None, 0)
+    results = {name: results for name, (results, rows) in outcome.items()}
+    return outcome, diff_table(results)
+
+
+def test_a_dataset_compared_with_itself_differs_nowhere(datasets):
+    outcome, table = compare({"a": datasets["original"], "b": datasets["original"]})
+
+    assert outcome["a"] == outcome["b"]
+    assert outcome["a"][1]["pull_requests"] == 1500
+    assert len(table) and list(table.columns) == ["a", "b", "spread", "differs"]
+    assert not table["differs"].any()
+    assert (table["spread"] == 0).all()
+
+
+def test_a_changed_copy_flags_the_findings_it_affects(datasets):
+    _, table = compare(datasets)
+    flagged = table[table["differs"]]
+
+    assert set(flagged.index.get_level_values("finding")) == DELIVERY_FINDINGS
+    pd.testing.assert_series_equal(
+        flagged["spread"], (flagged["original"] - flagged["changed"]).abs(), check_names=False
+    )
+    assert (flagged["spread"] > 0).all()
+    unchanged = table[~table.index.get_level_values("finding").isin(DELIVERY_FINDINGS)]
+    assert len(unchanged) and (unchanged["original"] == unchanged["changed"]).all()
+    assert (unchanged["spread"] == 0).all()
@@ -0,0 +1,82 @@
+import os
+import shutil
+
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import datasets_io
+from benchmarks.synthetic import write_datasets
+from convert_datasets import convert
+from datasets_io import columnar_sibling, iter_dataset, read_dataset
+
+
+@pytest.fixture
+def csvs(tmp_path):
+    prs, releases = write_datasets(tmp_path / "csv", 600, 3)
+    # A release without its PR counts exercises the nullable integer columns
+    lines = releases.read_text(encoding="utf-8").splitlines(keepends=True)
+    fields = lines[1].split(",")
+    fields[5] = ""
+    lines[1] = ",".join(fields)
+    releases.write_text("".join(lines), encoding="utf-8")
+    return prs, releases
+
+
+def set_mtime(path, seconds: int) -> None:
+    os.utime(path, (seconds, seconds))
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+@pytest.mark.parametrize("dataset", [0, 1])
+def test_columnar_round_trip_keeps_values_and_types(tmp_path, csvs, fmt, dataset):
+    source = csvs[dataset]
+    expected = read_dataset(source, prefer_columnar=False)
+    columnar = convert(source, fmt)
+
+    for frame in (read_dataset(columnar), pd.concat(iter_dataset(columnar, chunk_rows=100), ignore_index=True)):
+        pdt.assert_frame_equal(frame, expected)
+
+    # Back to CSV, next to a copy of the columnar file so the original CSV is kept
+    back = shutil.copy(columnar, tmp_path / columnar.name)
+    restored = convert(back, "csv")
+    pdt.assert_frame_equal(read_dataset(restored, prefer_columnar=False), expected)
+    assert (expected.dtypes.astype(str) == pd.Series(datasets_io.schema_for(expected.columns))[expected.columns]).all()
+
+
+def test_typed_columns(csvs):
+    prs, releases = (read_dataset(path, prefer_columnar=False) for path in csvs)
+    assert isinstance(prs["project"].dtype, pd.CategoricalDtype)
+    assert isinstance(prs["practice"].dtype, pd.CategoricalDtype)
+    assert str(prs["created_at"].dtype) == "datetime64[s, UTC]"
+    assert str(releases["publishedAt"].dtype) == "datetime64[s]"
+    assert releases["created_pull_requests"].isna().sum() == 1
+
+
+def test_columnar_copy_is_used_only_when_at_least_as_new(csvs):
+    prs = csvs[0]
+    parquet = convert(prs, "parquet")
+    set_mtime(prs, 1_000_000)
+    set_mtime(parquet, 1_000_000)
+    assert columnar_sibling(prs) == parquet
+
+    # An edited CSV is newer than its copy, so the CSV is read
+    lines = prs.read_text(encoding="utf-8").splitlines(keepends=True)
+    prs.write_text("".join(lines[:-1]), encoding="utf-8")
+    set_mtime(prs, 1_000_001)
+    assert columnar_sibling(prs) is None
+    assert len(read_dataset(prs)) == len(lines) - 2
+    assert len(read_dataset(prs, prefer_columnar=False)) == len(lines) - 2
+    assert len(read_dataset(parquet)) == len(lines) - 1
+
+
+def test_without_pyarrow_csvs_still_load(csvs, monkeypatch, tmp_path):
+    prs = csvs[0]
+    convert(prs, "arrow")
+    monkeypatch.setattr(datasets_io, "pa", None)
+    assert columnar_sibling(prs) is None
+    assert len(read_dataset(prs)) == 600
+    with pytest.raises(SystemExit, match="pyarrow"):
+        datasets_io.write_dataset(read_dataset(prs), tmp_path / "prs.parquet")
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from factor_models import POOLED, RESPONSE, fit_models, prune_correlated
+
+
+@pytest.fixture
+def frame() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    rows = 120
+    data = pd.DataFrame(
+        {
+            "project": np.repeat(["a/a", "b/b"], rows // 2),
+            "x1": rng.normal(size=rows),
+            "x2": rng.normal(size=rows),
+            "constant": np.ones(rows),
+        }
+    )
+    data["x3"] = data["x1"] * 0.95 + rng.normal(scale=0.1, size=rows)
+    data[RESPONSE] = 2 * data["x1"] - data["x2"] + (data["project"] == "b/b") * 3 + rng.normal(scale=0.5, size=rows)
+    return data
+
+
+def test_prune_correlated_with_fewer_than_two_factors(frame):
+    assert prune_correlated(frame, ["constant"]) == {"constant": "constant"}
+    assert prune_correlated(frame, ["constant", "x1"]) == {"constant": "constant"}
+    assert prune_correlated(frame, []) == {}
+
+
+def test_prune_correlated_drops_one_of_a_correlated_pair(frame):
+    dropped = prune_correlated(frame, ["x1", "x2", "x3", "constant"])
+    assert dropped["constant"] == "constant"
+    assert len(set(dropped) & {"x1", "x3"}) == 1 and "x2" not in dropped
+
+
+def test_fits_match_least_squares(frame):
+    factors = ["x1", "x2"]
+    table = fit_models(frame, factors).set_index(["project", "factor"])
+
+    for project, rows in frame.groupby("project"):
+        design = np.column_stack([np.ones(len(rows)), rows[factors].to_numpy()])
+        coefficients, residuals, *_ = np.linalg.lstsq(design, rows[RESPONSE].to_numpy(), rcond=None)
+        total = ((rows[RESPONSE] - rows[RESPONSE].mean()) ** 2).sum()
+        np.testing.assert_allclose(table.loc[project]["coefficient"].loc[factors], coefficients[1:])
+        assert table.loc[(project, "x1"), "r2"] == pytest.approx(1 - residuals[0] / total)
+
+    # Pooled: one intercept per project
+    dummies = pd.get_dummies(frame["project"], dtype=float).to_numpy()
+    design = np.column_stack([dummies, frame[factors].to_numpy()])
+    coefficients, *_ = np.linalg.lstsq(design, frame[RESPONSE].to_numpy(), rcond=None)
+    np.testing.assert_allclose(table.loc[POOLED]["coefficient"].loc[factors], coefficients[2:])
@@ -0,0 +1,194 @@
+import csv
+import sys
+
+import pytest
+import requests
+
+import collect_pr
+import collect_release
+from benchmarks.mock_github import MockGitHub, MockRepos
+from conftest import point_collectors_at
+from shards import shard_path
+
+
+def run_main(monkeypatch, module, projects: list[str], *arguments: str) -> None:
+    monkeypatch.setattr(module, "PROJECTS", projects)
+    monkeypatch.setattr(sys, "argv", [f"{module.__name__}.py", "--no-cache", "--no-telemetry", "--no-archive", *arguments])
+    module.main()
+
+
+def read_rows(path) -> list[dict]:
+    with path.open(newline="", encoding="utf-8") as handle:
+        return list(csv.DictReader(handle))
+
+
+def test_releases_are_paginated(monkeypatch, tmp_path, collector_env):
+    output = tmp_path / "releases.csv"
+    run_main(monkeypatch, collect_release, collector_env.projects, "--output", str(output))
+
+    expected = MockRepos(400, 2).releases
+    rows = read_rows(output)
+    assert len(rows) == len(expected)
+    assert {row["project"] for row in rows} == set(collector_env.projects)
+
+
+def test_pull_requests_are_paginated(monkeypatch, tmp_path, collector_env):
+    output = tmp_path / "pull_requests.csv"
+    run_main(monkeypatch, collect_pr, collector_env.projects, "--output", str(output))
+
+    repos = MockRepos(400, 2)
+    rows = read_rows(output)
+    # More than one listing page of 100 per project
+    assert all(len(repos.repo(project)["pulls"]) > 100 for project in collector_env.projects)
+    assert len(rows) == sum(len(repos.repo(project)["pulls"]) for project in collector_env.projects)
+    assert [int(row[""]) for row in rows] == list(range(1, len(rows) + 1))
+    # Unlabelled until ci_adoption.py dates each project's CI adoption
+    assert {row["practice"] for row in rows} == {""}
+
+
+def test_server_errors_are_retried_with_backoff(github_client, scripted_server):
+    server = scripted_server([(502, {}, {}), (503, {}, {}), (200, {}, [{"id": 1}])])
+    data, _ = github_client.get_with_rate_limit(f"{server.api_base}/repos/o/r/releases", {})
+    assert data == [{"id": 1}]
+    assert server.requests == 3
+
+
+def test_server_errors_give_up_after_max_retries(github_client, scripted_server):
+    server = scripted_server([(502, {}, {})])
+    with pytest.raises(requests.HTTPError):
+        github_client.get_with_rate_limit(f"{server.api_base}/repos/o/r/releases", {})
+    assert server.requests == github_client.MAX_RETRIES + 1
+
+
+def test_retry_after_pauses_then_retries(github_client, scripted_server):
+    server = scripted_server([(429, {"Retry-After": "0"}, {}), (200, {}, [{"id": 2}])])
+    data, _ = github_client.get_with_rate_limit(f"{server.api_base}/repos/o/r/releases", {})
+    assert data == [{"id": 2}]
+    assert server.requests == 2
+
+
+@pytest.mark.parametrize(
+    "status, headers, payload",
+    [
+        (429, {"Retry-After": "0"}, {}),
+        (403, {}, {"message": "You have exceeded a secondary rate limit."}),
+        (403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "0"}, {"message": "API rate limit exceeded"}),
+    ],
+)
+def test_persistent_rate_limits_give_up(github_client, scripted_server, monkeypatch, status, headers, payload):
+    # An exhausted token is paused at least 5s; skip the wait but keep counting the retries.
+    monkeypatch.setattr(github_client, "sleep", lambda seconds: None)
+    monkeypatch.setattr(github_client.RateLimitBudget, "available_at", lambda budget: 0.0)
+    server = scripted_server([(status, headers, payload)])
+    with pytest.raises(requests.HTTPError):
+        github_client.get_with_rate_limit(f"{server.api_base}/repos/o/r/releases", {})
+    assert server.requests == github_client.MAX_RATE_LIMIT_RETRIES + 1
+
+
+@pytest.mark.parametrize("module", [collect_release, collect_pr])
+def test_archive_rederives_the_same_csv(monkeypatch, tmp_path, collector_env, module):
+    output, derived = tmp_path / "collected.csv", tmp_path / "derived.csv"
+    archive = str(tmp_path / "collected.ndjson")
+    monkeypatch.setattr(module, "PROJECTS", collector_env.projects)
+    for arguments in (["--output", str(output)], ["--output", str(derived), "--from-archive"]):
+        monkeypatch.setattr(sys, "argv", ["collect.py", "--no-cache", "--no-telemetry", "--archive", archive, *arguments])
+        module.main()
+
+    assert read_rows(derived) == read_rows(output)
+
+
+def test_concurrent_details_match_sequential_output(monkeypatch, tmp_path):
+    # Slow details finish after later ones and flaky ones are retried, so the window must reorder them.
+    with MockGitHub(400, 2, slow_every=7, flaky_every=5) as github:
+        point_collectors_at(monkeypatch, github)
+        for workers in (1, 4):
+            output = str(tmp_path / f"{workers}.csv")
+            run_main(monkeypatch, collect_pr, github.projects, "--output", output, "--workers", str(workers))
+        requests_made = github.requests
+
+    assert (tmp_path / "4.csv").read_bytes() == (tmp_path / "1.csv").read_bytes()
+    repos = MockRepos(400, 2)
+    numbers = [detail["number"] for project in github.projects for detail in repos.repo(project)["pulls"]]
+    flaky = sum(number % 5 == 0 for number in numbers)
+    # Both runs fetched every detail; each flaky one failed once and was retried
+    assert flaky > 0
+    assert requests_made >= 2 * len(numbers) + flaky
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_resume_after_a_crash_matches_an_uninterrupted_run(monkeypatch, tmp_path, collector_env, workers):
+    complete, resumed = tmp_path / "complete.csv", tmp_path / "resumed.csv"
+    before = collector_env.requests
+    run_main(monkeypatch, collect_pr, collector_env.projects, "--output", str(complete), "--workers", str(workers))
+    full_requests = collector_env.requests - before
+
+    # The first project has two listing pages; the server dies when the second one is requested
+    with MockGitHub(400, 2, fail_from_page=2) as failing:
+        point_collectors_at(monkeypatch, failing)
+        with pytest.raises(requests.HTTPError):
+            run_main(monkeypatch, collect_pr, failing.projects, "--output", str(resumed), "--workers", str(workers))
+    assert 0 < len(read_rows(resumed)) < len(read_rows(complete))
+
+    with MockGitHub(400, 2) as github:
+        point_collectors_at(monkeypatch, github)
+        run_main(monkeypatch, collect_pr, github.projects, "--output", str(resumed), "--workers", str(workers), "--resume")
+        resumed_requests = github.requests
+
+    assert resumed.read_bytes() == complete.read_bytes()
+    # The checkpoint let the resumed run start at the failed page instead of the first one
+    assert resumed_requests < full_requests
+
+
+@pytest.mark.parametrize("module", [collect_pr, collect_release])
+def test_merged_shards_match_a_single_process_run(monkeypatch, tmp_path, collector_env, module):
+    single, sharded = tmp_path / "single.csv", tmp_path / "sharded.csv"
+    first, second = collector_env.projects
+    before = collector_env.requests
+    run_main(monkeypatch, module, collector_env.projects, "--output", str(single))
+    both_projects = collector_env.requests - before
+    run_main(monkeypatch, module, collector_env.projects, "--output", str(sharded), "--jobs", "2")
+
+    assert sharded.read_bytes() == single.read_bytes()
+    rows = read_rows(sharded)
+    assert [row["project"] for row in rows] == sorted((row["project"] for row in rows), key=collector_env.projects.index)
+    if module is collect_pr:
+        assert [int(row[""]) for row in rows] == [int(row["X."]) for row in rows] == list(range(1, len(rows) + 1))
+
+    # Re-crawling one project rewrites only its shard and merges it with the kept one
+    kept = shard_path(sharded, first)
+    kept_mtime = kept.stat().st_mtime_ns
+    before = collector_env.requests
+    run_main(monkeypatch, module, collector_env.projects, "--output", str(sharded), "--projects", second)
+
+    assert kept.stat().st_mtime_ns == kept_mtime
+    assert sharded.read_bytes() == single.read_bytes()
+    assert collector_env.requests - before < both_projects
+
+
+def test_resume_upgrades_a_csv_from_before_the_added_columns(monkeypatch, tmp_path, collector_env):
+    output = tmp_path / "pull_requests.csv"
+    first, second = collector_env.projects
+    run_main(monkeypatch, collect_pr, [first], "--output", str(output))
+    legacy = [field for field in collect_pr.FIELDS if field not in collect_pr.ADDED_FIELDS]
+    rows = read_rows(output)
+    with output.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=legacy, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+    run_main(monkeypatch, collect_pr, [first, second], "--output", str(output), "--resume")
+
+    upgraded = read_rows(output)
+    assert list(upgraded[0]) == collect_pr.FIELDS
+    assert [row["pull_number"] for row in upgraded[: len(rows)]] == [row["pull_number"] for row in rows]
+    assert all(row["author"] == "" for row in upgraded if row["project"] == first)
+    assert all(row["author"] for row in upgraded if row["project"] == second)
+    assert [int(row[""]) for row in upgraded] == list(range(1, len(upgraded) + 1))
+
+
+def test_appending_to_an_unknown_layout_is_refused(tmp_path):
+    output = tmp_path / "pull_requests.csv"
+    output.write_text(",X.,project,something_else\n", encoding="utf-8")
+    assert not collect_pr.upgrade_layout(output)
+    with pytest.raises(SystemExit, match="different column layout"):
+        collect_pr.read_written_rows(output)
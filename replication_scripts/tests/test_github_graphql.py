@@ -0,0 +1,71 @@
+import pytest
+
+import collect_pr
+import github_graphql
+from benchmarks.mock_github import MockRepos
+from test_github_api import read_rows, run_main
+
+
+def pull_request_node(number: int, reviews: dict) -> dict:
+    return {
+        "number": number,
+        "createdAt": "2020-01-01T00:00:00Z",
+        "mergedAt": "2020-01-02T00:00:00Z",
+        "updatedAt": "2020-01-02T00:00:00Z",
+        "additions": 1,
+        "deletions": 0,
+        "changedFiles": 1,
+        "commits": {"totalCount": 1},
+        "comments": {"totalCount": 0},
+        "reviews": reviews,
+    }
+
+
+def connection(nodes: list[dict]) -> dict:
+    rate_limit = {"cost": 1, "remaining": 5000, "resetAt": "2030-01-01T00:00:00Z"}
+    pulls = {"pageInfo": {"hasNextPage": False, "endCursor": "c1"}, "nodes": nodes}
+    return {"data": {"rateLimit": rate_limit, "repository": {"pullRequests": pulls}}}
+
+
+def reviews_page(comments: list[int], cursor: str | None) -> dict:
+    return {
+        "pageInfo": {"hasNextPage": cursor is not None, "endCursor": cursor},
+        "nodes": [{"comments": {"totalCount": count}} for count in comments],
+    }
+
+
+def test_review_comments_past_the_first_page_of_reviews(github_client, scripted_server):
+    rate_limit = {"cost": 1, "remaining": 5000, "resetAt": "2030-01-01T00:00:00Z"}
+    more = {"data": {"rateLimit": rate_limit, "repository": {"pullRequest": {"reviews": reviews_page([5], None)}}}}
+    nodes = [pull_request_node(7, reviews_page([3, 4], "r2")), pull_request_node(6, reviews_page([2], None))]
+    server = scripted_server([(200, {}, connection(nodes)), (200, {}, more)])
+
+    pages = list(github_graphql.iter_merged_pull_requests(server.api_base, "o/r", {}))
+
+    assert [detail["review_comments"] for detail in pages[0][0]] == [12, 2]
+    assert server.requests == 2
+    assert server.bodies[1]["variables"] == {"owner": "o", "name": "r", "number": 7, "first": 100, "after": "r2"}
+
+
+def test_graphql_backend_matches_rest(monkeypatch, tmp_path, collector_env):
+    # One review per page, so every PR with several review comments pages through its reviews
+    monkeypatch.setattr(github_graphql, "REVIEWS_PAGE_SIZE", 1)
+    rest, graphql = tmp_path / "rest.csv", tmp_path / "graphql.csv"
+    run_main(monkeypatch, collect_pr, collector_env.projects, "--output", str(rest))
+    run_main(monkeypatch, collect_pr, collector_env.projects, "--output", str(graphql), "--backend", "graphql")
+
+    assert read_rows(graphql) == read_rows(rest)
+    repos = MockRepos(400, 2)
+    pulls = [detail for project in collector_env.projects for detail in repos.repo(project)["pulls"]]
+    assert any(detail["review_comments"] > 1 for detail in pulls)
+
+
+def test_persistent_graphql_rate_limits_give_up(github_client, scripted_server, monkeypatch):
+    # Each RATE_LIMITED answer pauses the token at least 5s; skip the wait but keep counting the retries.
+    monkeypatch.setattr(github_client, "sleep", lambda seconds: None)
+    monkeypatch.setattr(github_client.RateLimitBudget, "available_at", lambda budget: 0.0)
+    limited = {"data": None, "errors": [{"type": "RATE_LIMITED", "message": "API rate limit exceeded"}]}
+    server = scripted_server([(200, {"X-RateLimit-Reset": "0"}, limited)])
+    with pytest.raises(RuntimeError, match="rate limit exceeded"):
+        list(github_graphql.iter_merged_pull_requests(server.api_base, "o/r", {}))
+    assert server.requests == github_client.MAX_RATE_LIMIT_RETRIES + 1
@@ -0,0 +1,61 @@
+import sqlite3
+import sys
+
+import collect_release
+from http_cache import ResponseCache
+
+
+def collect(monkeypatch, projects: list[str], *arguments: str) -> None:
+    monkeypatch.setattr(collect_release, "PROJECTS", projects)
+    monkeypatch.setattr(sys, "argv", ["collect_release.py", "--no-telemetry", "--no-archive", *arguments])
+    collect_release.main()
+
+
+def test_second_run_revalidates_and_offline_replays(monkeypatch, tmp_path, collector_env):
+    cache = str(tmp_path / "responses.sqlite")
+    outputs = [tmp_path / f"releases{run}.csv" for run in range(3)]
+
+    collect(monkeypatch, collector_env.projects, "--cache", cache, "--output", str(outputs[0]))
+    requests, not_modified = collector_env.requests, collector_env.not_modified
+    collect(monkeypatch, collector_env.projects, "--cache", cache, "--output", str(outputs[1]))
+    # Every request of the second run was revalidated with its ETag and answered 304
+    assert collector_env.not_modified - not_modified == collector_env.requests - requests > 0
+
+    # Offline, with every entry past its TTL and no token: the server sees no request
+    monkeypatch.delenv("GITHUB_TOKEN")
+    requests = collector_env.requests
+    offline = ["--offline", "--cache-ttl-days", "0"]
+    collect(monkeypatch, collector_env.projects, "--cache", cache, *offline, "--output", str(outputs[2]))
+    assert collector_env.requests == requests
+
+    assert outputs[1].read_bytes() == outputs[0].read_bytes()
+    assert outputs[2].read_bytes() == outputs[0].read_bytes()
+
+
+def test_cache_max_mb_evicts_least_recently_used(monkeypatch, tmp_path, collector_env):
+    cache = tmp_path / "responses.sqlite"
+    collect(monkeypatch, collector_env.projects, "--cache", str(cache), "--output", str(tmp_path / "releases.csv"))
+    with sqlite3.connect(cache) as connection:
+        total = connection.execute("SELECT SUM(size) FROM responses").fetchone()[0]
+        newest = connection.execute("SELECT url FROM responses ORDER BY accessed_at DESC").fetchone()[0]
+
+    # Opening the cache with a smaller size evicts down to it, oldest accesses first
+    responses = ResponseCache(cache, 86400, total // 2)
+    with sqlite3.connect(cache) as connection:
+        assert connection.execute("SELECT SUM(size) FROM responses").fetchone()[0] <= total // 2
+        assert connection.execute("SELECT COUNT(*) FROM responses WHERE url = ?", (newest,)).fetchone()[0] > 0
+    responses.close()
+
+
+def test_expired_entries_are_dropped_unless_offline(tmp_path):
+    path = tmp_path / "responses.sqlite"
+    cache = ResponseCache(path, 3600, 2**20)
+    cache.put("https://api.github.com/x", {"page": 1}, b"[1]", {"ETag": '"a"'})
+    cache.close()
+
+    offline = ResponseCache(path, -1, 2**20, offline=True)
+    assert offline.get("https://api.github.com/x", {"page": 1}).json() == [1]
+    offline.close()
+    expired = ResponseCache(path, -1, 2**20)
+    assert expired.get("https://api.github.com/x", {"page": 1}) is None
+    expired.close()
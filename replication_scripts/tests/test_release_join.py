@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from pr_features import compute_pr_factors
+from release_join import join_releases
+
+
+def pull_requests() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "project": ["a/a", "a/a", "a/a", "b/b"],
+            "author": ["x", "x", "y", "z"],
+            "created_at": ["2020-01-01T00:00:00Z", "2020-01-02T00:00:00Z", "", "2020-01-01T00:00:00Z"],
+            "merged_at": ["2020-01-01T10:00:00Z", "", "2020-01-03T00:00:00Z", "2020-01-01T02:00:00Z"],
+            "churn": ["10", "20", "30", "40"],
+            "comments": [0, 0, 0, 0],
+            "merge_time": [10.0, np.nan, np.nan, 2.0],
+            "delivery_time": [np.nan] * 4,
+        }
+    )
+
+
+def releases() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "project": ["a/a", "a/a", "b/b"],
+            "startedAt": ["2019-12-31T00:00:00Z", "2020-01-05T00:00:00Z", "2019-12-31T00:00:00Z"],
+            "publishedAt": ["2020-01-04T00:00:00Z", "2020-01-06T00:00:00Z", ""],
+        }
+    )
+
+
+def test_missing_timestamps_are_left_out_of_the_join():
+    prs, joined = join_releases(pull_requests(), releases())
+
+    # Blank merged_at: not delivered. Blank publishedAt: delivers nothing and has no window.
+    np.testing.assert_array_equal(prs["delivery_time"], [62.0, np.nan, 24.0, np.nan])
+    assert joined["created_pull_requests"].tolist()[:2] == [2, 0]
+    assert joined["merged_pull_requests"].tolist()[:2] == [2, 0]
+    assert joined["released_pull_requests"].tolist() == [2, 0, 0]
+    assert joined["sum_submitted_pr_churn"].tolist()[:2] == [30, 0]
+    assert joined[["created_pull_requests", "merged_pull_requests", "sum_submitted_pr_churn"]].iloc[2].isna().all()
+
+
+def test_missing_timestamps_leave_pr_factors_blank():
+    factors = compute_pr_factors(pull_requests())
+
+    # The second PR has no merged_at, the third no created_at: their factors that need those times are blank.
+    assert factors["queue_rank"].isna().tolist() == [False, True, True, False]
+    assert factors["merge_workload"].isna().tolist() == [False, False, True, False]
+    assert factors["contributor_experience"].tolist()[:2] == [0, 1]
+    assert np.isnan(factors["contributor_integration"][2])
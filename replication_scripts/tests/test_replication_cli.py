@@ -0,0 +1,24 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ("numpy", "pandas", "scipy", "pyarrow")
+
+
+@pytest.mark.parametrize("arguments", [["--list"], ["--help"], ["run", "--help"], ["compare", "--help"]])
+def test_listing_and_help_skip_the_analysis_stack(arguments):
+    # A fresh interpreter, so modules imported by other tests do not count.
+    check = (
+        "import runpy, sys\n"
+        f"sys.argv = ['replication.py', *{arguments!r}]\n"
+        "try:\n"
+        "    runpy.run_path('replication.py', run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"print('imported:', *[name for name in {HEAVY_MODULES!r} if name in sys.modules])\n"
+    )
+    result = subprocess.run([sys.executable, "-c", check], cwd=SCRIPTS, capture_output=True, text=True, check=True)
+    assert result.stdout.splitlines()[-1] == "imported:"
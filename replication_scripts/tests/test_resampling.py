@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from config import CI, NO_CI
+from resampling import resample_practices
+
+
+def toy_frame(shift: float, projects: int = 3, rows: int = 60) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    frames = []
+    for index in range(projects):
+        practice = np.where(np.arange(rows) % 2 == 0, CI, NO_CI)
+        values = rng.exponential(20, rows) + np.where(practice == CI, shift, 0.0)
+        frames.append(pd.DataFrame({"project": f"p{index}/repo", "practice": practice, "delivery_time": values}))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_results_do_not_depend_on_jobs():
+    frame = toy_frame(5.0)
+    sequential = resample_practices(frame, "delivery_time", resamples=500, seed=7, jobs=1)
+    parallel = resample_practices(frame, "delivery_time", resamples=500, seed=7, jobs=2)
+    pdt.assert_frame_equal(parallel, sequential)
+    assert not sequential.equals(resample_practices(frame, "delivery_time", resamples=500, seed=8))
+
+
+@pytest.mark.parametrize("shift", [0.0, 40.0])
+def test_intervals_contain_the_observed_difference(shift):
+    frame = toy_frame(shift)
+    table = resample_practices(frame, "delivery_time", resamples=2000, seed=0)
+
+    assert list(table["n_treatment"]) == list(table["n_control"]) == [30, 30, 30]
+    for project, row in table.iterrows():
+        rows = frame[frame["project"] == project]
+        ci, no_ci = (rows.loc[rows["practice"] == label, "delivery_time"] for label in (CI, NO_CI))
+        assert row["mean_diff"] == pytest.approx(ci.mean() - no_ci.mean())
+        assert row["median_diff"] == pytest.approx(ci.median() - no_ci.median())
+        assert row["mean_diff_low"] <= row["mean_diff"] <= row["mean_diff_high"]
+        assert row["median_diff_low"] <= row["median_diff"] <= row["median_diff_high"]
+        assert 0 < row["permutation_p_value"] <= 1
+    if shift:
+        assert (table["mean_diff_low"] > 0).all()
+        assert (table["permutation_p_value"] < 0.01).all()
+
+
+def test_projects_without_both_practices_only_get_counts():
+    frame = toy_frame(0.0, projects=1)
+    frame = pd.concat([frame, pd.DataFrame({"project": ["only/ci"], "practice": [CI], "delivery_time": [3.0]})])
+    table = resample_practices(frame, "delivery_time", resamples=100)
+    assert table.loc["only/ci", ["n_treatment", "n_control"]].tolist() == [1, 0]
+    assert table.loc["only/ci", "mean_diff_low":].isna().all()
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import mannwhitneyu
+
+from config import CI, NO_CI
+from stats_engine import adjust_p_values, batched_mann_whitney, cliffs_delta, grouped_mann_whitney
+
+
+def naive_cliffs_delta(x, y) -> float:
+    return sum(int(a > b) - int(a < b) for a in x for b in y) / (len(x) * len(y))
+
+
+@pytest.fixture
+def samples() -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    rng = np.random.default_rng(0)
+    return {
+        "ties": (rng.integers(0, 6, 40).astype(float), rng.integers(1, 7, 35).astype(float)),
+        "no_ties": (rng.normal(1.0, 1.0, 30), rng.normal(0.0, 1.0, 25)),
+        # At most 8 on one side and no ties: scipy uses the exact distribution
+        "small": (rng.normal(0.5, 1.0, 6), rng.normal(0.0, 1.0, 20)),
+        "small_ties": (np.array([1.0, 2.0, 2.0, 3.0, 5.0]), np.array([2.0, 3.0, 3.0, 4.0, 6.0, 7.0])),
+    }
+
+
+def long_frame(samples: dict, column: str = "value") -> pd.DataFrame:
+    parts = [
+        pd.DataFrame({"project": name, "practice": practice, column: values})
+        for name, (treatment, control) in samples.items()
+        for practice, values in ((CI, treatment), (NO_CI, control))
+    ]
+    return pd.concat(parts, ignore_index=True)
+
+
+def test_mann_whitney_matches_scipy(samples):
+    results = grouped_mann_whitney(long_frame(samples), "value").set_index("project")
+    for name, (treatment, control) in samples.items():
+        expected = mannwhitneyu(treatment, control)
+        assert results.loc[name, "u_statistic"] == pytest.approx(expected.statistic)
+        assert results.loc[name, "p_value"] == pytest.approx(expected.pvalue, rel=1e-9)
+        assert results.loc[name, "cliffs_delta"] == pytest.approx(naive_cliffs_delta(treatment, control))
+        assert (results.loc[name, "n_treatment"], results.loc[name, "n_control"]) == (len(treatment), len(control))
+
+
+def test_batched_matches_one_column_at_a_time(samples):
+    frame = long_frame(samples)
+    frame["other"] = frame["value"] * -2 + 1
+    frame.loc[::7, "other"] = np.nan
+    batched = batched_mann_whitney(frame, ["value", "other"])
+    for value in ("value", "other"):
+        single = grouped_mann_whitney(frame, value)
+        pd.testing.assert_frame_equal(
+            batched.loc[batched["value"] == value].drop(columns="value").reset_index(drop=True), single
+        )
+
+
+def test_cliffs_delta_matches_pairwise_count(samples):
+    for treatment, control in samples.values():
+        delta, _ = cliffs_delta(treatment, control)
+        assert delta == pytest.approx(naive_cliffs_delta(treatment, control))
+    assert cliffs_delta([1, 2, 3], [1, 2, 3]) == (0.0, "negligible")
+    assert cliffs_delta([5, 6], [1, 2]) == (1.0, "large")
+
+
+def test_adjusted_p_values():
+    p_values = [0.01, 0.04, 0.03, 0.005, np.nan]
+    # Holm: sorted p times (m - rank), made monotone; BH: sorted p times m / rank, monotone from the top
+    np.testing.assert_allclose(adjust_p_values(p_values, "holm"), [0.03, 0.06, 0.06, 0.02, np.nan])
+    np.testing.assert_allclose(adjust_p_values(p_values, "bh"), [0.02, 0.04, 0.04, 0.02, np.nan])
+    np.testing.assert_allclose(adjust_p_values([0.5, 0.6], "holm"), [1.0, 1.0])
+    with pytest.raises(ValueError):
+        adjust_p_values(p_values, "bonferroni")
@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from analysis import AnalysisContext, run_findings
+from benchmarks.synthetic import write_datasets
+from findings import Finding, select_findings
+from streaming import StreamingContext
+
+
+def test_findings_reading_whole_datasets_are_refused():
+    whole = Finding(9, 1, lambda context: {}, {"pull_requests": []}, whole_datasets=True)
+    findings = [*select_findings(ids=["rq1.1"]), whole]
+    with pytest.raises(SystemExit, match=r"rq9\.1 read whole datasets"):
+        StreamingContext(findings)
+
+
+def plain(frame: pd.DataFrame) -> pd.DataFrame:
+    """`frame` with its index as string columns, in a fixed row and column order."""
+    frame = frame.reset_index()
+    keys = [column for column in ("project", "practice") if column in frame.columns]
+    frame[keys] = frame[keys].astype(str)
+    return frame.sort_values(keys).reset_index(drop=True).sort_index(axis=1)
+
+
+@pytest.mark.parametrize("resamples", [0, 50])
+def test_streaming_matches_the_in_memory_run(tmp_path, resamples):
+    prs, releases = write_datasets(tmp_path, 3000, 3)
+    paths = {"pull_requests": str(prs), "releases": str(releases)}
+    findings = select_findings()
+    results, tables = {}, {}
+    # 250-row chunks split every project, so medians and tests come from the spill files
+    for name, context in (
+        ("memory", AnalysisContext(findings, paths, resamples=resamples)),
+        ("stream", StreamingContext(findings, paths, 250, resamples=resamples)),
+    ):
+        try:
+            results[name] = run_findings(findings, context)
+            # The findings report counts of projects; the per-project values behind them must match too
+            tables[name] = [
+                context.summary("pull_requests"),
+                context.practice_tests("pull_requests", "merge_time"),
+                context.practice_tests("pull_requests", "delivery_time"),
+            ]
+        finally:
+            context.close()
+
+    assert results["stream"] == results["memory"]
+    for streamed, loaded in zip(tables["stream"], tables["memory"]):
+        pd.testing.assert_frame_equal(plain(streamed), plain(loaded), check_dtype=False)
@@ -0,0 +1,114 @@
+import json
+import re
+import sys
+
+import pytest
+
+import collect_pr
+from benchmarks.mock_github import MockGitHub, MockRepos
+from conftest import point_collectors_at
+from telemetry import LATENCY_BUCKETS, endpoint_name
+
+FLAKY_EVERY = 5
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{((?:[a-zA-Z_]\w*="[^"]*",?)*)\})? (\S+)$')
+LABEL = re.compile(r'(\w+)="([^"]*)"')
+
+
+def parse_prometheus(text: str) -> tuple[dict, list]:
+    """Metric types and (name, labels, value) samples of a Prometheus text file, rejecting malformed lines."""
+    types, samples = {}, []
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            types[name] = kind
+        elif line.startswith("# HELP "):
+            continue
+        else:
+            match = SAMPLE.match(line)
+            assert match, f"not a Prometheus sample: {line!r}"
+            name, labels, value = match.groups()
+            family = re.sub(r"_(bucket|sum|count)$", "", name) if name not in types else name
+            assert family in types, f"{name} has no TYPE line before it"
+            samples.append((name, dict(LABEL.findall(labels or "")), float(value)))
+    return types, samples
+
+
+@pytest.fixture(scope="module")
+def crawls(tmp_path_factory):
+    """One crawl per telemetry format against a mock that fails the first detail request of every 5th PR."""
+    directory = tmp_path_factory.mktemp("telemetry")
+    monkeypatch = pytest.MonkeyPatch()
+    results = {}
+    try:
+        # A server per crawl, since each flaky PR only fails on its first request
+        for suffix in ("jsonl", "prom"):
+            with MockGitHub(200, 2, flaky_every=FLAKY_EVERY) as github:
+                point_collectors_at(monkeypatch, github)
+                monkeypatch.setattr(collect_pr, "PROJECTS", github.projects)
+                path = directory / f"crawl.{suffix}"
+                output = directory / f"{suffix}.csv"
+                monkeypatch.setattr(
+                    sys, "argv", ["collect_pr.py", "--no-cache", "--no-archive", "--telemetry", str(path), "--output", str(output)]
+                )
+                collect_pr.main()
+                results[suffix] = (path.read_text(encoding="utf-8"), github.requests)
+                projects = github.projects
+    finally:
+        monkeypatch.undo()
+    repos = MockRepos(200, 2)
+    numbers = [detail["number"] for project in projects for detail in repos.repo(project)["pulls"]]
+    return results, numbers
+
+
+def test_json_lines_record_every_request_and_the_summary(crawls):
+    (text, served), numbers = crawls[0]["jsonl"], crawls[1]
+    events = [json.loads(line) for line in text.splitlines()]
+    requests = [event for event in events if event["event"] == "request"]
+    summary = events[-1]
+
+    assert summary["event"] == "summary"
+    assert len(requests) == summary["requests"] == served
+    assert sum(event["bytes"] for event in requests) == summary["bytes"]
+
+    detail = summary["endpoints"]["/repos/{repo}/pulls/{number}"]
+    flaky = sum(number % FLAKY_EVERY == 0 for number in numbers)
+    assert detail["statuses"] == {"200/network": len(numbers), "502/network": flaky}
+    assert detail["requests"] == len(numbers) + flaky
+    assert summary["endpoints"]["/repos/{repo}/pulls"]["statuses"] == {"200/network": len(requests) - detail["requests"]}
+    assert {event["endpoint"] for event in requests} == set(summary["endpoints"])
+    assert summary["rate_limits"]["core"]["remaining"] == 5000
+
+
+def test_prometheus_file_parses_with_consistent_histograms(crawls):
+    (text, served), numbers = crawls[0]["prom"], crawls[1]
+    types, samples = parse_prometheus(text)
+    assert types["github_request_duration_seconds"] == "histogram"
+
+    totals = {}
+    for name, labels, value in samples:
+        if name == "github_requests_total":
+            totals[labels["endpoint"]] = totals.get(labels["endpoint"], 0) + value
+    assert sum(totals.values()) == served
+
+    for endpoint, requests in totals.items():
+        buckets = [
+            (labels["le"], value)
+            for name, labels, value in samples
+            if name == "github_request_duration_seconds_bucket" and labels["endpoint"] == endpoint
+        ]
+        assert [bound for bound, _ in buckets] == [*map(str, LATENCY_BUCKETS), "+Inf"]
+        counts = [value for _, value in buckets]
+        assert counts == sorted(counts)
+        count = next(
+            value for name, labels, value in samples if name == "github_request_duration_seconds_count" and labels["endpoint"] == endpoint
+        )
+        assert counts[-1] == count == requests
+
+    flaky = sum(number % FLAKY_EVERY == 0 for number in numbers)
+    failed = [value for name, labels, value in samples if name == "github_requests_total" and labels["status"] == "502"]
+    assert failed == [flaky]
+
+
+def test_endpoint_names_are_templates():
+    assert endpoint_name("https://api.github.com/repos/a/b/pulls/12") == "/repos/{repo}/pulls/{number}"
+    assert endpoint_name("http://127.0.0.1:1234/repos/a/b/releases?page=2") == "/repos/{repo}/releases"
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from timestamps import MISSING, epoch_seconds, format_epoch_seconds, hours_between, to_epoch_seconds
+
+NEW_YEAR = 1577836800  # 2020-01-01T00:00:00Z
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        ["2020-01-01T00:00:00Z", "2020-01-01 00:00:00", "", None, "garbage"],
+        # Leading with a naive value once made pandas infer its format and drop the others
+        ["2020-01-01 00:00:00", "2020-01-01T00:00:00Z", "", None, "garbage"],
+        ["2020-01-01T02:00:00+02:00", "2020-01-01T00:00:00Z", "", None, "garbage"],
+        ["2019-12-31T19:00:00-05:00", "2020-01-01", "", None, "garbage"],
+    ],
+)
+def test_mixed_formats_blanks_and_garbage(values):
+    np.testing.assert_array_equal(to_epoch_seconds(values), [NEW_YEAR, NEW_YEAR, MISSING, MISSING, MISSING])
+
+
+def test_series_and_datetimes():
+    strings = pd.Series(["2020-01-01T00:00:00Z", ""], dtype="string")
+    np.testing.assert_array_equal(to_epoch_seconds(strings), [NEW_YEAR, MISSING])
+    dates = pd.to_datetime(pd.Series(["2020-01-01T00:00:00Z", None]), utc=True)
+    np.testing.assert_array_equal(to_epoch_seconds(dates), [NEW_YEAR, MISSING])
+
+
+def test_scalar_parsing_matches_bulk():
+    for value in ["2020-01-01T00:00:00Z", "2020-01-01T02:00:00+02:00", "2020-01-01 00:00:00"]:
+        assert epoch_seconds(value) == NEW_YEAR
+    assert epoch_seconds("") is None
+    assert epoch_seconds("garbage") is None
+
+
+def test_format_and_hours():
+    assert format_epoch_seconds([NEW_YEAR, MISSING]) == ["2020-01-01 00:00:00", ""]
+    np.testing.assert_array_equal(
+        hours_between([NEW_YEAR, NEW_YEAR, MISSING], [NEW_YEAR + 5400, NEW_YEAR - 3600, NEW_YEAR]), [1.5, 0.0, np.nan]
+    )
@@ -0,0 +1,61 @@
+import warnings
+from datetime import datetime, timezone
+
+import numpy as np
+
+HOUR = 3600
+DAY = 86400
+# What a missing timestamp becomes in an int64 epoch-seconds array (NaT's integer value).
+MISSING = np.iinfo(np.int64).min
+
+
+def epoch_seconds(value: str | None) -> int | None:
+    """Epoch seconds of one ISO 8601 timestamp (naive ones are UTC); None if blank or invalid."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def to_epoch_seconds(values) -> np.ndarray:
+    """int64 epoch seconds of a column of ISO 8601 strings or datetimes; MISSING where blank or invalid.
+
+    Strings are parsed in bulk by NumPy's datetime64 parser, which is several times faster than
+    pandas' timezone-aware parsing. Only strings with a UTC offset other than Z fall back to pandas.
+    """
+    if getattr(values, "dtype", None) is not None and values.dtype.kind == "M":
+        return np.asarray(values, dtype="datetime64[s]").astype(np.int64)
+    values = np.asarray(values, dtype=object).tolist()  # iterating a list beats iterating a Series
+    strings = [
+        (value[:-1] if value.endswith("Z") else value) if isinstance(value, str) and value else "NaT" for value in values
+    ]
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")  # NumPy only warns about explicit offsets
+            return np.array(strings, dtype="datetime64[s]").astype(np.int64)
+    except (ValueError, UserWarning):
+        import pandas as pd
+
+        # An explicit format: otherwise pandas infers one from the first value and drops the rest
+        parsed = pd.to_datetime(pd.Series(values, dtype=object), utc=True, errors="coerce", format="ISO8601")
+        return to_epoch_seconds(parsed)
+
+
+def format_epoch_seconds(seconds) -> list[str]:
+    """'YYYY-MM-DD HH:MM:SS' (UTC) strings of an array of epoch seconds; "" where MISSING."""
+    strings = np.datetime_as_string(np.asarray(seconds, dtype=np.int64).astype("datetime64[s]"), unit="s")
+    return ["" if text == "NaT" else text.replace("T", " ") for text in strings.tolist()]
+
+
+def hours_between(start, end):
+    """Non-negative hours from start to end, in epoch seconds (scalars or arrays); NaN where either is MISSING."""
+    start, end = np.asarray(start, dtype=np.int64), np.asarray(end, dtype=np.int64)
+    missing = (start == MISSING) | (end == MISSING)
+    # Masked before subtracting: a real time minus MISSING overflows int64.
+    hours = np.maximum(np.where(missing, 0, end) - np.where(missing, 0, start), 0) / HOUR
+    return np.where(missing, np.nan, hours)